@@ -0,0 +1,187 @@
+"""Headless rerun benchmark for streamlit_app.py.
+
+Drives the app with Streamlit's AppTest against the shipped mpcc_* data and
+synthetic copies scaled 10x, 100x and 1000x, and reports per dataset:
+
+  * cold start: imports plus the first script run in a fresh process
+  * warm rerun: a full rerun with every cache populated
+  * per-interaction latency for each checkbox and the sidebar feedback button
+  * per-section build costs (map, stances styling, chart spec, ...) from cache_metrics
+
+Results are written as JSON to bench_results/ so runs can be compared over
+time. AppTest reruns the whole script for every interaction (it does not do
+fragment-only reruns), so interaction numbers are an upper bound on what a
+browser session sees; `python load_test.py --fragments` measures fragment
+reruns against a real server.
+
+Usage:
+    python bench_app.py
+    python bench_app.py --scales 1 10 --repeat 3
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(REPO_DIR, "streamlit_app.py")
+
+CHECKBOXES = [
+    "Show instructions for interactive map",
+    "Show tagged topics",
+    "Open key projects table",
+    "List key stances of each Council Member",
+    "Show topics by meeting date",
+]
+
+
+def _summary(samples: list) -> dict:
+    samples = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+        "min_ms": round(samples[0], 2),
+        "runs": len(samples),
+    }
+
+
+def _timed_run(element_or_app) -> float:
+    start = time.perf_counter()
+    element_or_app.run()
+    return (time.perf_counter() - start) * 1000
+
+
+def run_worker(repeat: int, timeout: float) -> dict:
+    """Benchmark one dataset in this process (cwd is the dataset directory)."""
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    import cache_metrics
+    from stub_endpoint import StubEndpoint
+    import_ms = (time.perf_counter() - start) * 1000
+
+    stub = StubEndpoint().start()
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.secrets["feedback"] = {"gas_url": stub.url, "token": "bench"}
+
+    first_run_ms = _timed_run(at)
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    cold_sections = cache_metrics.snapshot()
+
+    warm = [_timed_run(at) for _ in range(repeat)]
+
+    interactions = {}
+    for label in CHECKBOXES:
+        samples = []
+        for _ in range(repeat):
+            checkbox = next(cb for cb in at.checkbox if cb.label == label)
+            samples.append(_timed_run(checkbox.check()))
+            checkbox = next(cb for cb in at.checkbox if cb.label == label)
+            _timed_run(checkbox.uncheck())
+        interactions[label] = _summary(samples)
+
+    samples = []
+    for i in range(repeat):
+        at.sidebar.text_area[0].input(f"benchmark feedback {i}").run()
+        samples.append(_timed_run(at.sidebar.button[0].click()))
+    interactions["Submit Feedback"] = _summary(samples)
+    stub.stop()
+
+    return {
+        "cold_start_ms": round(import_ms + first_run_ms, 2),
+        "import_ms": round(import_ms, 2),
+        "first_run_ms": round(first_run_ms, 2),
+        "warm_rerun": _summary(warm),
+        "interactions": interactions,
+        "sections_cold": cold_sections,
+        "sections_total": cache_metrics.snapshot(),
+    }
+
+
+def prepare_dataset(scale: int, workdir: str) -> dict:
+    """Populate workdir with the data files for this scale; returns row counts."""
+    from synthetic_data import write_synthetic
+
+    # The registry's paths are relative to the working directory, so they pick up the files written here
+    for name in ("images", "content", "datasets.json"):
+        os.symlink(os.path.join(REPO_DIR, name), os.path.join(workdir, name))
+    if scale == 1:
+        from data_loader import PROJECTS_CSV, SNAPSHOT_DIR, STANCES_CSV, TOPICS_CSV
+        for name in (PROJECTS_CSV, STANCES_CSV, TOPICS_CSV, SNAPSHOT_DIR):
+            os.symlink(os.path.join(REPO_DIR, name), os.path.join(workdir, name))
+        import pandas as pd
+        return {"projects": len(pd.read_csv(PROJECTS_CSV)), "stances": len(pd.read_csv(STANCES_CSV)),
+                "topics": len(pd.read_csv(TOPICS_CSV))}
+    return write_synthetic(workdir, scale, source_dir=REPO_DIR)
+
+
+def run_scale(scale: int, repeat: int, timeout: float) -> dict:
+    with tempfile.TemporaryDirectory(prefix=f"lwa-bench-{scale}x-") as workdir:
+        rows = prepare_dataset(scale, workdir)
+        env = dict(os.environ, PYTHONPATH=REPO_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", "--repeat", str(repeat),
+             "--timeout", str(timeout)],
+            cwd=workdir, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            return {"scale": scale, "rows": rows, "error": proc.stderr.strip().splitlines()[-1:]}
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        return {"scale": scale, "rows": rows, **result}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless rerun benchmark for streamlit_app.py")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100, 1000],
+                        help="dataset sizes relative to the shipped CSVs (1 = shipped data)")
+    parser.add_argument("--repeat", type=int, default=5, help="samples per measurement")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds allowed per script run")
+    parser.add_argument("--out", default=os.path.join(REPO_DIR, "bench_results"))
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.repeat, args.timeout)))
+        return 0
+
+    import streamlit
+
+    results = {
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "runs": [],
+    }
+    for scale in args.scales:
+        print(f"Benchmarking {scale}x ...", flush=True)
+        run = run_scale(scale, args.repeat, args.timeout)
+        results["runs"].append(run)
+        if "error" in run:
+            print(f"  failed: {run['error']}")
+            continue
+        print(f"  rows {run['rows']}  cold start {run['cold_start_ms']:.0f} ms  "
+              f"warm rerun {run['warm_rerun']['median_ms']:.0f} ms")
+        for label, stats in run["interactions"].items():
+            print(f"    {label}: {stats['median_ms']:.0f} ms")
+
+    os.makedirs(args.out, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(args.out, f"bench-{stamp}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
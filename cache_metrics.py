@@ -0,0 +1,50 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+
+# Process-wide hit/miss counters for the app's cached loaders and builders.
+# Streamlit's cache decorators don't expose whether a call was served from
+# cache, so each cached function body calls mark_miss() and tracked() checks
+# the flag after the call returns.
+
+logger = logging.getLogger("lwa.cache")
+
+_lock = threading.Lock()
+_local = threading.local()
+_counters = defaultdict(lambda: {"hits": 0, "misses": 0, "hit_ms": 0.0, "miss_ms": 0.0})
+
+
+def mark_miss():
+    """Call from inside a cached function body; only runs on a cache miss."""
+    _local.missed = True
+
+
+def tracked(name: str, cached_func, *args, **kwargs):
+    """Call a cached function and record whether it was a hit or a miss."""
+    _local.missed = False
+    start = time.perf_counter()
+    result = cached_func(*args, **kwargs)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    missed = getattr(_local, "missed", False)
+
+    with _lock:
+        counter = _counters[name]
+        if missed:
+            counter["misses"] += 1
+            counter["miss_ms"] += elapsed_ms
+        else:
+            counter["hits"] += 1
+            counter["hit_ms"] += elapsed_ms
+
+    if missed:
+        logger.info("cache miss name=%s elapsed_ms=%.2f", name, elapsed_ms)
+    else:
+        logger.debug("cache hit name=%s elapsed_ms=%.2f", name, elapsed_ms)
+    return result
+
+
+def snapshot() -> dict:
+    """Return a copy of the counters, e.g. {'projects': {'hits': 3, 'misses': 1, ...}}."""
+    with _lock:
+        return {name: dict(counter) for name, counter in _counters.items()}
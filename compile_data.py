@@ -0,0 +1,212 @@
+"""Compile the raw recap CSVs into typed Parquet snapshots.
+
+Cleaning (renames, coordinate coercion, city filtering, date parsing and
+display columns) runs once here instead of on every app rerun. Rows that
+can't be used are reported on the console, and a manifest records row
+counts, the schema version and content hashes of sources and snapshots.
+
+With --geocode, projects missing coordinates are geocoded first (see
+geocoder.py); cached and overridden addresses cost no lookups.
+
+Poster images for every video in datasets.json are downloaded to
+images/posters/ (already downloaded ones are kept), so the app never looks
+them up while a page renders. Use --no-posters to skip this offline.
+
+Usage:
+    python compile_data.py
+    python compile_data.py --out data --city "Menlo Park"
+    python compile_data.py --geocode nominatim
+    python compile_data.py --no-posters
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sys
+
+import pandas as pd
+
+from data_loader import (
+    MANIFEST_NAME,
+    PROJECTS_CSV,
+    SCHEMA_VERSION,
+    SNAPSHOT_DIR,
+    STANCES_CSV,
+    TOPICS_CSV,
+    clean_projects,
+    clean_topics,
+)
+
+REQUIRED_COLUMNS = {
+    "projects": ['project_name', 'latitude', 'longitude'],
+    "stances": ['Council Member', 'Key Positions'],
+    "topics": ['Date', 'Length_Minutes', 'Topic_Count', 'Major_Topics', 'youtube-link'],
+}
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def check_columns(name: str, raw: pd.DataFrame):
+    missing = [c for c in REQUIRED_COLUMNS[name] if c not in raw.columns]
+    if missing:
+        raise ValueError(f"{name}: missing required columns {missing}")
+
+
+def project_issues(raw: pd.DataFrame, city: str) -> list:
+    """Rows the app would drop or can't show correctly, as (row, project, reason)."""
+    issues = []
+    lat = pd.to_numeric(raw['latitude'], errors='coerce')
+    lon = pd.to_numeric(raw['longitude'], errors='coerce')
+    for idx in raw.index[lat.isna() | lon.isna()]:
+        issues.append((idx, raw.at[idx, 'project_name'], "missing or invalid latitude/longitude"))
+    if 'city' in raw.columns:
+        in_city = raw['city'].astype(str).str.contains(city, case=False, na=False)
+        for idx in raw.index[~in_city & lat.notna() & lon.notna()]:
+            issues.append((idx, raw.at[idx, 'project_name'], f"city is not {city}"))
+    else:
+        issues.append((None, None, "no 'city' column; city filter not applied"))
+    return issues
+
+
+def topic_issues(raw: pd.DataFrame) -> list:
+    """Meetings with unparseable dates or durations, as (row, date, reason)."""
+    issues = []
+    dates = pd.to_datetime(raw['Date'], errors='coerce')
+    for idx in raw.index[dates.isna()]:
+        issues.append((idx, raw.at[idx, 'Date'], "unparseable Date"))
+    minutes = pd.to_numeric(raw['Length_Minutes'], errors='coerce')
+    for idx in raw.index[minutes.isna()]:
+        issues.append((idx, raw.at[idx, 'Date'], "missing or invalid Length_Minutes"))
+    return issues
+
+
+def compile_dataset(name, source, cleaned, out_dir, issues, extra=None, source_rows=None) -> dict:
+    """Write one snapshot and return its manifest entry.
+
+    source_rows is the row count before cleaning; rejected_rows counts the rows
+    dropped, not every row with an issue (some are kept, e.g. with no duration).
+    """
+    snapshot = f"{name}.parquet"
+    snapshot_path = os.path.join(out_dir, snapshot)
+    cleaned.to_parquet(snapshot_path, index=False)
+
+    for row, label, reason in issues:
+        where = f"row {row + 2}" if row is not None else "file"  # +2: header and 1-based lines
+        print(f"  [{name}] {where} {label if label is not None else ''}: {reason}")
+
+    entry = {
+        "source": source,
+        "source_sha256": sha256_file(source),
+        "snapshot": snapshot,
+        "snapshot_sha256": sha256_file(snapshot_path),
+        "rows": len(cleaned),
+        "rejected_rows": (len(cleaned) if source_rows is None else source_rows) - len(cleaned),
+        "columns": {col: str(dtype) for col, dtype in cleaned.dtypes.items()},
+    }
+    if extra:
+        entry.update(extra)
+    print(f"{name}: {entry['rows']} rows -> {snapshot_path}")
+    return entry
+
+
+def compile_all(projects=PROJECTS_CSV, stances=STANCES_CSV, topics=TOPICS_CSV,
+                out_dir=SNAPSHOT_DIR, city="Menlo Park", geocoder=None) -> dict:
+    """Clean all three CSVs, write the snapshots and the manifest.
+
+    geocoder is an optional geocoding backend used to fill missing project coordinates.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    datasets = {}
+
+    raw = pd.read_csv(projects)
+    check_columns("projects", raw)
+    if geocoder is not None:
+        from geocoder import GeocodeCache, geocode_projects, load_overrides
+        raw, stats = geocode_projects(raw, geocoder, GeocodeCache(), load_overrides())
+        print("geocoding: " + ", ".join(f"{k} {v}" for k, v in stats.items()))
+    issues = project_issues(raw, city)
+    cleaned, _ = clean_projects(raw, city)
+    datasets["projects"] = compile_dataset("projects", projects, cleaned, out_dir, issues, {"city": city}, len(raw))
+
+    raw = pd.read_csv(stances)
+    check_columns("stances", raw)
+    datasets["stances"] = compile_dataset("stances", stances, raw, out_dir, [], source_rows=len(raw))
+
+    raw = pd.read_csv(topics)
+    check_columns("topics", raw)
+    issues = topic_issues(raw)
+    valid_dates = pd.to_datetime(raw['Date'], errors='coerce').notna()
+    cleaned = clean_topics(raw[valid_dates])
+    datasets["topics"] = compile_dataset("topics", topics, cleaned, out_dir, issues, source_rows=len(raw))
+
+    manifest = {
+        "schema_version": SCHEMA_VERSION,
+        "built_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "datasets": datasets,
+    }
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    return manifest
+
+
+def prefetch_posters(registry_path: str = None) -> dict:
+    """Download missing posters for the registry's videos; returns {url: path or None if it failed}."""
+    import requests
+    from dataset_registry import REGISTRY_PATH, load_registry
+    from video_facade import fetch_poster
+
+    results = {}
+    datasets, _ = load_registry(registry_path or REGISTRY_PATH)
+    for ds in datasets.values():
+        for _, _, _, url in ds.videos:
+            if url in results:
+                continue
+            try:
+                results[url] = fetch_poster(url)
+            except (requests.RequestException, ValueError, OSError) as e:
+                print(f"poster for {url}: {e}", file=sys.stderr)
+                results[url] = None
+    fetched = sum(1 for path in results.values() if path)
+    print(f"posters: {fetched} of {len(results)} in place")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile recap CSVs into typed Parquet snapshots.")
+    parser.add_argument("--projects", default=PROJECTS_CSV)
+    parser.add_argument("--stances", default=STANCES_CSV)
+    parser.add_argument("--topics", default=TOPICS_CSV)
+    parser.add_argument("--city", default="Menlo Park")
+    parser.add_argument("--out", default=SNAPSHOT_DIR, help="output directory for snapshots and manifest")
+    parser.add_argument("--geocode", metavar="BACKEND",
+                        help="geocode projects missing coordinates first (nominatim, table, or module:Class)")
+    parser.add_argument("--geocode-table", help="address,latitude,longitude CSV for the table backend")
+    parser.add_argument("--no-posters", action="store_true", help="don't download video posters")
+    args = parser.parse_args(argv)
+
+    try:
+        geocoder = None
+        if args.geocode:
+            from geocoder import make_backend
+            geocoder = make_backend(args.geocode, **({"path": args.geocode_table} if args.geocode_table else {}))
+        compile_all(args.projects, args.stances, args.topics, args.out, args.city, geocoder)
+        if not args.no_posters:
+            # A missing poster only costs a thumbnail lookup in the app, so failures don't fail the build
+            prefetch_posters()
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
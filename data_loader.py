@@ -0,0 +1,258 @@
+import functools
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+import streamlit as st
+
+import cache_metrics
+import shared_store
+
+# Default data snapshots for the Menlo Park recap
+PROJECTS_CSV = "mpcc_projects_2025-09-08_geocoded_fixed.csv"
+STANCES_CSV = "mpcc_stances_2025-09-08.csv"
+TOPICS_CSV = "mpcc_topics_2025-09-06_v2_with_youtube_links.csv"
+
+# Compiled snapshots written by compile_data.py
+SNAPSHOT_DIR = "data"
+MANIFEST_NAME = "manifest.json"
+SCHEMA_VERSION = 3  # 2: typed topics Date and projects zip_code; 3: typed project mention dates
+
+# Meeting dates as shown in tables and used as keys for links and search results
+DATE_FORMAT = '%Y-%m-%d'
+
+# Column renames applied to the projects CSV for easier access
+PROJECT_COLUMNS = {
+    'project_name': 'project',
+    'street_address': 'address',
+    'project_description': 'description',
+    'project_url': 'url',
+    'first_mention_date': 'earliest_mention_date',
+    'last_mention_date': 'latest_mention_date',
+}
+
+# Project columns parsed to datetime64 (NaT when unknown); formatted with DATE_FORMAT where shown
+MENTION_DATE_COLUMNS = ('earliest_mention_date', 'latest_mention_date')
+
+# path -> ((mtime_ns, size), sha256 of the file contents)
+_fingerprints = {}
+_fingerprints_lock = threading.Lock()
+
+
+def file_fingerprint(path: str) -> str:
+    """Content hash of a data file, re-hashed only when its mtime or size changes.
+
+    A rerun costs one os.stat; the file is only read again after it changes on disk.
+    """
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _fingerprints_lock:
+        cached = _fingerprints.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    content_hash = digest.hexdigest()
+
+    with _fingerprints_lock:
+        _fingerprints[path] = (stamp, content_hash)
+    return content_hash
+
+
+def dataset_fingerprint(content_hash: str, *params) -> str:
+    """Fingerprint of a loaded dataset: the file's content hash plus the load
+    parameters (e.g. city) that shape the frame.
+
+    Derived caches are keyed on it, so two registry datasets that read the
+    same CSV for different cities never share cached state.
+    """
+    if not params:
+        return content_hash
+    return hashlib.sha256("\0".join([content_hash, *map(str, params)]).encode()).hexdigest()
+
+
+def frames_key(frames) -> str:
+    """Cache key for structures built from several loaded datasets together
+    (e.g. the search and link indexes): their fingerprints joined with ':'."""
+    return ":".join(df.attrs.get("fingerprint", "") for df in frames)
+
+
+def clean_projects(raw: pd.DataFrame, city: str):
+    """Rename, coerce coordinates and drop unplottable rows.
+
+    Returns the cleaned frame and the number of rows dropped for missing coordinates.
+    """
+    df = raw.rename(columns=PROJECT_COLUMNS)
+
+    # Convert latitude and longitude to numeric, coercing errors to NaN
+    df['latitude'] = pd.to_numeric(df['latitude'], errors='coerce')
+    df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce')
+
+    # Filter out rows where latitude or longitude are missing, as these cannot be plotted
+    initial_rows = len(df)
+    df = df.dropna(subset=['latitude', 'longitude'])
+    dropped_rows = initial_rows - len(df)
+
+    # Further filter to ensure only projects for this city are shown
+    if 'city' in df.columns:
+        df = df[df['city'].astype(str).str.contains(city, case=False, na=False)]
+
+    # Nullable, so a missing zip code doesn't turn the column into floats
+    if 'zip_code' in df.columns:
+        df = df.assign(zip_code=pd.to_numeric(df['zip_code'], errors='coerce').round().astype('Int64'))
+
+    # Parsed once here (and stored typed in the snapshot), so the date indexes don't re-parse strings
+    dates = {c: pd.to_datetime(df[c], errors='coerce', format='mixed').dt.normalize()
+             for c in MENTION_DATE_COLUMNS if c in df.columns}
+    if dates:
+        df = df.assign(**dates)
+
+    return df.reset_index(drop=True), dropped_rows
+
+
+def clean_topics(raw: pd.DataFrame) -> pd.DataFrame:
+    """Normalize meeting dates and add the display columns used by the chart and tables."""
+    chart_df = raw.copy()
+    chart_df["Date"] = pd.to_datetime(chart_df["Date"]).dt.normalize()
+    chart_df["Duration (min)"] = pd.to_numeric(chart_df["Length_Minutes"], errors='coerce')
+    chart_df["Topic Count"] = chart_df["Topic_Count"]
+    chart_df["Topics"] = chart_df["Major_Topics"]
+    chart_df["Youtube link"] = chart_df["youtube-link"]
+    return chart_df
+
+
+def date_keys(dates) -> list:
+    """Meeting dates as DATE_FORMAT strings, e.g. for link and search keys."""
+    return list(pd.to_datetime(pd.Series(list(dates), dtype=object)).dt.strftime(DATE_FORMAT))
+
+
+@functools.lru_cache(maxsize=8)
+def _read_manifest(manifest_path: str, fingerprint: str) -> dict:
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def snapshot_for(name: str, source_path: str, snapshot_dir: str = SNAPSHOT_DIR, **params):
+    """Path of the compiled snapshot for this source CSV, or None if missing or stale.
+
+    A snapshot is stale when the source CSV has changed since the build, or
+    was built with different parameters (e.g. another city).
+    """
+    manifest_path = os.path.join(snapshot_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return None
+    manifest = _read_manifest(manifest_path, file_fingerprint(manifest_path))
+    entry = manifest.get("datasets", {}).get(name)
+    if manifest.get("schema_version") != SCHEMA_VERSION or entry is None:
+        return None
+    if os.path.basename(entry["source"]) != os.path.basename(source_path):
+        return None
+    if any(entry.get(key) != value for key, value in params.items()):
+        return None
+    if os.path.exists(source_path) and file_fingerprint(source_path) != entry["source_sha256"]:
+        return None
+    return os.path.join(snapshot_dir, entry["snapshot"])
+
+
+# Loaded datasets kept per process, per kind. With several cities and periods
+# registered (see dataset_registry.py) the least recently used are evicted.
+MAX_CACHED_DATASETS = 8
+
+# The fingerprint argument is part of the cache key, so a changed file
+# produces a new entry while unchanged reruns are served from memory.
+# Loaded frames carry it in df.attrs["fingerprint"] for keying derived caches;
+# it covers the load parameters too (see dataset_fingerprint).
+#
+# By default the loaders go through shared_store.py, which builds each frame
+# once and memory-maps it for every session and server process. The
+# st.cache_data versions below (a fresh copy per call) are the fallback when
+# LWA_SHARED_STORE=0.
+
+def _build_projects(path: str, city: str) -> pd.DataFrame:
+    df, dropped_rows = clean_projects(pd.read_csv(path), city)
+    df.attrs["dropped_rows"] = dropped_rows
+    return df
+
+
+def _build_topics(path: str) -> pd.DataFrame:
+    return clean_topics(pd.read_csv(path))
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_DATASETS)
+def _read_snapshot(path: str, fingerprint: str) -> pd.DataFrame:
+    cache_metrics.mark_miss()
+    df = pd.read_parquet(path)
+    df.attrs["fingerprint"] = fingerprint
+    return df
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_DATASETS)
+def _load_projects(path: str, fingerprint: str, city: str) -> pd.DataFrame:
+    cache_metrics.mark_miss()
+    df = _build_projects(path, city)
+    df.attrs["fingerprint"] = fingerprint
+    return df
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_DATASETS)
+def _load_stances(path: str, fingerprint: str) -> pd.DataFrame:
+    cache_metrics.mark_miss()
+    df = pd.read_csv(path)
+    df.attrs["fingerprint"] = fingerprint
+    return df
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_DATASETS)
+def _load_topics(path: str, fingerprint: str) -> pd.DataFrame:
+    cache_metrics.mark_miss()
+    df = _build_topics(path)
+    df.attrs["fingerprint"] = fingerprint
+    return df
+
+
+def _load(name: str, path: str, snapshot, cached_loader, build, *params):
+    """Frame for a dataset from its snapshot or source CSV, shared or copied per call."""
+    fingerprint = dataset_fingerprint(file_fingerprint(snapshot or path), *params)
+    if not shared_store.enabled():
+        if snapshot:
+            return cache_metrics.tracked(name, _read_snapshot, snapshot, fingerprint)
+        return cache_metrics.tracked(name, cached_loader, path, fingerprint, *params)
+    # Named after the file too, so datasets loaded side by side don't replace each other's store files
+    if snapshot:
+        return shared_store.shared_frame(":".join([name, os.path.basename(snapshot)]), fingerprint,
+                                         pd.read_parquet, snapshot)
+    return shared_store.shared_frame(":".join([name, os.path.basename(path), *params]), fingerprint,
+                                     build, path, *params)
+
+
+def _with_deltas(kind: str, df: pd.DataFrame, **params) -> pd.DataFrame:
+    # Rows from the live ingestion directory, when it is configured (see ingest.py)
+    from ingest import apply_deltas
+    return apply_deltas(kind, df, **params)
+
+
+def load_projects(path: str = PROJECTS_CSV, city: str = "Menlo Park"):
+    """Cleaned projects frame and count of rows dropped for missing coordinates.
+
+    Uses the compiled snapshot when it is current; rows rejected at build
+    time were already reported by compile_data.py, so the count is 0.
+    """
+    snapshot = snapshot_for("projects", path, city=city)
+    df = _load("projects", path, snapshot, _load_projects, _build_projects, city)
+    return _with_deltas("projects", df, city=city), df.attrs.get("dropped_rows", 0)
+
+
+def load_stances(path: str = STANCES_CSV) -> pd.DataFrame:
+    """Council member stances, one row per member."""
+    return _load("stances", path, snapshot_for("stances", path), _load_stances, pd.read_csv)
+
+
+def load_topics(path: str = TOPICS_CSV) -> pd.DataFrame:
+    """Meeting topics with display columns for the chart and meetings table."""
+    df = _load("topics", path, snapshot_for("topics", path), _load_topics, _build_topics)
+    return _with_deltas("topics", df)
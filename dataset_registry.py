@@ -0,0 +1,168 @@
+"""Registry of the cities and reporting periods this deployment serves.
+
+datasets.json lists one entry per (city, period):
+
+    {
+      "default": "menlo-park-2025",
+      "datasets": [
+        {"id": "menlo-park-2025", "city": "Menlo Park", "period": "Jan–Aug 2025",
+         "files": {"projects": "...csv", "stances": "...csv", "topics": "...csv"},
+         "map_center": [37.45, -122.18],
+         "intro": "content/menlo-park-2025/intro.md",
+         "overview": "content/menlo-park-2025/overview.md",
+         "videos": [{"title": "...", "key": "...", "blurb": "...", "url": "https://player.vimeo.com/video/..."}],
+         "landing_page": "https://..."}
+      ]
+    }
+
+Paths are relative to datasets.json. Only "id", "city" and "files" are
+required. Entries are cheap descriptions; no data file is read until a
+dataset is selected, and everything derived from one (frames, map, search
+index, chart specs) lives in size-bounded caches keyed by the dataset's
+fingerprint, so the least recently used selections are evicted and memory
+doesn't grow with the number of registered cities.
+
+Without a datasets.json the app serves the default Menlo Park files.
+"""
+
+import functools
+import json
+import os
+
+import streamlit as st
+
+from data_loader import PROJECTS_CSV, STANCES_CSV, TOPICS_CSV, file_fingerprint
+
+REGISTRY_PATH = "datasets.json"
+
+# The same logo heads every city's page, in the app and the static export
+LOGO_PATH = "images/LWA-v2-square.png"
+
+_QUERY_PARAM = "dataset"
+
+
+class Dataset:
+    """One city and reporting period: data files, map center and page content."""
+
+    def __init__(self, entry: dict, base_dir: str = ""):
+        def resolve(path):
+            return os.path.join(base_dir, path) if path and not os.path.isabs(path) else path
+
+        self.id = entry["id"]
+        self.city = entry["city"]
+        self.period = entry.get("period", "")
+        self.title = entry.get("title") or f"{self.city} City Council Recap"
+        files = entry["files"]
+        self.projects = resolve(files["projects"])
+        self.stances = resolve(files["stances"])
+        self.topics = resolve(files["topics"])
+        center = entry.get("map_center")
+        self.map_center = tuple(center) if center else None
+        self.intro_path = resolve(entry.get("intro"))
+        self.overview_path = resolve(entry.get("overview"))
+        # (tab title, key, blurb, player URL), as video_facade expects
+        self.videos = [(v["title"], v["key"], v.get("blurb", ""), v["url"]) for v in entry.get("videos", [])]
+        self.landing_page = entry.get("landing_page", "")
+
+    @property
+    def label(self) -> str:
+        return f"{self.city} — {self.period}" if self.period else self.city
+
+    @property
+    def intro(self) -> str:
+        return _read_text(self.intro_path)
+
+    @property
+    def overview(self) -> str:
+        return _read_text(self.overview_path)
+
+    def __repr__(self):
+        return f"Dataset({self.id!r})"
+
+
+def _read_text(path) -> str:
+    if not path or not os.path.exists(path):
+        return ""
+    return _read_text_cached(path, file_fingerprint(path))
+
+
+@functools.lru_cache(maxsize=32)
+def _read_text_cached(path: str, fingerprint: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+DEFAULT_ENTRY = {
+    "id": "menlo-park-2025",
+    "city": "Menlo Park",
+    "files": {"projects": PROJECTS_CSV, "stances": STANCES_CSV, "topics": TOPICS_CSV},
+    "intro": "content/menlo-park-2025/intro.md",
+    "overview": "content/menlo-park-2025/overview.md",
+}
+
+
+@functools.lru_cache(maxsize=4)
+def _parse_registry(path: str, fingerprint: str):
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    base_dir = os.path.dirname(path)
+    datasets = {}
+    for entry in manifest.get("datasets", []):
+        if entry["id"] in datasets:
+            raise ValueError(f"{path}: duplicate dataset id {entry['id']!r}")
+        datasets[entry["id"]] = Dataset(entry, base_dir)
+    if not datasets:
+        raise ValueError(f"{path}: no datasets registered")
+    default = manifest.get("default")
+    return datasets, default if default in datasets else next(iter(datasets))
+
+
+def load_registry(path: str = REGISTRY_PATH):
+    """({id: Dataset}, default id), re-read only when the registry file changes."""
+    if not os.path.exists(path):
+        dataset = Dataset(DEFAULT_ENTRY)
+        return {dataset.id: dataset}, dataset.id
+    return _parse_registry(path, file_fingerprint(path))
+
+
+def get_dataset(dataset_id: str = None, path: str = REGISTRY_PATH) -> Dataset:
+    datasets, default = load_registry(path)
+    if dataset_id is None:
+        return datasets[default]
+    if dataset_id not in datasets:
+        raise KeyError(f"unknown dataset {dataset_id!r}; registered: {', '.join(datasets)}")
+    return datasets[dataset_id]
+
+
+def _sync_query_param():
+    st.query_params[_QUERY_PARAM] = st.session_state["_dataset_id"]
+
+
+def select_dataset(path: str = REGISTRY_PATH) -> Dataset:
+    """City/period selector in the sidebar; returns the selected dataset.
+
+    The selection is kept in the ?dataset= query parameter so links open
+    the same city and period. With one registered dataset no selector is shown.
+    """
+    datasets, default = load_registry(path)
+    requested = st.query_params.get(_QUERY_PARAM)
+    if "_dataset_id" not in st.session_state or st.session_state["_dataset_id"] not in datasets:
+        st.session_state["_dataset_id"] = requested if requested in datasets else default
+    if len(datasets) == 1:
+        return datasets[st.session_state["_dataset_id"]]
+
+    cities = sorted({d.city for d in datasets.values()})
+    current = datasets[st.session_state["_dataset_id"]]
+    if st.session_state.get("_dataset_city") not in cities:
+        st.session_state["_dataset_city"] = current.city
+    with st.sidebar:
+        city = st.selectbox("City", cities, key="_dataset_city")
+        periods = [d for d in datasets.values() if d.city == city]
+        if current.city != city:
+            # New city: open its most recently registered period
+            st.session_state["_dataset_id"] = periods[-1].id
+            _sync_query_param()
+        st.selectbox("Reporting period", [d.id for d in periods], key="_dataset_id",
+                     format_func=lambda dataset_id: datasets[dataset_id].period or dataset_id,
+                     on_change=_sync_query_param)
+    return datasets[st.session_state["_dataset_id"]]
@@ -0,0 +1,147 @@
+"""Sorted date indexes for filtering the recap by a date range.
+
+Meeting Date is a normalized datetime64 column in the loaded frames (see
+data_loader.clean_topics), and so are the projects' earliest/latest_mention_date,
+with NaT for unknown (data_loader.clean_projects). Each index sorts them once
+per dataset version into a datetime64 array plus the row order, so a
+range query is two binary searches instead of a comparison over every row:
+
+  * MeetingIndex: meetings whose Date falls in the range
+  * MentionIndex: projects whose mention interval [earliest, latest]
+    overlaps the range. A project with only one date is treated as
+    mentioned on that day; projects with no usable dates are always kept,
+    since they can't be placed in time
+
+Filtered frames get their own fingerprint (see filter_rows), so the map,
+chart specs and table positions are cached per range as well.
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import cache_metrics
+
+
+def _datetimes(values: pd.Series) -> np.ndarray:
+    # A no-op for the loaded datetime64 columns; 'N/A' and other unparseable strings become NaT
+    return pd.to_datetime(values, errors="coerce", format="mixed").to_numpy(dtype="datetime64[ns]")
+
+
+def _day(value) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).normalize(), "ns")
+
+
+class SortedDates:
+    """Row positions ordered by date; NaT rows are left out of lookups."""
+
+    def __init__(self, values: np.ndarray):
+        self.order = np.argsort(values, kind="stable")  # NaT sorts last
+        self.sorted = values[self.order]
+        self.valid = int(np.count_nonzero(~np.isnat(self.sorted)))
+
+    def upto(self, end) -> np.ndarray:
+        """Positions dated on or before end."""
+        return self.order[:np.searchsorted(self.sorted[:self.valid], _day(end), side="right")]
+
+    def since(self, start) -> np.ndarray:
+        """Positions dated on or after start."""
+        return self.order[np.searchsorted(self.sorted[:self.valid], _day(start), side="left"):self.valid]
+
+    def between(self, start, end) -> np.ndarray:
+        dated = self.sorted[:self.valid]
+        lo = np.searchsorted(dated, _day(start), side="left")
+        hi = np.searchsorted(dated, _day(end), side="right")
+        return self.order[lo:max(lo, hi)]
+
+    def bounds(self):
+        """(earliest, latest) date, or None when nothing is dated."""
+        if not self.valid:
+            return None
+        return pd.Timestamp(self.sorted[0]), pd.Timestamp(self.sorted[self.valid - 1])
+
+
+class MeetingIndex:
+    def __init__(self, chart_df: pd.DataFrame):
+        self.size = len(chart_df)
+        self.dates = SortedDates(_datetimes(chart_df["Date"]))
+
+    def positions(self, start, end) -> np.ndarray:
+        """Meetings in [start, end], in frame order."""
+        return np.sort(self.dates.between(start, end))
+
+    def bounds(self):
+        return self.dates.bounds()
+
+
+class MentionIndex:
+    def __init__(self, projects_df: pd.DataFrame):
+        self.size = len(projects_df)
+        first = _datetimes(projects_df["earliest_mention_date"]) if "earliest_mention_date" in projects_df \
+            else np.full(self.size, np.datetime64("NaT"), dtype="datetime64[ns]")
+        last = _datetimes(projects_df["latest_mention_date"]) if "latest_mention_date" in projects_df \
+            else first.copy()
+        # One known date stands for both ends of the interval
+        first, last = np.where(np.isnat(first), last, first), np.where(np.isnat(last), first, last)
+        self.undated = np.flatnonzero(np.isnat(first))
+        self.starts = SortedDates(first)
+        self.ends = SortedDates(last)
+
+    def positions(self, start, end) -> np.ndarray:
+        """Projects whose mention interval overlaps [start, end], in frame order."""
+        keep = np.zeros(self.size, dtype=bool)
+        keep[self.starts.upto(end)] = True
+        ended = np.zeros(self.size, dtype=bool)
+        ended[self.ends.since(start)] = True
+        keep &= ended
+        keep[self.undated] = True
+        return np.flatnonzero(keep)
+
+    def bounds(self):
+        early, late = self.starts.bounds(), self.ends.bounds()
+        return (early[0], late[1]) if early and late else None
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _cached_meeting_index(dataset_key: str, _chart_df: pd.DataFrame) -> MeetingIndex:
+    cache_metrics.mark_miss()
+    return MeetingIndex(_chart_df)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _cached_mention_index(dataset_key: str, _projects_df: pd.DataFrame) -> MentionIndex:
+    cache_metrics.mark_miss()
+    return MentionIndex(_projects_df)
+
+
+def get_meeting_index(chart_df: pd.DataFrame) -> MeetingIndex:
+    """Date index for this topics dataset, built once and shared by all sessions."""
+    return cache_metrics.tracked("date_index", _cached_meeting_index, chart_df.attrs.get("fingerprint", ""), chart_df)
+
+
+def get_mention_index(projects_df: pd.DataFrame) -> MentionIndex:
+    """Mention-interval index for this projects dataset, built once and shared by all sessions."""
+    return cache_metrics.tracked("date_index", _cached_mention_index, projects_df.attrs.get("fingerprint", ""),
+                                 projects_df)
+
+
+def date_bounds(*indexes):
+    """(earliest, latest) over the indexes that have dates, or None."""
+    spans = [b for b in (index.bounds() for index in indexes) if b]
+    if not spans:
+        return None
+    return min(s[0] for s in spans), max(s[1] for s in spans)
+
+
+def filter_rows(df: pd.DataFrame, positions: np.ndarray, start, end) -> pd.DataFrame:
+    """Rows of df at positions, fingerprinted by the range so derived caches stay per range.
+
+    Returns df itself when every row is kept.
+    """
+    if len(positions) == len(df):
+        return df
+    out = df.iloc[positions]
+    attrs = {k: v for k, v in df.attrs.items() if k != "delta"}
+    attrs["fingerprint"] = f"{df.attrs.get('fingerprint', '')}@{pd.Timestamp(start):%Y-%m-%d}..{pd.Timestamp(end):%Y-%m-%d}"
+    out.attrs = attrs
+    return out
@@ -0,0 +1,251 @@
+"""Links between projects and the meetings and council members that discuss them.
+
+Projects are matched once per dataset version against every meeting topic
+bullet (Major_Topics) and council member position bullet (Key Positions):
+
+  * by name: the bullet contains enough of the project name's terms,
+    weighted by how rare each term is across all bullets (MIN_COVERAGE),
+    so "Downtown Development Parking Plazas 1-3 - RFQ discussion" links to
+    "Development on Downtown Parking Plazas 1, 2 and/or 3" while generic
+    words like "project" or "program" count for little
+  * by address: the bullet contains the street number and street name
+    ("80 Willow Rd EIR ..."). Addresses shared by several projects, such
+    as City Hall, identify none of them
+
+Candidate bullets come from an inverted index over the rarest name terms,
+and each distinct bullet text is tokenized once, so building stays well
+below the cost of comparing every project with every bullet.
+
+Matches are expanded to (project, row) pairs with numpy, never as Python
+tuples: with many near-identical projects and meetings (as in the synthetic
+1000x data) there are tens of millions of them.
+
+The result is a LinkIndex: compressed (CSR) arrays from projects to
+meetings and council members and back, looked up by key in constant time.
+"""
+
+import hashlib
+import math
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import cache_metrics
+from data_loader import date_keys, frames_key
+from text_utils import split_bullets, tokenize
+
+# Share of a project name's term weight a bullet must contain to mention it
+MIN_COVERAGE = 0.6
+# ... and at least this many of its terms (fewer if the name is shorter)
+MIN_TERMS = 2
+
+
+def _csr(rows: np.ndarray, cols: np.ndarray, n_rows: int, n_cols: int):
+    """(indptr, indices) of the sorted, de-duplicated (row, col) pairs."""
+    # One int64 key per pair, sorted and de-duplicated in place: np.unique on rows
+    # of a 2-D array (or its hash path on large inputs) is many times slower
+    keys = np.asarray(rows, dtype=np.int64) * max(n_cols, 1) + np.asarray(cols, dtype=np.int64)
+    keys.sort()
+    keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+    indptr = np.zeros(n_rows + 1, dtype=np.int32)
+    np.cumsum(np.bincount(keys // max(n_cols, 1), minlength=n_rows), out=indptr[1:])
+    return indptr, (keys % max(n_cols, 1)).astype(np.int32)
+
+
+class LinkIndex:
+    """Bidirectional project <-> meeting and project <-> council member links.
+
+    Rows are positions in the frames the index was built from; the *_for
+    methods take and return keys (project name, meeting Date, member name).
+    Several meetings can share a Date, so meetings are also looked up by row
+    (projects_for_meeting_row), and projects_for_meeting(date) covers all of them.
+    meeting_pairs and member_pairs are (project rows, other rows) arrays.
+    """
+
+    def __init__(self, key: str, projects: list, meetings: list, members: list, meeting_pairs, member_pairs):
+        self.key = key
+        self.projects, self.meetings, self.members = projects, meetings, members
+        # First row wins for duplicate project and member keys
+        self._project_pos = {k: i for i, k in reversed(list(enumerate(projects)))}
+        self._member_pos = {k: i for i, k in reversed(list(enumerate(members)))}
+        self._meeting_rows = defaultdict(list)
+        for i, k in enumerate(meetings):
+            self._meeting_rows[k].append(i)
+
+        p, m = meeting_pairs
+        self._project_meetings = _csr(p, m, len(projects), len(meetings))
+        self._meeting_projects = _csr(m, p, len(meetings), len(projects))
+        p, c = member_pairs
+        self._project_members = _csr(p, c, len(projects), len(members))
+        self._member_projects = _csr(c, p, len(members), len(projects))
+
+        self.meeting_counts = np.diff(self._project_meetings[0])
+        self.member_counts = np.diff(self._project_members[0])
+
+    @staticmethod
+    def _row(csr, pos):
+        indptr, indices = csr
+        return indices[indptr[pos]:indptr[pos + 1]]
+
+    def _lookup(self, positions: dict, csr, keys: list, key) -> list:
+        pos = positions.get(key)
+        return [] if pos is None else [keys[i] for i in self._row(csr, pos)]
+
+    def meetings_for(self, project) -> list:
+        return self._lookup(self._project_pos, self._project_meetings, self.meetings, project)
+
+    def members_for(self, project) -> list:
+        return self._lookup(self._project_pos, self._project_members, self.members, project)
+
+    def projects_for_meeting(self, date) -> list:
+        rows = self._meeting_rows.get(date, ())
+        return list(dict.fromkeys(k for row in rows for k in self.projects_for_meeting_row(row)))
+
+    def projects_for_meeting_row(self, row: int) -> list:
+        return [self.projects[i] for i in self._row(self._meeting_projects, row)]
+
+    def projects_for_member(self, member) -> list:
+        return self._lookup(self._member_pos, self._member_projects, self.projects, member)
+
+    def counts(self, project):
+        """(meetings, council members) that mention a project."""
+        pos = self._project_pos.get(project)
+        return (0, 0) if pos is None else (int(self.meeting_counts[pos]), int(self.member_counts[pos]))
+
+    def nbytes(self) -> int:
+        arrays = (*self._project_meetings, *self._meeting_projects, *self._project_members, *self._member_projects)
+        return sum(a.nbytes for a in arrays)
+
+
+def _address_pair(address) -> tuple:
+    """(street number, first street name term) of an address, or None."""
+    terms = tokenize(address) if isinstance(address, str) else []
+    if len(terms) >= 2 and terms[0].isdigit() and not terms[1].isdigit():
+        return terms[0], terms[1]
+    return None
+
+
+def _bullets(frame: pd.DataFrame, column: str):
+    """(row position, bullet text) for every bullet in a markdown list column."""
+    for pos, text in enumerate(frame[column]):
+        for item in split_bullets(text):
+            yield pos, item
+
+
+def match_projects(projects: pd.DataFrame, bullets: list):
+    """(project positions, bullet positions) arrays pairing each project with the bullets that mention it."""
+    # Each distinct bullet text is tokenized once
+    texts = list(dict.fromkeys(bullets))
+    text_ids = {text: i for i, text in enumerate(texts)}
+    token_lists = [tokenize(text) for text in texts]
+    term_sets = [set(tokens) for tokens in token_lists]
+    postings = defaultdict(list)
+    for i, terms in enumerate(term_sets):
+        for term in terms:
+            postings[term].append(i)
+    weight_of = {term: math.log(1 + len(texts) / (1 + len(ids))) for term, ids in postings.items()}
+    unseen = math.log(1 + len(texts))
+
+    addresses = [_address_pair(a) for a in projects["address"]] if "address" in projects else [None] * len(projects)
+    shared = {pair for pair, n in Counter(a for a in addresses if a).items() if n > 1}
+
+    matched_texts = []
+    for name, address in zip(projects["project"], addresses):
+        terms = sorted(set(tokenize(name)), key=lambda t: weight_of.get(t, unseen), reverse=True)
+        weights = [weight_of.get(t, unseen) for t in terms]
+        total = sum(weights)
+        hits = set()
+        if terms:
+            # A bullet covering MIN_COVERAGE of the weight must contain one of the
+            # heaviest terms making up more than the remaining share
+            prefix, running = [], 0.0
+            for term, weight in zip(terms, weights):
+                prefix.append(term)
+                running += weight
+                if running > (1 - MIN_COVERAGE) * total:
+                    break
+            candidates = {i for term in prefix for i in postings.get(term, ())}
+            need = min(MIN_TERMS, len(terms))
+            for i in candidates:
+                present = [w for t, w in zip(terms, weights) if t in term_sets[i]]
+                if len(present) >= need and sum(present) >= MIN_COVERAGE * total:
+                    hits.add(i)
+        if address and address not in shared:
+            number, street = address
+            for i in postings.get(number, ()):
+                tokens = token_lists[i]
+                if any(a == number and b == street for a, b in zip(tokens, tokens[1:])):
+                    hits.add(i)
+        matched_texts.append(hits)
+
+    # Bullet positions grouped by text, then each (project, text) hit expanded to its bullets
+    bullet_texts = np.fromiter((text_ids[text] for text in bullets), dtype=np.int64, count=len(bullets))
+    by_text = np.argsort(bullet_texts, kind="stable")
+    text_starts = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(bullet_texts, minlength=len(texts)), out=text_starts[1:])
+    hit_projects = np.fromiter((p for p, hits in enumerate(matched_texts) for _ in hits), dtype=np.int64)
+    hit_texts = np.fromiter((i for hits in matched_texts for i in hits), dtype=np.int64)
+    lengths = text_starts[hit_texts + 1] - text_starts[hit_texts]
+    offsets = np.repeat(text_starts[hit_texts] - (np.cumsum(lengths) - lengths), lengths)
+    return np.repeat(hit_projects, lengths), by_text[offsets + np.arange(int(lengths.sum()))]
+
+
+def build_link_index(projects: pd.DataFrame, stances: pd.DataFrame, topics: pd.DataFrame, key: str = "") -> LinkIndex:
+    meeting_bullets = list(_bullets(topics, "Major_Topics"))
+    member_bullets = list(_bullets(stances, "Key Positions"))
+    bullets = meeting_bullets + member_bullets
+    p, b = match_projects(projects, [text for _, text in bullets])
+    rows = np.fromiter((pos for pos, _ in bullets), dtype=np.int64, count=len(bullets))[b]
+    in_meeting = b < len(meeting_bullets)
+    return LinkIndex(
+        key, [str(k) for k in projects["project"]], date_keys(topics["Date"]),
+        [str(k) for k in stances["Council Member"]],
+        (p[in_meeting], rows[in_meeting]), (p[~in_meeting], rows[~in_meeting]),
+    )
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _cached_index(dataset_key: str, _projects, _stances, _topics) -> LinkIndex:
+    cache_metrics.mark_miss()
+    return build_link_index(_projects, _stances, _topics, dataset_key)
+
+
+def get_link_index(projects: pd.DataFrame, stances: pd.DataFrame, topics: pd.DataFrame) -> LinkIndex:
+    """Link index for this version of the three datasets, built once and shared by all sessions."""
+    return cache_metrics.tracked("link_index", _cached_index, frames_key((projects, stances, topics)),
+                                 projects, stances, topics)
+
+
+def _annotated(df: pd.DataFrame, columns: dict, links: LinkIndex) -> pd.DataFrame:
+    out = df.assign(**columns)
+    out.attrs = {k: v for k, v in df.attrs.items() if k != "delta"}
+    # Links also depend on the other datasets, so their versions go into the fingerprint
+    out.attrs["fingerprint"] = f"{df.attrs.get('fingerprint', '')}+links-{hashlib.sha1(links.key.encode()).hexdigest()[:12]}"
+    return out
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _cached_annotation(kind: str, dataset_key: str, links_key: str, _df: pd.DataFrame, _links: LinkIndex):
+    cache_metrics.mark_miss()
+    if kind == "projects":
+        meetings, members = zip(*(_links.counts(str(k)) for k in _df["project"])) if len(_df) else ((), ())
+        return _annotated(_df, {"meetings": list(meetings), "council_members": list(members)}, _links)
+    # By row, not Date: two meetings on one day each list their own projects
+    return _annotated(_df, {"Projects": [", ".join(_links.projects_for_meeting_row(row)) for row in range(len(_df))]}, _links)
+
+
+def with_project_links(projects: pd.DataFrame, links: LinkIndex) -> pd.DataFrame:
+    """Projects with 'meetings' and 'council_members' mention counts, built once per version."""
+    return cache_metrics.tracked("link_annotations", _cached_annotation, "projects",
+                                 projects.attrs.get("fingerprint", ""), links.key, projects, links)
+
+
+def with_meeting_links(topics: pd.DataFrame, links: LinkIndex) -> pd.DataFrame:
+    """Meetings with a 'Projects' column naming the projects they discussed, built once per version.
+
+    topics must be the frame the index was built from, so its rows line up with the index's meetings.
+    """
+    return cache_metrics.tracked("link_annotations", _cached_annotation, "meetings",
+                                 topics.attrs.get("fingerprint", ""), links.key, topics, links)
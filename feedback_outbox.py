@@ -0,0 +1,307 @@
+"""Durable outbox for feedback submissions.
+
+Submissions are written to a local SQLite database and acknowledged right
+away; a small pool of background threads delivers them over a shared,
+pooled requests.Session, retrying failures with exponential backoff.
+Undelivered rows survive restarts and are picked up again.
+
+Normally a worker claims and posts one row at a time. Once more than
+batch_threshold rows are due, it claims up to batch_size of them in one
+transaction and posts them together, batch_parallel at a time over the
+pooled connections, then records all the results in one transaction. The
+endpoints (an Apps Script web app and a Google Form) take one submission
+per request, so a batch is a set of concurrent posts, not one combined
+body.
+
+Several server processes can share one database. A worker leases a row
+while it posts it; rows whose lease ran out (their process died mid-post)
+go back to the queue. Delivered rows are pruned after sent_retention.
+
+Secrets such as the endpoint token are never stored: credentials(url) is
+called at send time and its fields are added to the posted body.
+"""
+
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("lwa.feedback")
+
+OUTBOX_DB = "feedback_outbox.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    encoding TEXT NOT NULL,          -- 'json' or 'form'
+    payload TEXT NOT NULL,           -- JSON-encoded body
+    expect_text TEXT,                -- substring the response must contain, if any
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending, sending, sent, failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    last_error TEXT,
+    claimed_at REAL,                 -- when a worker leased the row for sending
+    sent_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+class FeedbackOutbox:
+    """SQLite-backed queue of feedback posts with background delivery.
+
+    workers: number of delivery threads sharing one pooled session
+    max_attempts: deliveries tried before a row is marked 'failed'
+    base_delay: first retry delay in seconds, doubled per attempt up to max_delay
+    batch_threshold / batch_size: when more than batch_threshold rows are due,
+        each worker claims up to batch_size rows per round instead of one
+    batch_parallel: posts of one batch in flight at once
+    lease: seconds a claimed row stays with its worker before another may retry it;
+        well above the time a batch can take (batch_size / batch_parallel * timeout),
+        so a slow post is never sent twice
+    sent_retention: seconds delivered rows are kept (for counts()) before pruning
+    credentials: callable(url) returning the fields (e.g. {"token": ...}) to add
+        to a body posted to that url, read when it is sent
+    """
+
+    def __init__(self, db_path: str = OUTBOX_DB, workers: int = 2, max_attempts: int = 8,
+                 base_delay: float = 2.0, max_delay: float = 300.0, timeout: float = 10.0,
+                 batch_threshold: int = 10, batch_size: int = 25, batch_parallel: int = 4,
+                 lease: float = 120.0, sent_retention: float = 24 * 3600, credentials=None,
+                 session: requests.Session = None):
+        self.db_path = db_path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.batch_threshold = batch_threshold
+        self.batch_size = batch_size
+        self.batch_parallel = batch_parallel
+        self.lease = lease
+        self.sent_retention = sent_retention
+        self.credentials = credentials
+        self.session = session or self._pooled_session(workers * batch_parallel)
+        self._next_housekeeping = 0.0
+        # Threads are only started by the first batch
+        self._batch_pool = ThreadPoolExecutor(max_workers=max(batch_parallel, 1),
+                                              thread_name_prefix="feedback-batch")
+
+        self._db_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout = 5000")  # other processes may hold the write lock
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _pooled_session(connections: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(connections, 1))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    # Queueing
+
+    def enqueue(self, url: str, payload: dict, encoding: str = "json", expect_text: str = None) -> int:
+        """Store a submission for delivery and return its outbox id."""
+        now = time.time()
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "INSERT INTO outbox (url, encoding, payload, expect_text, next_attempt_at, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, encoding, json.dumps(payload), expect_text, now, now),
+            )
+        self._wakeup.set()
+        return cursor.lastrowid
+
+    def counts(self) -> dict:
+        """Number of rows per status, e.g. {'pending': 2, 'sent': 10}."""
+        with self._db_lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return dict(rows)
+
+    # Delivery
+
+    def _claim(self) -> list:
+        """Lease the next due rows to this worker and return them.
+
+        One row, or up to batch_size when more than batch_threshold are due.
+        """
+        now = time.time()
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                due = self._conn.execute(
+                    "SELECT COUNT(*) FROM outbox WHERE status = 'pending' AND next_attempt_at <= ?", (now,)
+                ).fetchone()[0]
+                limit = self.batch_size if due > self.batch_threshold else 1
+                rows = self._conn.execute(
+                    "SELECT id, url, encoding, payload, expect_text, attempts FROM outbox"
+                    " WHERE status = 'pending' AND next_attempt_at <= ?"
+                    " ORDER BY next_attempt_at LIMIT ?",
+                    (now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE outbox SET status = 'sending', claimed_at = ? WHERE id = ?",
+                    [(now, row[0]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return rows
+
+    def requeue_expired(self) -> int:
+        """Put rows whose lease ran out (e.g. their process died mid-post) back in the queue."""
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET status = 'pending', claimed_at = NULL"
+                " WHERE status = 'sending' AND (claimed_at IS NULL OR claimed_at < ?)",
+                (time.time() - self.lease,),
+            )
+        if cursor.rowcount:
+            logger.info("requeued %d feedback row(s) with expired leases", cursor.rowcount)
+        return cursor.rowcount
+
+    def prune(self) -> int:
+        """Delete rows delivered more than sent_retention seconds ago."""
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "DELETE FROM outbox WHERE status = 'sent' AND COALESCE(sent_at, created_at) < ?",
+                (time.time() - self.sent_retention,),
+            )
+        return cursor.rowcount
+
+    def _send(self, url, encoding, payload, expect_text):
+        """Post one submission; returns None on success or an error message."""
+        body = json.loads(payload)
+        if self.credentials is not None:
+            try:
+                body.update(self.credentials(url))
+            except Exception as e:
+                return f"credentials unavailable: {e}"
+        try:
+            if encoding == "json":
+                response = self.session.post(url, json=body, timeout=self.timeout)
+            else:
+                response = self.session.post(url, data=body, timeout=self.timeout)
+        except requests.RequestException as e:
+            return f"network error: {e}"
+        if not response.ok:
+            return f"HTTP {response.status_code}"
+        if expect_text and expect_text not in response.text:
+            return f"unexpected response: {response.text[:200]}"
+        return None
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = min(self.base_delay * (2 ** (attempts - 1)), self.max_delay)
+        return delay * random.uniform(0.8, 1.2)
+
+    def _record(self, row, error):
+        """Store the outcome of one post; call inside a transaction."""
+        row_id, attempts = row[0], row[5] + 1
+        if error is None:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'sent', attempts = ?, last_error = NULL, claimed_at = NULL,"
+                " sent_at = ? WHERE id = ?",
+                (attempts, time.time(), row_id),
+            )
+            logger.info("feedback delivered id=%s attempts=%s", row_id, attempts)
+        elif attempts >= self.max_attempts:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'failed', attempts = ?, last_error = ?, claimed_at = NULL"
+                " WHERE id = ?",
+                (attempts, error, row_id),
+            )
+            logger.warning("feedback delivery failed id=%s attempts=%s error=%s", row_id, attempts, error)
+        else:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'pending', attempts = ?, last_error = ?, claimed_at = NULL,"
+                " next_attempt_at = ? WHERE id = ?",
+                (attempts, error, time.time() + self._retry_delay(attempts), row_id),
+            )
+            logger.warning("feedback delivery failed id=%s attempts=%s error=%s", row_id, attempts, error)
+
+    def deliver_once(self) -> int:
+        """Claim and deliver the next due row or batch; returns the number of rows claimed."""
+        rows = self._claim()
+        if not rows:
+            return 0
+        if len(rows) == 1:
+            errors = [self._send(*rows[0][1:5])]
+        else:
+            # Posted together over the pooled connections; each row keeps its own lease and outcome
+            errors = list(self._batch_pool.map(lambda row: self._send(*row[1:5]), rows))
+            logger.info("feedback batch of %d posted, %d failed", len(rows), sum(e is not None for e in errors))
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for row, error in zip(rows, errors):
+                    self._record(row, error)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def _housekeeping(self):
+        # At most once per lease period across this process's workers
+        now = time.time()
+        with self._db_lock:
+            if now < self._next_housekeeping:
+                return
+            self._next_housekeeping = now + self.lease
+        self.requeue_expired()
+        self.prune()
+
+    def _seconds_until_due(self) -> float:
+        with self._db_lock:
+            next_due = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+            ).fetchone()[0]
+        if next_due is None:
+            return 60.0
+        return max(0.0, min(next_due - time.time(), 60.0))
+
+    def _worker(self):
+        while not self._stopping.is_set():
+            try:
+                self._housekeeping()
+                if self.deliver_once():
+                    continue
+            except Exception:
+                logger.exception("feedback outbox worker error")
+            self._wakeup.wait(self._seconds_until_due())
+            self._wakeup.clear()
+
+    def start(self):
+        """Start the workers; they requeue expired leases and prune delivered rows as they go.
+
+        Rows another live process is sending keep their lease, so they are not posted twice.
+        """
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"feedback-outbox-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._batch_pool.shutdown(wait=False)
@@ -1,55 +1,78 @@
 import streamlit as st
-import requests
-import datetime
+
+
+def _credentials(url: str) -> dict:
+    """Secret fields for a post to url, read from secrets when the outbox sends it."""
+    feedback = st.secrets["feedback"]
+    return {"token": feedback["token"]} if url == feedback["gas_url"] else {}
+
+
+@st.cache_resource
+def get_outbox():
+    """Process-wide feedback outbox with its delivery workers running."""
+    # Imported here so `requests` is only loaded once someone submits feedback
+    from feedback_outbox import FeedbackOutbox, OUTBOX_DB
+    return FeedbackOutbox(OUTBOX_DB, credentials=_credentials).start()
 
 
 def feedback_sidebar(city_name: str):
     """Reusable sidebar for collecting feedback from different city apps."""
+    with st.sidebar:
+        _feedback_form(city_name)
+
 
-    st.sidebar.markdown("---")
-    st.sidebar.markdown(f"### 💬 {city_name.title()} Feedback")
-#    st.sidebar.write(
+# Runs as a fragment so typing feedback or submitting it reruns only the
+# sidebar form, not the rest of the page. Fragments can't write to the
+# sidebar from elsewhere, so the form is drawn inside `with st.sidebar`.
+@st.fragment
+def _feedback_form(city_name: str):
+
+    st.markdown("---")
+    st.markdown(f"### 💬 {city_name.title()} Feedback")
+#    st.write(
 #        f"Please report issues and share suggestions."
 #    )
 
-    # feedback_type = st.sidebar.selectbox(
+    # feedback_type = st.selectbox(
     #     "Type of feedback:",
     #     ["Data issue or bug", "Suggestion", "Other comment"],
     # )
     feedback_type = "General"
 
-    feedback_text = st.sidebar.text_area(
+    feedback_text = st.text_area(
         "Suggestion, bug or comment:",
         placeholder="Example: Could this recap include voting history...",
     )
 
-    # rating = st.sidebar.radio(
+    # rating = st.radio(
     #     "How useful is this recap?",
     #     ["⭐", "⭐⭐", "⭐⭐⭐", "⭐⭐⭐⭐", "⭐⭐⭐⭐⭐"],
     #     horizontal=True,
     # )
     rating = "null"
 
-    contact_email = st.sidebar.text_input(
+    contact_email = st.text_input(
         "Your email (optional)",
         placeholder="you@example.com",
     )
 # CTA to join mailing list
-    st.sidebar.markdown(
+    st.markdown(
         f"📬 Open to questions re: your feedback? Please add your email above."
     )
 
     # Load secrets securely
     try:
         gas_url = st.secrets["feedback"]["gas_url"]
-        secret_token = st.secrets["feedback"]["token"]
+        # The token is added by the outbox when it sends, never stored with the feedback
+        if "token" not in st.secrets["feedback"]:
+            raise KeyError("token")
     except Exception:
-        st.sidebar.error("⚠️ Missing Google Apps Script credentials. Check secrets.toml or Streamlit Cloud settings.")
+        st.error("⚠️ Missing Google Apps Script credentials. Check secrets.toml or Streamlit Cloud settings.")
         return
 
-    if st.sidebar.button("📨 Submit Feedback"):
+    if st.button("📨 Submit Feedback"):
         if not feedback_text.strip():
-            st.sidebar.warning("Please enter some feedback before submitting.")
+            st.warning("Please enter some feedback before submitting.")
         else:
             payload = {
                 "city_name": city_name,      # 👈 added city name field
@@ -57,24 +80,17 @@ def feedback_sidebar(city_name: str):
                 "feedback_text": feedback_text,
                 "rating": rating,
                 "contact_email": contact_email,
-                "token": secret_token,
             }
 
+            # Queue for background delivery so a slow endpoint never blocks the page
             try:
-                response = requests.post(gas_url, json=payload, timeout=5)
-                if response.status_code == 200 and "success" in response.text:
-                    st.sidebar.success("✅ Feedback sent successfully! Thank you.")
-                else:
-                    st.sidebar.error("⚠️ Could not send feedback. Try again later.")
-                    st.sidebar.caption(f"Response: {response.text}")
+                get_outbox().enqueue(gas_url, payload, encoding="json", expect_text="success")
+                st.success("✅ Feedback queued for delivery. Thank you!")
             except Exception as e:
-                st.sidebar.error(f"Network error: {e}")
+                st.error(f"⚠️ Could not save feedback: {e}")
 
     # Optional footer
-    st.sidebar.markdown("---")
-    st.sidebar.markdown(
+    st.markdown("---")
+    st.markdown(
         "Prefer a form? [Submit feedback via Google Form](https://link.lyndonwong.com/mp-council-dashboard-feedback)"
     )
-
-
-
@@ -0,0 +1,337 @@
+"""Batch geocoding for the projects CSV with a persistent cache.
+
+Rows missing latitude/longitude are geocoded from street_address, city,
+state and zip_code:
+
+  * manual overrides (geocode_overrides.csv) always win, matched by
+    project_name or, for rows without one, by normalized address
+  * results are cached on disk by normalized address, including addresses
+    the backend couldn't find, so re-running over an unchanged file makes
+    no lookups
+  * cache misses are looked up by a pool of worker threads sharing one
+    rate limit (Nominatim's usage policy allows one request per second)
+
+Backends are objects with a `geocode(query) -> (lat, lon) | None` method.
+"nominatim" uses OpenStreetMap's public service; "table" looks addresses
+up in a local CSV so the stage can run offline. Any other backend can be
+given as "package.module:ClassName".
+
+Usage:
+    python geocoder.py --out projects_geocoded.csv
+    python geocoder.py --backend table --table known_addresses.csv --refresh
+    python geocoder.py --in-place
+"""
+
+import argparse
+import concurrent.futures
+import datetime
+import importlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from data_loader import PROJECTS_CSV, SNAPSHOT_DIR
+
+logger = logging.getLogger("lwa.geocode")
+
+GEOCODE_CACHE = os.path.join(SNAPSHOT_DIR, "geocode_cache.json")
+OVERRIDES_CSV = "geocode_overrides.csv"
+# Lookups between cache writes, so an interrupted run keeps most of its work
+SAVE_EVERY = 25
+ADDRESS_COLUMNS = ['street_address', 'city', 'state', 'zip_code']
+
+# Word forms unified before cache lookups, so "335 Pierce Rd." and "335 Pierce Road" share an entry
+_ABBREVIATIONS = {
+    "ave": "avenue", "av": "avenue", "blvd": "boulevard", "ct": "court", "dr": "drive",
+    "ln": "lane", "pkwy": "parkway", "pl": "place", "rd": "road", "st": "street",
+    "n": "north", "s": "south", "e": "east", "w": "west",
+}
+
+
+class GeocodeError(Exception):
+    """A lookup failed (network error, HTTP error, bad response); it is retried on the next run."""
+
+
+def _part(value) -> str:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    text = str(value).strip()
+    if text.lower() in ("", "n/a", "na", "nan", "none"):
+        return ""
+    # Zip codes read from CSV as floats (94025.0)
+    return text[:-2] if re.fullmatch(r"\d+\.0", text) else text
+
+
+def address_query(street, city, state, zip_code) -> str:
+    """Human-readable query for the backend, skipping missing parts."""
+    return ", ".join(p for p in (_part(street), _part(city), _part(state), _part(zip_code)) if p)
+
+
+def normalize_address(street, city, state, zip_code) -> str:
+    """Cache key for an address: lowercase words, no punctuation, common abbreviations expanded."""
+    words = re.findall(r"[a-z0-9]+", address_query(street, city, state, zip_code).lower())
+    return " ".join(_ABBREVIATIONS.get(w, w) for w in words)
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across all threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class GeocodeCache:
+    """JSON file of normalized address -> {"lat", "lon", "status", "provider", "at"}."""
+
+    def __init__(self, path: str = GEOCODE_CACHE):
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                self._entries = json.load(f)
+
+    def get(self, key: str):
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, coords, provider: str):
+        entry = {
+            "lat": coords[0] if coords else None,
+            "lon": coords[1] if coords else None,
+            "status": "ok" if coords else "not_found",
+            "provider": provider,
+            "at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        }
+        with self._lock:
+            self._entries[key] = entry
+
+    def save(self):
+        """Write atomically so an interrupted run never leaves a truncated cache."""
+        with self._lock:
+            data = json.dumps(self._entries, indent=1, sort_keys=True)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(data + "\n")
+        os.replace(tmp, self.path)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class NominatimGeocoder:
+    """OpenStreetMap Nominatim search API (https://nominatim.org/release-docs/latest/api/Search/)."""
+
+    name = "nominatim"
+
+    def __init__(self, url: str = "https://nominatim.openstreetmap.org/search",
+                 user_agent: str = "lwa-recap-geocoder", timeout: float = 10.0, country: str = "us"):
+        import requests
+        self.url = url
+        self.timeout = timeout
+        self.country = country
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+
+    def geocode(self, query: str):
+        import requests
+        try:
+            response = self.session.get(
+                self.url, params={"q": query, "format": "jsonv2", "limit": 1, "countrycodes": self.country},
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            raise GeocodeError(str(e)) from e
+        if response.status_code >= 400:
+            raise GeocodeError(f"HTTP {response.status_code} for {query!r}")
+        try:
+            results = response.json()
+            if not results:
+                return None
+            return float(results[0]["lat"]), float(results[0]["lon"])
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise GeocodeError(f"unexpected response for {query!r}: {e}") from e
+
+
+class TableGeocoder:
+    """Offline stand-in: looks addresses up in a CSV of address,latitude,longitude."""
+
+    name = "table"
+
+    def __init__(self, path: str, delay: float = 0.0):
+        table = pd.read_csv(path)
+        self.delay = delay
+        self.coords = {
+            normalize_address(address, None, None, None): (float(lat), float(lon))
+            for address, lat, lon in zip(table['address'], table['latitude'], table['longitude'])
+        }
+
+    def geocode(self, query: str):
+        if self.delay:
+            time.sleep(self.delay)
+        return self.coords.get(normalize_address(query, None, None, None))
+
+
+BACKENDS = {"nominatim": NominatimGeocoder, "table": TableGeocoder}
+
+
+def make_backend(spec: str, **kwargs):
+    """Backend by registry name or "package.module:ClassName"."""
+    if spec in BACKENDS:
+        return BACKENDS[spec](**kwargs)
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"unknown geocoder backend {spec!r}; use one of {sorted(BACKENDS)} or module:Class")
+    return getattr(importlib.import_module(module_name), class_name)(**kwargs)
+
+
+def load_overrides(path: str = OVERRIDES_CSV):
+    """({project_name: (lat, lon)}, {normalized address: (lat, lon)}) from the overrides CSV."""
+    by_project, by_address = {}, {}
+    if not path or not os.path.exists(path):
+        return by_project, by_address
+    table = pd.read_csv(path, dtype=str)
+    for row in table.to_dict("records"):
+        coords = (float(row['latitude']), float(row['longitude']))
+        if _part(row.get('project_name')):
+            by_project[row['project_name'].strip()] = coords
+        else:
+            by_address[normalize_address(*(row.get(c) for c in ADDRESS_COLUMNS))] = coords
+    return by_project, by_address
+
+
+def geocode_projects(raw: pd.DataFrame, backend, cache: GeocodeCache, overrides=({}, {}),
+                     workers: int = 4, rate: float = 1.0, refresh: bool = False):
+    """Fill latitude/longitude for the projects in raw.
+
+    Only rows missing coordinates are geocoded unless refresh is set, which
+    also looks every address up again instead of using the cache; overrides
+    apply to every row. Returns the updated copy and a dict of counts
+    (overridden, cached, looked_up, found, not_found, failed).
+    """
+    df = raw.copy()
+    lat = pd.to_numeric(df['latitude'], errors='coerce')
+    lon = pd.to_numeric(df['longitude'], errors='coerce')
+    parts = [df[c] if c in df.columns else pd.Series(None, index=df.index) for c in ADDRESS_COLUMNS]
+    keys = [normalize_address(*p) for p in zip(*parts)]
+    queries = [address_query(*p) for p in zip(*parts)]
+    by_project, by_address = overrides
+    stats = dict.fromkeys(["overridden", "cached", "looked_up", "found", "not_found", "failed"], 0)
+
+    todo = {}  # cache key -> query, for misses
+    wanted = []  # (row position, cache key)
+    for pos, (name, key) in enumerate(zip(df['project_name'].astype(str).str.strip(), keys)):
+        coords = by_project.get(name) or by_address.get(key)
+        if coords:
+            lat.iat[pos], lon.iat[pos] = coords
+            stats["overridden"] += 1
+            continue
+        if not refresh and pd.notna(lat.iat[pos]) and pd.notna(lon.iat[pos]):
+            continue
+        if not key:
+            continue
+        wanted.append((pos, key))
+        if refresh or cache.get(key) is None:
+            todo.setdefault(key, queries[pos])
+
+    limiter = RateLimiter(rate)
+
+    def lookup(key, query):
+        limiter.wait()
+        return key, backend.geocode(query)
+
+    provider = getattr(backend, "name", type(backend).__name__)
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            futures = {pool.submit(lookup, key, query): key for key, query in todo.items()}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    key, coords = future.result()
+                except Exception as e:
+                    # One bad lookup (or a plugged-in backend's own error) doesn't stop the run.
+                    # Not cached, so the next run tries again
+                    stats["failed"] += 1
+                    logger.warning("geocoding %r failed: %s", todo[futures[future]], e)
+                    continue
+                cache.put(key, coords, provider)
+                stats["looked_up"] += 1
+                if stats["looked_up"] % SAVE_EVERY == 0:
+                    cache.save()
+    finally:
+        # Also on Ctrl-C, so finished lookups are never lost
+        if todo:
+            cache.save()
+
+    for pos, key in wanted:
+        entry = cache.get(key)
+        if entry is None:
+            continue
+        if key not in todo:
+            stats["cached"] += 1
+        if entry["status"] == "ok":
+            lat.iat[pos], lon.iat[pos] = entry["lat"], entry["lon"]
+            stats["found"] += 1
+        else:
+            stats["not_found"] += 1
+
+    df['latitude'] = lat
+    df['longitude'] = lon
+    return df, stats
+
+
+def default_output(projects_path: str) -> str:
+    stem, ext = os.path.splitext(projects_path)
+    return f"{stem}_geocoded{ext or '.csv'}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Geocode projects that are missing coordinates.")
+    parser.add_argument("--projects", default=PROJECTS_CSV)
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--out", help="output CSV (default: <projects>_geocoded.csv next to the input)")
+    output.add_argument("--in-place", action="store_true", help="overwrite --projects instead")
+    parser.add_argument("--backend", default="nominatim", help="nominatim, table, or module:Class")
+    parser.add_argument("--table", help="address,latitude,longitude CSV for the table backend")
+    parser.add_argument("--cache", default=GEOCODE_CACHE)
+    parser.add_argument("--overrides", default=OVERRIDES_CSV)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=1.0, help="max lookups per second across all workers")
+    parser.add_argument("--refresh", action="store_true",
+                        help="geocode every row again, including cached addresses and rows with coordinates")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        backend = make_backend(args.backend, **({"path": args.table} if args.table else {}))
+        raw = pd.read_csv(args.projects)
+    except (FileNotFoundError, ValueError, ImportError, AttributeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    df, stats = geocode_projects(raw, backend, GeocodeCache(args.cache), load_overrides(args.overrides),
+                                 workers=args.workers, rate=args.rate, refresh=args.refresh)
+    out = args.projects if args.in_place else args.out or default_output(args.projects)
+    df.to_csv(out, index=False)
+    print(", ".join(f"{k} {v}" for k, v in stats.items()) + f" -> {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
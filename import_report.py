@@ -0,0 +1,154 @@
+"""Import-time report for a fresh server process and its first session.
+
+Runs the app in a new interpreter under `python -X importtime` and splits
+the import log into phases:
+
+  * server: importing Streamlit itself (what `streamlit run` pays before any session)
+  * first session: imports triggered by the first script run
+  * interactions: imports deferred until a checkbox is ticked or a search is made
+
+The same measurement is repeated with the libraries the app used to import
+at the top of streamlit_app.py loaded up front (`eager`), so the report
+shows how much the on-demand imports save on the first session. Only the
+modules listed as still deferred after the first run are saved; the rest
+(e.g. folium for the map shown on load and pyarrow for the data store)
+load either way.
+
+Usage:
+    python import_report.py
+    python import_report.py --top 15
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(REPO_DIR, "streamlit_app.py")
+
+# What streamlit_app.py imported unconditionally before imports were deferred
+EAGER_MODULES = [
+    "folium", "folium.plugins", "streamlit_folium", "streamlit_player", "altair", "requests",
+    "project_map", "paged_table", "search_index", "feedback_outbox",
+]
+
+# Libraries worth calling out in the report
+HEAVY_MODULES = ["folium", "streamlit_folium", "streamlit_player", "altair", "requests", "pyarrow"]
+
+CHECKBOXES = [
+    "Show instructions for interactive map",
+    "Open key projects table",
+    "List key stances of each Council Member",
+    "Show topics by meeting date",
+]
+
+_PHASE_MARK = "### phase: "
+_LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def run_worker(eager: bool, timeout: float) -> dict:
+    """Drive the app in this process, marking phase boundaries in the importtime log."""
+    from streamlit.testing.v1 import AppTest
+
+    result = {}
+    sys.stderr.write(_PHASE_MARK + "first session\n")
+    sys.stderr.flush()
+    start = time.perf_counter()
+    if eager:
+        for name in EAGER_MODULES:
+            __import__(name)
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    result["first_run_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    result["loaded_after_first_run"] = [m for m in HEAVY_MODULES if m in sys.modules]
+    result["deferred_after_first_run"] = [m for m in EAGER_MODULES if m not in sys.modules]
+
+    sys.stderr.write(_PHASE_MARK + "interactions\n")
+    sys.stderr.flush()
+    for label in CHECKBOXES:
+        next(cb for cb in at.checkbox if cb.label == label).check().run()
+    at.text_input[0].input("parking").run()
+    result["loaded_after_interactions"] = [m for m in HEAVY_MODULES if m in sys.modules]
+    return result
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Per-phase import totals and top-level imports from a -X importtime log."""
+    phases = {}
+    phase = phases.setdefault("server", {"self_us": 0, "top": []})
+    for line in stderr.splitlines():
+        if line.startswith(_PHASE_MARK):
+            phase = phases.setdefault(line[len(_PHASE_MARK):].strip(), {"self_us": 0, "top": []})
+            continue
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        phase["self_us"] += int(self_us)
+        # Modules imported directly (not as a dependency of another import in the log)
+        if len(indent) == 1:
+            phase["top"].append((int(cumulative_us), name))
+    return phases
+
+
+def measure(eager: bool, timeout: float) -> dict:
+    cmd = [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--worker", "--timeout", str(timeout)]
+    if eager:
+        cmd.append("--eager")
+    env = dict(os.environ, PYTHONPATH=REPO_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run(cmd, cwd=REPO_DIR, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return {**json.loads(proc.stdout.strip().splitlines()[-1]), "phases": parse_importtime(proc.stderr)}
+
+
+def _print_run(title: str, run: dict, top: int):
+    print(f"\n{title}")
+    for name, phase in run["phases"].items():
+        print(f"  {name:<14} {phase['self_us'] / 1000:8.0f} ms importing")
+        for cumulative_us, module in sorted(phase["top"], reverse=True)[:top]:
+            print(f"      {cumulative_us / 1000:8.1f} ms  {module}")
+    print(f"  first script run {run['first_run_ms']:.0f} ms (imports included)")
+    print(f"  loaded after first run:    {', '.join(run['loaded_after_first_run']) or '-'}")
+    print(f"  loaded after interactions: {', '.join(run['loaded_after_interactions']) or '-'}")
+    print(f"  still deferred after first run: {', '.join(run['deferred_after_first_run']) or '-'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time report for streamlit_app.py")
+    parser.add_argument("--top", type=int, default=8, help="top-level imports to list per phase")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per script run")
+    parser.add_argument("--json", help="also write the raw results to this file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--eager", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.eager, args.timeout)))
+        return 0
+
+    lazy = measure(eager=False, timeout=args.timeout)
+    eager = measure(eager=True, timeout=args.timeout)
+    _print_run("On-demand imports (current layout)", lazy, args.top)
+    _print_run("Eager imports (previous top-of-file layout)", eager, args.top)
+
+    saved_imports = eager["phases"]["first session"]["self_us"] - lazy["phases"]["first session"]["self_us"]
+    saved_run = eager["first_run_ms"] - lazy["first_run_ms"]
+    print(f"\nFirst session: {saved_imports / 1000:.0f} ms less importing, "
+          f"first script run {abs(saved_run):.0f} ms {'faster' if saved_run >= 0 else 'slower'} "
+          "(run time includes network and cache work, so it is noisier)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"lazy": lazy, "eager": eager}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""Live ingestion of new meetings and projects from a watched directory.
+
+Turn it on with
+
+    [ingest]
+    dir = "incoming"
+
+in .streamlit/secrets.toml (or the LWA_INGEST_DIR environment variable),
+then drop CSV files into that directory:
+
+  * files with "topics" in the name hold meeting rows, keyed on Date
+  * files with "projects" in the name hold project rows, keyed on project_name
+
+A file only needs the new or changed rows, in the same columns as the main
+CSV. A background thread polls the directory and parses each new or changed
+file once. The loaders in data_loader.py then upsert those rows into the
+cached datasets: a row whose key already exists replaces it, and other
+rows are appended. Only files that weren't merged before are applied, so
+the main CSVs and snapshots are never re-parsed. Merged frames get a new
+fingerprint, which moves the derived caches (map, chart spec, search
+index) to the new version; the search index is updated in place from the
+previous version (see search_index.get_search_index).
+
+Open sessions poll the watcher's version from a small fragment and rerun
+when new data has arrived. Removing or rewriting a delta file re-merges
+all current deltas onto the base data.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+import cache_metrics
+from data_loader import clean_projects, clean_topics, date_keys
+
+logger = logging.getLogger("lwa.ingest")
+
+POLL_SECONDS = 5.0
+
+# Merged frames kept per watcher (one per loaded dataset and kind), least recently used evicted first
+MAX_MERGED = 16
+
+# Delta kind -> key column after cleaning (project_name is renamed to project)
+DELTA_KEYS = {"topics": "Date", "projects": "project"}
+
+_active = None
+
+
+def _kind_for(filename: str):
+    name = filename.lower()
+    if not name.endswith(".csv"):
+        return None
+    return next((kind for kind in DELTA_KEYS if kind in name), None)
+
+
+def _clean_delta(kind: str, raw: pd.DataFrame, params: dict) -> pd.DataFrame:
+    if kind == "projects":
+        return clean_projects(raw, params.get("city", ""))[0]
+    return clean_topics(raw)
+
+
+def merge_rows(kind: str, frame: pd.DataFrame, delta: pd.DataFrame):
+    """Upsert delta into frame on the kind's key column; returns the merged frame and the keys touched."""
+    key = DELTA_KEYS[kind]
+    delta = delta.drop_duplicates(key, keep="last").reindex(columns=frame.columns)
+    merged = pd.concat([frame[~frame[key].isin(delta[key])], delta], ignore_index=True)
+    if kind == "topics":
+        merged = merged.sort_values("Date", kind="stable").reset_index(drop=True)
+    return merged, set(delta[key])
+
+
+class IngestWatcher:
+    """Polls a directory for delta CSVs and merges them into loaded datasets on request."""
+
+    def __init__(self, directory: str, poll_seconds: float = POLL_SECONDS):
+        self.directory = directory
+        self.poll_seconds = poll_seconds
+        self.version = 0
+        self._files = {}   # path -> ((mtime_ns, size), kind, raw frame)
+        # (kind, base fingerprint, params) -> (applied [(path, stamp)], merged frame), in LRU order
+        self._merged = OrderedDict()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def scan(self) -> bool:
+        """Pick up new, changed or removed delta files; True if anything changed."""
+        seen = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            kind = _kind_for(entry.name)
+            if kind and entry.is_file():
+                stat = entry.stat()
+                seen[entry.path] = ((stat.st_mtime_ns, stat.st_size), kind)
+
+        with self._lock:
+            files = dict(self._files)
+        changed = False
+        for path, (stamp, kind) in seen.items():
+            if path in files and files[path][0] == stamp:
+                continue
+            try:
+                raw = pd.read_csv(path)
+            except (OSError, ValueError) as e:
+                # Possibly still being written; try again on the next poll
+                logger.warning("skipping delta file %s: %s", path, e)
+                continue
+            files[path] = (stamp, kind, raw)
+            changed = True
+            logger.info("picked up %s delta %s (%d rows)", kind, path, len(raw))
+        for path in set(files) - set(seen):
+            del files[path]
+            changed = True
+            logger.info("delta file %s removed", path)
+
+        if changed:
+            with self._lock:
+                self._files = files
+                self.version += 1
+        return changed
+
+    def apply(self, kind: str, base: pd.DataFrame, **params) -> pd.DataFrame:
+        """base with every delta file of this kind merged in.
+
+        Results are kept per base dataset, so each new file is merged once
+        on top of the previous result and shared by all sessions.
+        """
+        with self._lock:
+            files = sorted((stamp, path, raw) for path, (stamp, k, raw) in self._files.items() if k == kind)
+        if not files:
+            return base
+        applied = [(path, stamp) for stamp, path, _ in files]
+        base_key = base.attrs.get("fingerprint", "")
+        memo_key = (kind, base_key, tuple(sorted(params.items())))
+
+        with self._lock:
+            previous = self._merged.get(memo_key)
+            if previous:
+                self._merged.move_to_end(memo_key)
+            if previous and previous[0] == applied:
+                return previous[1]
+            cache_metrics.mark_miss()
+            if previous and applied[:len(previous[0])] == previous[0]:
+                frame, pending, touched = previous[1], files[len(previous[0]):], set()
+            else:
+                # First merge, or a file was rewritten/removed: start again from the base data
+                frame, pending, touched = base, files, set()
+            parent = frame.attrs.get("fingerprint", "")
+            for _, path, raw in pending:
+                frame, keys = merge_rows(kind, frame, _clean_delta(kind, raw, params))
+                touched |= keys
+
+            stamp = "|".join(f"{path}:{stamp}" for path, stamp in applied)
+            frame.attrs["fingerprint"] = f"{base_key}+{hashlib.sha1(stamp.encode()).hexdigest()[:12]}"
+            # Lets derived structures update from the parent version instead of rebuilding
+            keys = date_keys(touched) if kind == "topics" else map(str, touched)
+            frame.attrs["delta"] = {"parent": parent, "keys": sorted(keys)}
+            self._merged[memo_key] = (applied, frame)
+            while len(self._merged) > MAX_MERGED:
+                self._merged.popitem(last=False)
+        logger.info("merged %d %s delta file(s), %d keys touched", len(pending), kind, len(touched))
+        return frame
+
+    def _poll(self):
+        while not self._stopping.is_set():
+            try:
+                self.scan()
+            except Exception:
+                logger.exception("ingest watcher error")
+            self._stopping.wait(self.poll_seconds)
+
+    def start(self):
+        self.scan()
+        self._thread = threading.Thread(target=self._poll, name="ingest-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def active_watcher():
+    """The process's running watcher, or None when live ingestion is off."""
+    return _active
+
+
+def apply_deltas(kind: str, base: pd.DataFrame, **params) -> pd.DataFrame:
+    """base with the watched deltas of this kind merged in (base itself when ingestion is off)."""
+    watcher = _active
+    if watcher is None:
+        return base
+    return cache_metrics.tracked(f"ingest_{kind}", watcher.apply, kind, base, **params)
+
+
+@st.cache_resource
+def get_watcher(directory: str) -> IngestWatcher:
+    """Process-wide watcher for directory with its polling thread running."""
+    global _active
+    _active = IngestWatcher(directory).start()
+    return _active
+
+
+def ingest_dir():
+    """Configured incoming directory, or None when live ingestion is off."""
+    try:
+        directory = st.secrets.get("ingest", {}).get("dir")
+    except Exception:
+        directory = None
+    return directory or os.environ.get("LWA_INGEST_DIR") or None
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def _version_check(watcher: IngestWatcher):
+    seen = st.session_state.setdefault("_ingest_version", watcher.version)
+    if watcher.version != seen:
+        st.session_state["_ingest_version"] = watcher.version
+        st.session_state["_ingest_notice"] = True
+        st.rerun(scope="app")
+
+
+def live_updates():
+    """Start the watcher when configured and rerun this session when new data arrives."""
+    directory = ingest_dir()
+    if not directory:
+        return
+    if st.session_state.pop("_ingest_notice", False):
+        st.toast("New meeting or project data loaded")
+    _version_check(get_watcher(directory))
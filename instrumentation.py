@@ -0,0 +1,155 @@
+"""Opt-in per-section timing and payload instrumentation.
+
+Enable with the `?debug=perf` query parameter, or for every session with
+
+    [debug]
+    perf = true
+
+in .streamlit/secrets.toml. Each `with section("name"):` block then records
+its wall time and the serialized size of the messages it sends to the
+browser. The numbers are shown in a sidebar panel and logged as one JSON
+line per section on the `lwa.perf` logger. The panel also shows process
+and per-session memory (see memory_report.py).
+"""
+
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import cache_metrics
+
+logger = logging.getLogger("lwa.perf")
+
+_ENABLED_KEY = "_perf_enabled"
+_RECORDS_KEY = "_perf_records"
+
+# Fragment reruns keep appending until the next full run; keep the panel bounded
+MAX_RECORDS = 200
+
+
+def _secrets_enabled() -> bool:
+    try:
+        return bool(st.secrets.get("debug", {}).get("perf", False))
+    except Exception:
+        return False
+
+
+def start_run():
+    """Call once at the top of the script; resets the records for a full rerun."""
+    enabled = st.query_params.get("debug") == "perf" or _secrets_enabled()
+    st.session_state[_ENABLED_KEY] = enabled
+    st.session_state[_RECORDS_KEY] = []
+    if enabled and not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+
+def enabled() -> bool:
+    return st.session_state.get(_ENABLED_KEY, False)
+
+
+_warned_no_enqueue = False
+
+
+def _payload_counter(ctx):
+    """Stack of open section records for this session, counting bytes enqueued.
+
+    This relies on a private Streamlit API: the script run context's
+    _enqueue function, which the outermost open section wraps so that every
+    message sent meanwhile is added to the open sections' totals. When a
+    Streamlit version has no _enqueue, sections are only timed (returns None).
+    """
+    global _warned_no_enqueue
+    stack = getattr(ctx, "_lwa_perf_stack", None)
+    if stack is not None:
+        return stack
+    original_enqueue = getattr(ctx, "_enqueue", None)
+    if not callable(original_enqueue):
+        if not _warned_no_enqueue:
+            _warned_no_enqueue = True
+            logger.warning("this Streamlit version has no ScriptRunContext._enqueue; "
+                           "perf sections will be timed without payload sizes")
+        return None
+
+    stack = []
+
+    def counting_enqueue(msg):
+        if stack:
+            stack[-1]["bytes"] += msg.ByteSize()
+            stack[-1]["messages"] += 1
+        original_enqueue(msg)
+
+    ctx._enqueue = counting_enqueue
+    ctx._lwa_perf_stack = stack
+    ctx._lwa_perf_original = original_enqueue
+    return stack
+
+
+def _restore_enqueue(ctx):
+    ctx._enqueue = ctx._lwa_perf_original
+    del ctx._lwa_perf_stack, ctx._lwa_perf_original
+
+
+@contextmanager
+def section(name: str):
+    """Time a named part of the page and measure what it sends to the browser."""
+    ctx = get_script_run_ctx()
+    if ctx is None or not enabled():
+        yield
+        return
+
+    stack = _payload_counter(ctx)
+    record = {"section": name, "bytes": 0, "messages": 0} if stack is not None \
+        else {"section": name, "bytes": None, "messages": None}
+    if stack is not None:
+        stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record["ms"] = round((time.perf_counter() - start) * 1000, 2)
+        if stack is not None:
+            stack.pop()
+            # Nested sections count toward their parent as well
+            if stack:
+                stack[-1]["bytes"] += record["bytes"]
+                stack[-1]["messages"] += record["messages"]
+            else:
+                _restore_enqueue(ctx)
+        records = st.session_state.setdefault(_RECORDS_KEY, [])
+        records.append(record)
+        del records[:-MAX_RECORDS]
+        logger.info(json.dumps({"event": "section", "session": ctx.session_id, **record}))
+
+
+def render_panel():
+    """Sidebar table of the section timings and cache counters for this session."""
+    if not enabled():
+        return
+    records = st.session_state.get(_RECORDS_KEY, [])
+    with st.sidebar.expander("⏱️ Performance (debug)", expanded=True):
+        if records:
+            st.dataframe(
+                [{"section": r["section"], "ms": r["ms"], "KB sent": round(r["bytes"] / 1024, 1) if r["bytes"] is not None else None,
+                  "messages": r["messages"]} for r in records],
+                hide_index=True,
+            )
+            st.caption(f"Total {sum(r['ms'] for r in records):.0f} ms in timed sections "
+                       "(nested sections are included in their parent)")
+        st.markdown("**Cache hits / misses**")
+        st.dataframe(
+            [{"cache": name, "hits": c["hits"], "misses": c["misses"],
+              "avg hit ms": round(c["hit_ms"] / c["hits"], 2) if c["hits"] else None,
+              "avg miss ms": round(c["miss_ms"] / c["misses"], 2) if c["misses"] else None}
+             for name, c in sorted(cache_metrics.snapshot().items())],
+            hide_index=True,
+        )
+        st.markdown("**Memory**")
+        from memory_report import live_report
+        st.dataframe(live_report(st.session_state), hide_index=True)
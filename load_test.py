@@ -0,0 +1,464 @@
+"""Concurrent-session load test for streamlit_app.py.
+
+Starts the app with `streamlit run` in a scratch directory (the shipped
+data, or a synthetic copy with --scale) and opens N websocket sessions at
+once, the way a burst of readers arrives when a link is shared after a
+council meeting. Each session talks to the server like a browser tab:
+
+  1. loads the page (a full script run)
+  2. opens each section checkbox in turn (fragment reruns), pausing --think
+     seconds (jittered) between actions
+  3. submits the sidebar feedback form, which the app queues for a local
+     stub endpoint (stub_endpoint.py) instead of the real Apps Script
+
+Latency is measured from sending a rerun request to the server reporting
+the script (or fragment) run finished. For each number of sessions the
+report has:
+
+  * p50/p95 page load and interaction latency over all sessions
+  * server CPU seconds per session and average utilization while loaded
+  * server resident memory added per connected session, and the peak
+
+Each level runs against a fresh server process, warmed by one session so
+the shared caches are already built: the numbers are what each extra
+reader costs, not the first build. The client runs in this process, so on
+a small machine it competes with the server for CPU; compare levels on the
+same machine.
+
+With --url the sessions go to an already running app instead (latency
+only, and the feedback step is skipped so a deployed endpoint isn't sent
+test submissions).
+
+--fragments measures what running the sections as fragments saves. One
+session opens each section checkbox, then times --repeat fragment reruns
+of that section against full-script reruns with the same widget state.
+A full rerun is what every checkbox click cost before the sections were
+fragments. AppTest can't do fragment-only reruns, so bench_app.py can't
+show this. Results go to bench_results/fragments-<scale>x.json.
+
+Usage:
+    python load_test.py
+    python load_test.py --sessions 1 10 25 50 --think 0.5
+    python load_test.py --url http://localhost:8501 --sessions 20
+    python load_test.py --fragments --repeat 10 --scale 100
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(REPO_DIR, "streamlit_app.py")
+
+FEEDBACK_TEXT = "Load test submission"
+FEEDBACK_LABEL = "Suggestion, bug or comment:"
+SUBMIT_LABEL = "📨 Submit Feedback"
+
+
+def _percentile(samples: list, q: float):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    return round(samples[min(len(samples) - 1, int(len(samples) * q))], 1)
+
+
+def _summary(samples: list) -> dict:
+    return {
+        "p50_ms": round(statistics.median(samples), 1) if samples else None,
+        "p95_ms": _percentile(samples, 0.95),
+        "max_ms": round(max(samples), 1) if samples else None,
+        "count": len(samples),
+    }
+
+
+class Session:
+    """One simulated browser tab on the app's websocket."""
+
+    def __init__(self, base_url: str, timeout: float):
+        self.stream_url = base_url.replace("http", "ws", 1).rstrip("/") + "/_stcore/stream"
+        self.timeout = timeout
+        self.ws = None
+        self.widgets = {}  # label -> (widget id, fragment id), first occurrence wins
+        self.states = {}   # widget id -> WidgetState, sent with every rerun like the browser does
+        self.errors = []
+
+    async def connect(self):
+        import websockets
+
+        self.ws = await websockets.connect(self.stream_url, subprotocols=["streamlit"], max_size=None,
+                                           open_timeout=self.timeout)
+        return self
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def rerun(self, fragment_id: str = "", triggers=()) -> float:
+        """Request a rerun (of one fragment, if given) and return ms until it finished."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.query_string = ""
+        state.fragment_id = fragment_id
+        state.widget_states.widgets.extend(list(self.states.values()) + list(triggers))
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        await self._until_finished()
+        return (time.perf_counter() - start) * 1000
+
+    async def _until_finished(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await asyncio.wait_for(self.ws.recv(), self.timeout))
+            kind = msg.WhichOneof("type")
+            if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                self._saw_element(msg.delta.new_element, msg.delta.fragment_id)
+            elif kind == "script_finished":
+                status = ForwardMsg.ScriptFinishedStatus.Name(msg.script_finished)
+                if status == "FINISHED_EARLY_FOR_RERUN":
+                    continue
+                if "ERROR" in status:
+                    self.errors.append(status)
+                return status
+
+    def _saw_element(self, element, fragment_id: str):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.errors.append(element.exception.message)
+            return
+        widget = getattr(element, kind, None)
+        label, widget_id = getattr(widget, "label", ""), getattr(widget, "id", "")
+        if label and widget_id:
+            self.widgets.setdefault(label, (widget_id, fragment_id))
+
+    def widget(self, label: str):
+        if label not in self.widgets:
+            raise LookupError(f"widget {label!r} not on the page")
+        return self.widgets[label]
+
+
+async def run_session(base_url: str, think: float, timeout: float, feedback: bool, rng: random.Random) -> dict:
+    """One reader's visit. Returns the open session and its latencies by kind."""
+    from bench_app import CHECKBOXES
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    session = await Session(base_url, timeout).connect()
+    timings = {"page_load": [], "checkbox": [], "feedback": []}
+    try:
+        timings["page_load"].append(await session.rerun())
+        for label in CHECKBOXES:
+            await asyncio.sleep(think * rng.uniform(0.5, 1.5))
+            widget_id, fragment_id = session.widget(label)
+            session.states[widget_id] = WidgetState(id=widget_id, bool_value=True)
+            timings["checkbox"].append(await session.rerun(fragment_id))
+        if feedback:
+            await asyncio.sleep(think * rng.uniform(0.5, 1.5))
+            text_id, fragment_id = session.widget(FEEDBACK_LABEL)
+            button_id, _ = session.widget(SUBMIT_LABEL)
+            session.states[text_id] = WidgetState(id=text_id, string_value=FEEDBACK_TEXT)
+            timings["feedback"].append(
+                await session.rerun(fragment_id, [WidgetState(id=button_id, trigger_value=True)]))
+    except Exception as e:  # timeouts, widgets missing from the page, closed connections
+        session.errors.append(f"{type(e).__name__}: {e}")
+    return {"session": session, "timings": timings}
+
+
+def cpu_seconds(pid: int) -> float:
+    """User plus system CPU time of a process (Linux)."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def rss_bytes(pid: int) -> int:
+    from memory_report import process_memory
+
+    return process_memory(pid).get("rss", 0)
+
+
+class AppServer:
+    """`streamlit run streamlit_app.py` in workdir on a free local port, with extra environment variables."""
+
+    def __init__(self, workdir: str, env: dict = None):
+        self.workdir = workdir
+        self.env = env or {}
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.proc = None
+
+    def start(self, timeout: float = 60):
+        env = dict(os.environ, PYTHONPATH=REPO_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""),
+                   LWA_STORE_DIR=os.path.join(self.workdir, "store"), **self.env)
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", APP_PATH, "--server.headless", "true",
+             "--server.address", "127.0.0.1", "--server.port", str(self.port),
+             "--browser.gatherUsageStats", "false", "--server.fileWatcherType", "none"],
+            cwd=self.workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"streamlit exited with code {self.proc.returncode}")
+            try:
+                with urllib.request.urlopen(f"{self.url}/_stcore/health", timeout=2) as response:
+                    if response.read().strip() == b"ok":
+                        return self
+            except OSError:
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"streamlit didn't become healthy within {timeout:.0f}s")
+
+    def stop(self):
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+
+async def run_level(base_url: str, sessions: int, args, pid: int = None, feedback: bool = True) -> dict:
+    """Warm the server, then run `sessions` concurrent visits and measure them."""
+    rng = random.Random(args.seed)
+    warm = await run_session(base_url, 0, args.timeout, False, rng)
+    await warm["session"].close()
+    if warm["session"].errors:
+        raise RuntimeError(f"warm-up session failed: {warm['session'].errors[0]}")
+
+    peak = {"rss": 0}
+    sampling = True
+
+    async def sample():
+        while sampling:
+            peak["rss"] = max(peak["rss"], rss_bytes(pid))
+            await asyncio.sleep(0.2)
+
+    sampler = None
+    if pid:
+        await asyncio.sleep(0.5)
+        baseline_rss, cpu_start = rss_bytes(pid), cpu_seconds(pid)
+        sampler = asyncio.ensure_future(sample())
+    start = time.perf_counter()
+
+    async def staggered(i):
+        await asyncio.sleep(args.ramp * i / max(sessions, 1))
+        return await run_session(base_url, args.think, args.timeout, feedback, random.Random(rng.random()))
+
+    visits = await asyncio.gather(*(staggered(i) for i in range(sessions)))
+    wall = time.perf_counter() - start
+
+    result = {"sessions": sessions, "wall_s": round(wall, 2)}
+    if pid:
+        # Every session is still connected here
+        connected_rss, cpu_used = rss_bytes(pid), cpu_seconds(pid) - cpu_start
+        sampling = False
+        await sampler
+        result.update({
+            "cpu_s_per_session": round(cpu_used / sessions, 3),
+            "cpu_utilization": round(cpu_used / wall, 2),
+            "baseline_rss": baseline_rss,
+            "rss_per_session": round(max(connected_rss - baseline_rss, 0) / sessions),
+            "peak_rss": max(peak["rss"], connected_rss),
+        })
+    await asyncio.gather(*(visit["session"].close() for visit in visits))
+
+    for kind in ("page_load", "checkbox", "feedback"):
+        result[kind] = _summary([ms for visit in visits for ms in visit["timings"][kind]])
+    result["interactions"] = _summary([ms for visit in visits
+                                       for ms in visit["timings"]["checkbox"] + visit["timings"]["feedback"]])
+    errors = [e for visit in visits for e in visit["session"].errors]
+    result["errors"] = len(errors)
+    result["first_errors"] = sorted(set(errors))[:3]
+    return result
+
+
+async def compare_fragments(base_url: str, repeat: int, timeout: float) -> dict:
+    """Per checkbox: fragment rerun vs full rerun latency, with the section open."""
+    from bench_app import CHECKBOXES
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    session = await Session(base_url, timeout).connect()
+    try:
+        await session.rerun()  # first load builds the shared caches
+        sections = {}
+        for label in CHECKBOXES:
+            widget_id, fragment_id = session.widget(label)
+            if not fragment_id:
+                raise RuntimeError(f"{label!r} is not inside a fragment")
+            session.states[widget_id] = WidgetState(id=widget_id, bool_value=True)
+            await session.rerun(fragment_id)  # open it once so both kinds render the open section
+            fragment, full = [], []
+            # Alternated, so both kinds see the same cache and machine state
+            for _ in range(repeat):
+                fragment.append(await session.rerun(fragment_id))
+                full.append(await session.rerun())
+            sections[label] = {"fragment": _summary(fragment), "full": _summary(full)}
+        if session.errors:
+            raise RuntimeError(f"session errors: {session.errors[:3]}")
+    finally:
+        await session.close()
+    fragment = statistics.median(s["fragment"]["p50_ms"] for s in sections.values())
+    full = statistics.median(s["full"]["p50_ms"] for s in sections.values())
+    return {"repeat": repeat, "sections": sections,
+            "median_fragment_ms": round(fragment, 2), "median_full_ms": round(full, 2),
+            "speedup": round(full / fragment, 2) if fragment else None}
+
+
+def run_fragments(args) -> dict:
+    with tempfile.TemporaryDirectory(prefix=f"lwa-fragments-{args.scale}x-") as workdir:
+        rows = prepare_workdir(args.scale, workdir, "http://127.0.0.1:9/unused")
+        server = AppServer(workdir).start(args.timeout)
+        try:
+            result = asyncio.run(compare_fragments(server.url, args.repeat, args.timeout))
+        finally:
+            server.stop()
+    for label, stats in result["sections"].items():
+        print(f"  {label:<42} fragment p50 {stats['fragment']['p50_ms']:7.1f} ms   "
+              f"full rerun p50 {stats['full']['p50_ms']:7.1f} ms")
+    print(f"  median over sections: fragment {result['median_fragment_ms']:.1f} ms, "
+          f"full {result['median_full_ms']:.1f} ms ({result['speedup']}x)")
+    return {"scale": args.scale, "rows": rows, "fragments": result}
+
+
+def prepare_workdir(scale: int, workdir: str, stub_url: str) -> dict:
+    from bench_app import prepare_dataset
+
+    rows = prepare_dataset(scale, workdir)
+    # Feedback goes to the local stub instead of the Apps Script endpoint
+    os.makedirs(os.path.join(workdir, ".streamlit"), exist_ok=True)
+    with open(os.path.join(workdir, ".streamlit", "secrets.toml"), "w") as f:
+        f.write(f'[feedback]\ngas_url = "{stub_url}"\ntoken = "load-test"\n')
+    return rows
+
+
+def wait_for_deliveries(stub, expected: int, timeout: float = 15) -> int:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with stub._lock:
+            if len(stub.received) >= expected:
+                break
+        time.sleep(0.2)
+    with stub._lock:
+        return len(stub.received)
+
+
+def run_local(args) -> dict:
+    from stub_endpoint import StubEndpoint
+
+    stub = StubEndpoint().start()
+    levels = []
+    try:
+        with tempfile.TemporaryDirectory(prefix=f"lwa-load-{args.scale}x-") as workdir:
+            rows = prepare_workdir(args.scale, workdir, stub.url)
+            for sessions in args.sessions:
+                print(f"{sessions} sessions ...", flush=True)
+                with stub._lock:
+                    stub.received.clear()
+                server = AppServer(workdir).start(args.timeout)
+                try:
+                    level = asyncio.run(run_level(server.url, sessions, args, server.proc.pid))
+                    level["feedback_delivered"] = wait_for_deliveries(stub, level["feedback"]["count"])
+                finally:
+                    server.stop()
+                    # Undelivered rows would otherwise be sent again by the next level's server
+                    for path in os.listdir(workdir):
+                        if path.startswith("feedback_outbox.sqlite3"):
+                            os.remove(os.path.join(workdir, path))
+                levels.append(level)
+                _print_level(level)
+    finally:
+        stub.stop()
+    return {"scale": args.scale, "rows": rows, "levels": levels}
+
+
+def run_remote(args) -> dict:
+    levels = []
+    for sessions in args.sessions:
+        print(f"{sessions} sessions ...", flush=True)
+        level = asyncio.run(run_level(args.url, sessions, args, feedback=False))
+        levels.append(level)
+        _print_level(level)
+    return {"url": args.url, "levels": levels}
+
+
+def _print_level(level: dict):
+    def ms(stats):
+        return f"p50 {stats['p50_ms']:.0f} / p95 {stats['p95_ms']:.0f} ms" if stats["count"] else "n/a"
+
+    print(f"  page load     {ms(level['page_load'])}")
+    print(f"  interactions  {ms(level['interactions'])}  (feedback {ms(level['feedback'])})")
+    if "cpu_s_per_session" in level:
+        print(f"  server CPU    {level['cpu_s_per_session']:.2f} s/session, "
+              f"{level['cpu_utilization'] * 100:.0f}% of a core over {level['wall_s']:.1f} s")
+        print(f"  server RSS    +{level['rss_per_session'] / 2**20:.1f} MB/session, "
+              f"peak {level['peak_rss'] / 2**20:.0f} MB (baseline {level['baseline_rss'] / 2**20:.0f} MB)")
+    if "feedback_delivered" in level:
+        print(f"  feedback      {level['feedback_delivered']} of {level['feedback']['count']} delivered to the stub")
+    if level["errors"]:
+        print(f"  errors        {level['errors']}: {'; '.join(level['first_errors'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for streamlit_app.py")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 25],
+                        help="concurrent sessions per level")
+    parser.add_argument("--think", type=float, default=1.0, help="average seconds between a session's actions")
+    parser.add_argument("--ramp", type=float, default=0.0, help="seconds over which a level's sessions connect")
+    parser.add_argument("--scale", type=int, default=1, help="dataset size relative to the shipped CSVs")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per rerun")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="test an already running app instead (latency only, no feedback)")
+    parser.add_argument("--out", default=os.path.join(REPO_DIR, "bench_results"))
+    parser.add_argument("--fragments", action="store_true",
+                        help="compare fragment reruns of each section with full-script reruns")
+    parser.add_argument("--repeat", type=int, default=10, help="reruns of each kind per section with --fragments")
+    args = parser.parse_args(argv)
+
+    import streamlit
+
+    results = {
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "think_s": args.think,
+        "ramp_s": args.ramp,
+    }
+    try:
+        if args.fragments:
+            results.update(run_fragments(args))
+        else:
+            results.update(run_remote(args) if args.url else run_local(args))
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    os.makedirs(args.out, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    name = f"fragments-{args.scale}x.json" if args.fragments else f"load-{stamp}.json"
+    path = os.path.join(args.out, name)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import pandas as pd
+import streamlit as st
+
+import cache_metrics
+from text_utils import split_bullets
+
+# Period labels shown in the UI -> pandas period codes
+GRANULARITIES = {"Meeting": None, "Week": "W", "Month": "M", "Quarter": "Q"}
+
+# Histories with more meetings than this open grouped by month
+MAX_MEETING_BARS = 300
+
+# Tooltip summaries keep at most this many bullets / characters of Major_Topics
+SUMMARY_BULLETS = 3
+SUMMARY_CHARS = 200
+
+BAR_COLOR = '#A9CCE3'
+
+
+def summarize_topics(topics_md) -> str:
+    """First few bullets of a meeting's topics, cut to SUMMARY_CHARS."""
+    items = split_bullets(topics_md)
+    summary = "; ".join(items[:SUMMARY_BULLETS])
+    more = len(items) > SUMMARY_BULLETS or len(summary) > SUMMARY_CHARS
+    summary = summary[:SUMMARY_CHARS].rstrip()
+    return summary + (" … (see Meetings table)" if more else "")
+
+
+def default_granularity(chart_df: pd.DataFrame) -> str:
+    return "Meeting" if len(chart_df) <= MAX_MEETING_BARS else "Month"
+
+
+def aggregate_meetings(chart_df: pd.DataFrame, granularity: str = "Meeting") -> pd.DataFrame:
+    """Chart rows for one bar per meeting or per week/month/quarter.
+
+    Only the fields the chart encodes are kept: period start, label,
+    meeting count, total minutes, total topics and a short summary.
+    """
+    dates = pd.to_datetime(chart_df["Date"])
+    minutes = pd.to_numeric(chart_df["Duration (min)"], errors="coerce")
+    topics = pd.to_numeric(chart_df["Topic Count"], errors="coerce")
+    freq = GRANULARITIES[granularity]
+
+    if freq is None:
+        return pd.DataFrame({
+            "Period": dates,
+            "Label": dates.dt.strftime("%Y-%m-%d"),
+            "Meetings": 1,
+            "Duration (min)": minutes,
+            "Topic Count": topics,
+            "Summary": chart_df["Major_Topics"].map(summarize_topics),
+        }).sort_values("Period").reset_index(drop=True)
+
+    periods = dates.dt.to_period(freq)
+    grouped = pd.DataFrame({"period": periods, "minutes": minutes, "topics": topics}).groupby("period")
+    out = pd.DataFrame({
+        "Period": grouped.size().index.to_timestamp(),
+        "Meetings": grouped.size().to_numpy(),
+        "Duration (min)": grouped["minutes"].sum().to_numpy(),
+        "Topic Count": grouped["topics"].sum().to_numpy(),
+    })
+    if freq == "Q":
+        out["Label"] = grouped.size().index.astype(str)  # e.g. 2025Q1
+    elif freq == "M":
+        out["Label"] = out["Period"].dt.strftime("%b %Y")
+    else:
+        out["Label"] = out["Period"].dt.strftime("Week of %Y-%m-%d")
+    out["Summary"] = out["Meetings"].astype(str) + " meeting(s); see Meetings table for topics"
+    return out
+
+
+def meeting_chart_spec(chart_df: pd.DataFrame, granularity: str = "Meeting") -> dict:
+    """Vega-Lite spec: detail bars plus a brushable overview strip for the time window.
+
+    Written as a plain dict (st.vega_lite_chart takes one directly) so the
+    page never has to import Altair. Records are inlined, so long histories
+    aren't subject to Altair's 5000-row limit either.
+    """
+    data = aggregate_meetings(chart_df, granularity)
+    data["Period"] = data["Period"].dt.strftime("%Y-%m-%d")
+
+    detail = {
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {"field": "Label", "type": "ordinal", "sort": {"field": "Period"},
+                  "title": "Date" if granularity == "Meeting" else granularity},
+            "y": {"field": "Duration (min)", "type": "quantitative"},
+            "color": {"value": BAR_COLOR},
+            "tooltip": [
+                {"field": "Label", "type": "nominal"},
+                {"field": "Meetings", "type": "quantitative"},
+                {"field": "Duration (min)", "type": "quantitative"},
+                {"field": "Topic Count", "type": "quantitative"},
+                {"field": "Summary", "type": "nominal"},
+            ],
+        },
+        "transform": [{"filter": {"param": "time_window"}}],
+        "title": "Rollover any bar for meeting highlights by date",
+        "height": 300,
+    }
+
+    overview = {
+        "name": "overview",
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {"field": "Period", "type": "temporal", "title": "Drag to select a time window"},
+            "y": {"field": "Duration (min)", "type": "quantitative", "title": None, "axis": None},
+            "color": {"value": BAR_COLOR},
+        },
+        "height": 60,
+    }
+
+    return {
+        # Missing durations become null rather than NaN, which isn't valid JSON
+        "data": {"values": data.astype(object).where(data.notna(), None).to_dict("records")},
+        "params": [{"name": "time_window", "select": {"type": "interval", "encodings": ["x"]}, "views": ["overview"]}],
+        "vconcat": [detail, overview],
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _cached_spec(dataset_key: str, granularity: str, _chart_df: pd.DataFrame) -> dict:
+    cache_metrics.mark_miss()
+    return meeting_chart_spec(_chart_df, granularity)
+
+
+def get_meeting_chart_spec(chart_df: pd.DataFrame, granularity: str = "Meeting") -> dict:
+    """Spec for this (dataset, granularity), generated once and reused across reruns."""
+    return cache_metrics.tracked(
+        "meeting_chart", _cached_spec, chart_df.attrs.get("fingerprint", ""), granularity, chart_df,
+    )
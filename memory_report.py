@@ -0,0 +1,208 @@
+"""Memory use per server process and per session, for sizing instances.
+
+Live numbers (used by the debug panel in instrumentation.py):
+
+  * process: resident and private memory from /proc/self/smaps_rollup.
+    Pages of the memory-mapped shared store count as shared, not private,
+    so several server processes don't pay for them more than once
+  * shared store: how much of the mapped Arrow files is resident
+  * sessions: active sessions on this server and this session's state size
+
+The command line report opens many headless sessions against one dataset
+in a fresh process, with the shared store on and off, and reports:
+
+  * private memory once the first session has run (the per-process baseline)
+  * retained memory per additional session
+  * heap allocated during one warm rerun, which each concurrently
+    running session needs on top
+  * the shared store's mapped size
+
+Instance memory is then roughly
+baseline + sessions x retained + concurrent reruns x rerun heap
+per server process, plus the shared store once per machine.
+
+Usage:
+    python memory_report.py
+    python memory_report.py --scale 100 --sessions 20
+"""
+
+import argparse
+import gc
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(REPO_DIR, "streamlit_app.py")
+
+
+def process_memory(pid="self") -> dict:
+    """Bytes of rss, pss, shared and private memory for a process (Linux), or {} elsewhere."""
+    fields = {"Rss": "rss", "Pss": "pss", "Shared_Clean": "shared", "Shared_Dirty": "shared",
+              "Private_Clean": "private", "Private_Dirty": "private"}
+    out = dict.fromkeys(fields.values(), 0)
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in fields:
+                    out[fields[name]] += int(value.split()[0]) * 1024
+    except OSError:
+        return {}
+    return out
+
+
+def store_mappings(store_dir: str = None, pid="self") -> dict:
+    """Mapped and resident bytes of the shared store files in a process."""
+    from shared_store import STORE_DIR
+
+    store_dir = os.path.abspath(store_dir or STORE_DIR)
+    out = {"files": set(), "mapped": 0, "resident": 0}
+    try:
+        with open(f"/proc/{pid}/smaps") as f:
+            current = None
+            for line in f:
+                parts = line.split()
+                if "-" in parts[0] and len(parts) >= 5:
+                    path = parts[5] if len(parts) > 5 else ""
+                    current = path if path.startswith(store_dir) else None
+                    if current:
+                        out["files"].add(current)
+                elif current and parts[0] in ("Size:", "Rss:"):
+                    out["mapped" if parts[0] == "Size:" else "resident"] += int(parts[1]) * 1024
+    except OSError:
+        pass
+    out["files"] = len(out["files"])
+    return out
+
+
+def active_sessions():
+    """Sessions connected to this server, or None outside a running server."""
+    try:
+        from streamlit.runtime import Runtime
+        return Runtime.instance()._session_mgr.num_active_sessions()
+    except Exception:
+        return None
+
+
+def state_bytes(state) -> int:
+    """Approximate size of a session's state values."""
+    import pandas as pd
+
+    total = 0
+    for value in state.values():
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            total += int(value.memory_usage(deep=True).sum() if isinstance(value, pd.DataFrame)
+                         else value.memory_usage(deep=True))
+            continue
+        try:
+            total += len(pickle.dumps(value))
+        except Exception:
+            total += sys.getsizeof(value)
+    return total
+
+
+def live_report(session_state) -> list:
+    """Rows for the debug panel: (metric, KB)."""
+    memory = process_memory()
+    store = store_mappings()
+    rows = [
+        ("process resident", memory.get("rss")),
+        ("process private", memory.get("private")),
+        ("process shared", memory.get("shared")),
+        (f"shared store mapped ({store['files']} files)", store["mapped"]),
+        ("shared store resident", store["resident"]),
+        ("this session's state", state_bytes(session_state)),
+    ]
+    sessions = active_sessions()
+    if sessions and memory:
+        rows.append((f"private per session ({sessions} active)", memory["private"] // sessions))
+    return [{"metric": name, "KB": round(value / 1024, 1) if value is not None else None} for name, value in rows]
+
+
+def run_worker(sessions: int, timeout: float) -> dict:
+    """Open sessions one by one in this process (cwd is the dataset directory)."""
+    from streamlit.testing.v1 import AppTest
+
+    def private():
+        gc.collect()
+        return process_memory().get("private", 0)
+
+    apps = []
+    samples = []
+    for _ in range(sessions):
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        apps.append(at)
+        samples.append(private())
+
+    tracemalloc.start()
+    apps[0].run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    retained = (samples[-1] - samples[0]) / max(len(samples) - 1, 1)
+    return {
+        "baseline_private": samples[0],
+        "retained_per_session": round(retained),
+        "rerun_heap_peak": peak,
+        "store": store_mappings(),
+        "samples": samples,
+    }
+
+
+def measure(scale: int, sessions: int, shared: bool, timeout: float) -> dict:
+    from bench_app import prepare_dataset
+
+    with tempfile.TemporaryDirectory(prefix=f"lwa-mem-{scale}x-") as workdir:
+        rows = prepare_dataset(scale, workdir)
+        env = dict(os.environ, PYTHONPATH=REPO_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""),
+                   LWA_SHARED_STORE="1" if shared else "0", LWA_STORE_DIR=os.path.join(workdir, "store"))
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", "--sessions", str(sessions),
+             "--timeout", str(timeout)],
+            cwd=workdir, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+        return {"rows": rows, **json.loads(proc.stdout.strip().splitlines()[-1])}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-process and per-session memory report")
+    parser.add_argument("--scale", type=int, default=1, help="dataset size relative to the shipped CSVs")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=600, help="seconds allowed per script run")
+    parser.add_argument("--json", help="also write the raw results to this file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(max(args.sessions, 2), args.timeout)))
+        return 0
+
+    results = {}
+    for label, shared in (("shared store", True), ("per-call copies", False)):
+        run = results[label] = measure(args.scale, args.sessions, shared, args.timeout)
+        print(f"\n{label} ({args.scale}x data: {run['rows']}, {args.sessions} sessions)")
+        print(f"  private memory after first session  {run['baseline_private'] / 2**20:8.1f} MB")
+        print(f"  retained per additional session     {run['retained_per_session'] / 1024:8.1f} KB")
+        print(f"  heap allocated by one warm rerun    {run['rerun_heap_peak'] / 1024:8.1f} KB")
+        if run["store"]["files"]:
+            print(f"  shared store mapped                 {run['store']['mapped'] / 1024:8.1f} KB "
+                  f"({run['store']['files']} files, shared by all processes)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
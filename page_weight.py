@@ -0,0 +1,365 @@
+"""Browser page weight and time-to-interactive of streamlit_app.py, with and without video facades.
+
+Starts the app with `streamlit run` on the shipped data twice, once with the
+Interpretations tabs showing click-to-load facades (the default) and once
+with LWA_VIDEO_FACADES=0, which embeds the three players up front. Each
+page view is loaded in a headless Chromium over the DevTools protocol with
+the browser cache disabled, as a first visit would be, and reports:
+
+  * transferred bytes: encoded response sizes of every HTTP request the page
+    and its iframes make, split into the app's own origin and other hosts,
+    plus the bytes the app streams over its websocket
+  * requests, iframes and requests that failed
+  * app ready: when the first script run has finished rendering
+  * time to interactive (TTI): the end of the last long task (over 50 ms,
+    in the page or a same-origin iframe) before the first QUIET_WINDOW with no
+    long tasks and at most two requests in flight, starting no earlier
+    than app ready. This is Lighthouse's definition with app ready in place
+    of first contentful paint, which for Streamlit is the empty page shell.
+
+Each mode runs on its own server, warmed with one unmeasured page view so
+its caches are built. The modes' page views then alternate, --repeat of
+each, and the medians are reported. Results go to
+bench_results/page-weight.json.
+
+Any Chromium with remote debugging works: --chrome starts one headless,
+--cdp uses one that is already running (its first page tab is used).
+
+Usage:
+    python page_weight.py --chrome /usr/bin/chromium
+    python page_weight.py --cdp http://127.0.0.1:9222 --repeat 5
+"""
+
+import argparse
+import asyncio
+import base64
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+QUIET_WINDOW = 5.0  # seconds
+# Result name -> VIDEO_FACADES setting
+MODES = {"players": False, "facades": True}
+
+# Runs in every frame before the page's own scripts: long tasks, and in the top
+# frame the moment the app's first script run has rendered the tabs
+_PAGE_PROBE = """
+window.__lwaLongTasks = [];
+new PerformanceObserver(list => {
+  for (const e of list.getEntries())
+    window.__lwaLongTasks.push([performance.timeOrigin + e.startTime, performance.timeOrigin + e.startTime + e.duration]);
+}).observe({type: "longtask"});
+if (window === window.top) {
+  const poll = setInterval(() => {
+    const app = document.querySelector('[data-testid="stApp"]');
+    if (app && app.getAttribute("data-test-script-state") === "notRunning"
+        && document.querySelector('[data-testid="stTabs"]')) {
+      window.__lwaReady = performance.timeOrigin + performance.now();
+      clearInterval(poll);
+    }
+  }, 10);
+}
+"""
+
+_COLLECT = """
+(() => {
+  const tasks = w => {
+    let found = (w.__lwaLongTasks || []).slice();
+    for (let i = 0; i < w.frames.length; i++) {
+      try { found = found.concat(tasks(w.frames[i])); } catch (e) {}  // cross-origin frame
+    }
+    return found;
+  };
+  return {timeOrigin: performance.timeOrigin, ready: window.__lwaReady || null,
+          longTasks: tasks(window), iframes: document.querySelectorAll("iframe").length};
+})()
+"""
+
+
+class DevTools:
+    """A DevTools protocol connection to one page tab, with its iframes' targets attached."""
+
+    def __init__(self, ws_url: str):
+        self.ws_url = ws_url
+        self.ws = None
+        self.events = []
+        self._next_id = 0
+        self._replies = {}
+        self._reader = None
+
+    async def connect(self):
+        import websockets
+
+        self.ws = await websockets.connect(self.ws_url, max_size=None)
+        self._reader = asyncio.ensure_future(self._read())
+        return self
+
+    async def close(self):
+        self._reader.cancel()
+        await self.ws.close()
+
+    async def _read(self):
+        async for raw in self.ws:
+            msg = json.loads(raw)
+            if "id" in msg:
+                self._replies.pop(msg["id"]).set_result(msg)
+                continue
+            self.events.append(msg)
+            if msg["method"] == "Target.attachedToTarget":
+                # Out-of-process iframes (other origins) are separate targets
+                asyncio.ensure_future(self._watch_child(msg["params"]["sessionId"]))
+
+    async def _watch_child(self, session_id: str):
+        await self.send("Network.enable", session_id=session_id)
+        await self.send("Network.setCacheDisabled", {"cacheDisabled": True}, session_id=session_id)
+        await self.send("Runtime.runIfWaitingForDebugger", session_id=session_id)
+
+    async def send(self, method: str, params: dict = None, session_id: str = None) -> dict:
+        self._next_id += 1
+        msg = {"id": self._next_id, "method": method, "params": params or {}}
+        if session_id:
+            msg["sessionId"] = session_id
+        reply = self._replies[self._next_id] = asyncio.get_running_loop().create_future()
+        await self.ws.send(json.dumps(msg))
+        msg = await asyncio.wait_for(reply, 30)
+        if "error" in msg:
+            raise RuntimeError(f"{method}: {msg['error'].get('message')}")
+        return msg.get("result", {})
+
+    async def evaluate(self, expression: str):
+        result = await self.send("Runtime.evaluate", {"expression": expression, "returnByValue": True})
+        return result["result"].get("value")
+
+
+def _page_target(cdp_url: str) -> str:
+    with urllib.request.urlopen(f"{cdp_url.rstrip('/')}/json/list", timeout=10) as response:
+        targets = json.load(response)
+    pages = [t for t in targets if t["type"] == "page"]
+    if not pages:
+        raise RuntimeError(f"no page tab at {cdp_url}")
+    return pages[0]["webSocketDebuggerUrl"]
+
+
+def start_chrome(binary: str, profile_dir: str, timeout: float = 30):
+    """A headless Chromium with remote debugging; returns (process, DevTools HTTP URL)."""
+    proc = subprocess.Popen(
+        [binary, "--headless=new", "--remote-debugging-port=0", f"--user-data-dir={profile_dir}",
+         "--no-first-run", "--no-default-browser-check", "--window-size=1280,900", "about:blank"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    port_file = os.path.join(profile_dir, "DevToolsActivePort")
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.path.exists(port_file):
+            with open(port_file) as f:
+                port = f.readline().strip()
+            if port:
+                return proc, f"http://127.0.0.1:{port}"
+        time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f"{binary} didn't open a DevTools port within {timeout:.0f}s")
+
+
+def _max_in_flight(requests: list, start: float, end: float) -> int:
+    """Most requests in flight at once during [start, end); requests are (start, end or None)."""
+    edges = []
+    for s, e in requests:
+        if s < end and (e is None or e > start):
+            edges.append((max(s, start), 1))
+            if e is not None and e < end:
+                edges.append((e, -1))
+    peak = in_flight = 0
+    for _, change in sorted(edges, key=lambda edge: (edge[0], edge[1])):
+        in_flight += change
+        peak = max(peak, in_flight)
+    return peak
+
+
+def time_to_interactive(ready: float, long_tasks: list, requests: list, end: float):
+    """Epoch ms, or None if no quiet window started before end. Times are epoch ms."""
+    window = QUIET_WINDOW * 1000
+    candidates = sorted({ready} | {t[1] for t in long_tasks if t[1] > ready}
+                        | {e for _, e in requests if e is not None and e > ready})
+    for start in candidates:
+        if start + window > end:
+            break
+        if any(s < start + window and e > start for s, e in long_tasks):
+            continue
+        if _max_in_flight(requests, start, start + window) <= 2:
+            return max([ready] + [e for _, e in long_tasks if e <= start])
+    return None
+
+
+async def measure_view(cdp_url: str, app_url: str, timeout: float) -> dict:
+    """Load the app once in the browser tab and measure it."""
+    tab = await DevTools(_page_target(cdp_url)).connect()
+    try:
+        await tab.send("Page.navigate", {"url": "about:blank"})
+        await asyncio.sleep(0.5)
+        for domain in ("Page", "Network", "Runtime"):
+            await tab.send(f"{domain}.enable")
+        await tab.send("Network.clearBrowserCache")
+        await tab.send("Network.setCacheDisabled", {"cacheDisabled": True})
+        await tab.send("Target.setAutoAttach", {"autoAttach": True, "waitForDebuggerOnStart": True,
+                                                "flatten": True})
+        probe = await tab.send("Page.addScriptToEvaluateOnNewDocument", {"source": _PAGE_PROBE})
+        tab.events.clear()
+        await tab.send("Page.navigate", {"url": app_url})
+
+        # Load until app ready, then until the network and main thread have been quiet for a window
+        deadline = time.monotonic() + timeout
+        last_activity = time.monotonic()
+        seen = 0
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.25)
+            if any(e["method"].startswith("Network.") and not e["method"].startswith("Network.webSocket")
+                   for e in tab.events[seen:]):
+                last_activity = time.monotonic()
+            seen = len(tab.events)
+            state = await tab.evaluate(_COLLECT)
+            if state and state["ready"] and time.monotonic() - last_activity > QUIET_WINDOW + 1:
+                break
+        else:
+            raise RuntimeError(f"{app_url} didn't finish loading within {timeout:.0f}s")
+        await tab.send("Page.removeScriptToEvaluateOnNewDocument", {"identifier": probe["identifier"]})
+        end = time.time() * 1000
+    finally:
+        await tab.close()
+
+    app_origin = app_url.split("/", 3)[:3]
+    requests, failed = {}, 0
+    clock = None  # epoch ms = monotonic timestamp * 1000 + clock
+    transferred = {"app_bytes": 0, "external_bytes": 0, "websocket_bytes": 0}
+    for event in tab.events:
+        method, params = event["method"], event.get("params", {})
+        key = (event.get("sessionId"), params.get("requestId"))
+        if method == "Network.requestWillBeSent":
+            if clock is None:
+                clock = (params["wallTime"] - params["timestamp"]) * 1000
+            url = params["request"]["url"]
+            if not url.startswith("http"):
+                continue
+            requests[key] = {"url": url, "start": params["timestamp"] * 1000 + clock, "end": None,
+                             "app": url.split("/", 3)[:3] == app_origin}
+        elif method == "Network.loadingFinished" and key in requests:
+            request = requests[key]
+            request["end"] = params["timestamp"] * 1000 + clock
+            transferred["app_bytes" if request["app"] else "external_bytes"] += int(params["encodedDataLength"])
+        elif method == "Network.loadingFailed" and key in requests:
+            requests[key]["end"] = params["timestamp"] * 1000 + clock
+            failed += 1
+        elif method == "Network.webSocketFrameReceived":
+            frame = params["response"]
+            data = frame["payloadData"]
+            transferred["websocket_bytes"] += len(base64.b64decode(data)) if frame["opcode"] == 2 else len(data)
+
+    origin, ready = state["timeOrigin"], state["ready"]
+    tti = time_to_interactive(ready, state["longTasks"], [(r["start"], r["end"]) for r in requests.values()], end)
+    return {
+        **transferred,
+        "total_bytes": sum(transferred.values()),
+        "requests": len(requests),
+        "external_requests": sum(not r["app"] for r in requests.values()),
+        "failed_requests": failed,
+        "iframes": state["iframes"],
+        "long_tasks": len(state["longTasks"]),
+        "app_ready_ms": round(ready - origin, 1),
+        "tti_ms": round(tti - origin, 1) if tti else None,
+    }
+
+
+def _medians(views: list) -> dict:
+    return {name: (statistics.median(v[name] for v in views) if all(v[name] is not None for v in views) else None)
+            for name in views[0]}
+
+
+def measure_modes(cdp_url: str, repeat: int, timeout: float) -> dict:
+    """Both modes on their own servers; views alternate so they see the same machine state."""
+    from bench_app import prepare_dataset
+    from load_test import AppServer
+
+    servers, views = {}, {name: [] for name in MODES}
+    with tempfile.TemporaryDirectory(prefix="lwa-page-weight-") as workdir:
+        prepare_dataset(1, workdir)
+        try:
+            for name, facades in MODES.items():
+                env = {"LWA_VIDEO_FACADES": "1" if facades else "0"}
+                servers[name] = AppServer(workdir, env=env).start(timeout)
+                asyncio.run(measure_view(cdp_url, servers[name].url, timeout))  # warm-up
+            for i in range(repeat):
+                for name in MODES:
+                    print(f"  {name} view {i + 1} of {repeat}", flush=True)
+                    views[name].append(asyncio.run(measure_view(cdp_url, servers[name].url, timeout)))
+        finally:
+            for server in servers.values():
+                server.stop()
+    return {name: {"median": _medians(views[name]), "views": views[name]} for name in MODES}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Browser page weight and TTI of streamlit_app.py")
+    browser = parser.add_mutually_exclusive_group(required=True)
+    browser.add_argument("--chrome", help="Chromium/Chrome binary to start headless")
+    browser.add_argument("--cdp", help="DevTools HTTP URL of a running Chromium, e.g. http://127.0.0.1:9222")
+    parser.add_argument("--repeat", type=int, default=5, help="measured page views per mode")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per page view")
+    parser.add_argument("--out", default=os.path.join(REPO_DIR, "bench_results"))
+    args = parser.parse_args(argv)
+
+    import streamlit
+
+    profile_dir = chrome = None
+    cdp_url = args.cdp
+    if args.chrome:
+        profile_dir = tempfile.mkdtemp(prefix="lwa-chrome-")
+        chrome, cdp_url = start_chrome(args.chrome, profile_dir)
+    try:
+        with urllib.request.urlopen(f"{cdp_url.rstrip('/')}/json/version", timeout=10) as response:
+            browser_version = json.load(response).get("User-Agent", "")
+        results = {
+            "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "streamlit": streamlit.__version__,
+            "platform": platform.platform(),
+            "browser": browser_version,
+            "repeat": args.repeat,
+            "quiet_window_s": QUIET_WINDOW,
+        }
+        results.update(measure_modes(cdp_url, args.repeat, args.timeout))
+        for name in MODES:
+            m = results[name]["median"]
+            print(f"{name}:")
+            print(f"  {m['total_bytes'] / 1024:8.0f} KB transferred ({m['app_bytes'] / 1024:.0f} KB from the app, "
+                  f"{m['external_bytes'] / 1024:.0f} KB external, {m['websocket_bytes'] / 1024:.0f} KB websocket)")
+            print(f"  {m['requests']:8.0f} requests ({m['failed_requests']:.0f} failed), {m['iframes']:.0f} iframes")
+            tti = f"{m['tti_ms']:.0f} ms" if m["tti_ms"] is not None else "not reached"
+            print(f"  app ready {m['app_ready_ms']:.0f} ms, TTI {tti}")
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if chrome:
+            chrome.terminate()
+            chrome.wait(10)
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, "page-weight.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
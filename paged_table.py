@@ -0,0 +1,92 @@
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import cache_metrics
+from data_loader import DATE_FORMAT
+
+PAGE_SIZES = [10, 25, 50, 100]
+
+
+def filter_and_sort(df: pd.DataFrame, filters: tuple, sort_by: str = None, ascending: bool = True) -> np.ndarray:
+    """Row positions of df matching every (column, text) filter, in sort order.
+
+    Filters are case-insensitive substring matches. Missing values sort last.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for column, text in filters:
+        mask &= df[column].astype(str).str.contains(text, case=False, regex=False, na=False).to_numpy()
+    positions = np.flatnonzero(mask)
+
+    if sort_by:
+        values = df[sort_by].iloc[positions]
+        order = np.argsort(values.rank(method="first", ascending=ascending, na_option="bottom").to_numpy(),
+                           kind="stable")
+        positions = positions[order]
+    return positions
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _cached_positions(dataset_key: str, filters: tuple, sort_by: str, ascending: bool, _df: pd.DataFrame):
+    cache_metrics.mark_miss()
+    return filter_and_sort(_df, filters, sort_by, ascending)
+
+
+def page_bounds(total: int, size: int, page: int):
+    """(start, stop, pages) for a 1-based page, clamped to the pages there are; an empty result has one empty page."""
+    pages = max(1, math.ceil(total / size))
+    start = (min(max(page, 1), pages) - 1) * size
+    return start, min(start + size, total), pages
+
+
+def paged_table(df: pd.DataFrame, key: str, dataset_key: str, markdown: bool = False,
+                filter_columns: list = None, column_config: dict = None, page_size: int = 25):
+    """Show df one page at a time with sort and per-column filters.
+
+    Filtering, sorting and slicing happen on the server, so only the rows of
+    the visible page are sent to the browser. With markdown=True the page is
+    drawn with st.table, which renders markdown (e.g. bullet lists) in cells.
+    dataset_key identifies the data for caching the filtered/sorted positions.
+    """
+    filter_columns = list(df.columns) if filter_columns is None else filter_columns
+
+    sort_col, order_col, size_col = st.columns([3, 2, 2])
+    sort_by = sort_col.selectbox("Sort by", ["(original order)"] + list(df.columns), key=f"{key}_sort")
+    ascending = order_col.radio("Order", ["Ascending", "Descending"], horizontal=True,
+                                key=f"{key}_order") == "Ascending"
+    size = size_col.selectbox("Rows per page", PAGE_SIZES,
+                              index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 1,
+                              key=f"{key}_size")
+
+    filters = []
+    with st.expander("Filter columns"):
+        for column in filter_columns:
+            text = st.text_input(column, key=f"{key}_filter_{column}", placeholder="contains...")
+            if text.strip():
+                filters.append((column, text.strip()))
+
+    positions = cache_metrics.tracked(
+        "paged_table", _cached_positions, dataset_key, tuple(filters),
+        None if sort_by == "(original order)" else sort_by, ascending, df,
+    )
+
+    total = len(positions)
+    page_key = f"{key}_page"
+    _, _, pages = page_bounds(total, size, 1)
+    # Keep the page in range when a new filter leaves fewer pages
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=page_key)
+    start, stop, _ = page_bounds(total, size, page)
+    page_df = df.iloc[positions[start:stop]]
+
+    if markdown:
+        # st.table would show the time of day too; dates here are whole days
+        dates = page_df.select_dtypes("datetime").columns
+        st.table(page_df.assign(**{c: page_df[c].dt.strftime(DATE_FORMAT) for c in dates}))
+    else:
+        st.dataframe(page_df, column_config=column_config, width="stretch")
+    st.caption(f"Showing rows {min(start + 1, total)}–{stop} of {total}"
+               + (f" (filtered from {len(df)})" if filters else ""))
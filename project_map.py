@@ -0,0 +1,374 @@
+import pickle
+import time
+
+import folium
+import numpy as np
+import pandas as pd
+import streamlit as st
+from folium.plugins import MarkerCluster
+from folium.template import Template
+from streamlit_folium import st_folium
+
+import cache_metrics
+from spatial_index import GridIndex, expand, viewport_bounds
+
+MAP_HEIGHT = 800
+# Kepler's Plaza, Menlo Park - used when there are no valid data points and
+# the dataset doesn't set its own map_center (see dataset_registry.py)
+DEFAULT_CENTER = [37.45398, -122.184425]
+
+# Datasets with at least this many projects are drawn with the client-side
+# ProjectPointLayer instead of one folium.Marker per project
+FAST_LAYER_MIN_ROWS = 200
+
+# Datasets with at least this many projects only send the markers inside the
+# current viewport (plus VIEWPORT_MARGIN on each side), and switch to
+# aggregate counts when more than VIEWPORT_MAX_MARKERS would be shown
+VIEWPORT_MIN_ROWS = 5000
+VIEWPORT_MARGIN = 0.25
+VIEWPORT_MAX_MARKERS = 300
+AGGREGATE_BINS = 8
+ZOOM_START = 13
+
+
+def _column(df: pd.DataFrame, name: str, default) -> pd.Series:
+    """Column by name, or a constant Series when the CSV doesn't have it."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index, dtype=object)
+
+
+def _display_text(values: pd.Series) -> pd.Series:
+    """Stringify a column, showing 'N/A' for missing or 'n/a' values."""
+    text = values.astype(str)
+    missing = values.isna() | (text.str.strip().str.lower() == 'n/a')
+    return text.mask(missing, 'N/A')
+
+
+def _date_text(values: pd.Series) -> pd.Series:
+    """Dates as YYYY-MM-DD, showing 'N/A' for missing or unparseable values."""
+    dates = pd.to_datetime(values, errors='coerce', format='mixed')
+    return dates.dt.strftime('%Y-%m-%d').astype(object).where(dates.notna(), 'N/A')
+
+
+def _public_urls(urls: pd.Series) -> pd.Series:
+    """Usable project URLs with a scheme, or '' where the URL is missing or 'n/a'."""
+    text = urls.fillna('').astype(str)
+    stripped = text.str.strip()
+    has_url = (stripped != '') & (stripped.str.lower() != 'n/a')
+    # Ensure URL starts with http:// or https:// for proper linking
+    text = text.where(text.str.startswith(('http://', 'https://')), 'https://' + text)
+    return text.where(has_url, '')
+
+
+def _url_links(urls: pd.Series) -> pd.Series:
+    """'More Information' links for rows with a usable URL, a note for the rest."""
+    text = _public_urls(urls)
+    links = "<br><a href='" + text + "' target='_blank'>More Information</a>"
+    return links.where(text != '', "<br>No public URL available.")
+
+
+def _plural(counts: pd.Series, noun: str) -> pd.Series:
+    return counts.astype(str) + " " + noun + np.where(counts == 1, "", "s")
+
+
+def _link_text(df: pd.DataFrame) -> pd.Series:
+    """'Discussed in N meetings · mentioned by M council members' lines, when the
+    mention counts from entity_links.py are present, else ''."""
+    if 'meetings' not in df.columns or 'council_members' not in df.columns:
+        return pd.Series('', index=df.index, dtype=object)
+    meetings = df['meetings'].fillna(0).astype(int)
+    members = df['council_members'].fillna(0).astype(int)
+    return ("<b>Discussed in</b> " + _plural(meetings, "meeting")
+            + " · <b>mentioned by</b> " + _plural(members, "council member") + "<br>")
+
+
+def marker_html(df: pd.DataFrame):
+    """Build tooltip and popup HTML for every project with column operations.
+
+    Returns two Series aligned with df's index.
+    """
+    name = _display_text(_column(df, 'project', 'N/A'))
+    address = _display_text(_column(df, 'address', 'N/A'))
+    description = _column(df, 'description', None).fillna('No description available.').astype(str)
+    earliest = _date_text(_column(df, 'earliest_mention_date', 'N/A'))
+    latest = _date_text(_column(df, 'latest_mention_date', 'N/A'))
+    url_link = _url_links(_column(df, 'url', None))
+    lat = pd.Series(np.char.mod('%.4f', df['latitude'].to_numpy(dtype=float)), index=df.index)
+    lon = pd.Series(np.char.mod('%.4f', df['longitude'].to_numpy(dtype=float)), index=df.index)
+
+    # Tooltip with detailed information (description and URL are in the popup)
+    tooltip_html = (
+        "<h4>" + name + "</h4>"
+        + "<b>Address:</b> " + address + "<br>"
+        + "<b>Earliest Mention:</b> " + earliest + "<br>"
+        + "<b>Latest Mention:</b> " + latest + "<br>"
+        + "<b>Coordinates:</b> (" + lat + ", " + lon + ")<br>"
+        + "<p><small>Click for more info</small></p>"
+    )
+
+    # Popup text (appears on click)
+    popup_html = (
+        "<b>" + name + "</b><br>"
+        + description + "<br>"
+        + "<b>Earliest Mention:</b> " + earliest + "<br>"
+        + "<b>Latest Mention:</b> " + latest + "<br>"
+        + _link_text(df)
+        + url_link.str.replace('<br>', '', regex=False)
+    )
+    return tooltip_html, popup_html
+
+
+class ProjectPointLayer(MarkerCluster):
+    """Browser-clustered project markers built from one columnar payload.
+
+    Each field is shipped once per project as parallel arrays, and the
+    tooltip and popup HTML are assembled in JavaScript when a marker is
+    hovered or clicked, so page weight stays small for thousands of pins.
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var cols = {{ this.columns|tojson }};
+                var cluster = L.markerClusterGroup({{ this.options|tojavascript }});
+                var icon = L.AwesomeMarkers.icon(
+                    {markerColor: 'green', icon: 'info-sign', prefix: 'glyphicon'});
+
+                function tooltipHtml(i) {
+                    return '<div style="max-width: 400px;">'
+                        + '<h4>' + cols.project[i] + '</h4>'
+                        + '<b>Address:</b> ' + cols.address[i] + '<br>'
+                        + '<b>Earliest Mention:</b> ' + cols.earliest[i] + '<br>'
+                        + '<b>Latest Mention:</b> ' + cols.latest[i] + '<br>'
+                        + '<b>Coordinates:</b> (' + cols.lat[i].toFixed(4) + ', '
+                        + cols.lon[i].toFixed(4) + ')<br>'
+                        + '<p><small>Click for more info</small></p></div>';
+                }
+
+                function popupHtml(i) {
+                    var link = cols.url[i]
+                        ? "<a href='" + cols.url[i] + "' target='_blank'>More Information</a>"
+                        : 'No public URL available.';
+                    return '<b>' + cols.project[i] + '</b><br>'
+                        + cols.description[i] + '<br>'
+                        + '<b>Earliest Mention:</b> ' + cols.earliest[i] + '<br>'
+                        + '<b>Latest Mention:</b> ' + cols.latest[i] + '<br>'
+                        + cols.links[i]
+                        + link;
+                }
+
+                function makeMarker(i) {
+                    var marker = L.marker([cols.lat[i], cols.lon[i]], {icon: icon});
+                    marker.bindTooltip(function () { return tooltipHtml(i); }, {sticky: true});
+                    marker.bindPopup(function () { return popupHtml(i); }, {maxWidth: 300});
+                    return marker;
+                }
+
+                var markers = [];
+                for (var i = 0; i < cols.lat.length; i++) {
+                    markers.push(makeMarker(i));
+                }
+                cluster.addLayers(markers);
+                cluster.addTo({{ this._parent.get_name() }});
+                return cluster;
+            })();
+        {% endmacro %}"""
+    )
+
+    def __init__(self, df: pd.DataFrame, **kwargs):
+        kwargs.setdefault('chunked_loading', True)
+        super().__init__(**kwargs)
+        self._name = "ProjectPointLayer"
+        self.columns = point_columns(df)
+
+
+def point_columns(df: pd.DataFrame) -> dict:
+    """Columnar marker payload: one list per field, one entry per project."""
+    return {
+        'lat': df['latitude'].round(6).tolist(),
+        'lon': df['longitude'].round(6).tolist(),
+        'project': _display_text(_column(df, 'project', 'N/A')).tolist(),
+        'address': _display_text(_column(df, 'address', 'N/A')).tolist(),
+        'description': _column(df, 'description', None).fillna('No description available.').astype(str).tolist(),
+        'earliest': _date_text(_column(df, 'earliest_mention_date', 'N/A')).tolist(),
+        'latest': _date_text(_column(df, 'latest_mention_date', 'N/A')).tolist(),
+        'url': _public_urls(_column(df, 'url', None)).tolist(),
+        'links': _link_text(df).tolist(),
+    }
+
+
+def resolve_mode(df: pd.DataFrame, mode: str = "auto") -> str:
+    """Map mode for df: "auto" picks by FAST_LAYER_MIN_ROWS and VIEWPORT_MIN_ROWS."""
+    if mode != "auto":
+        return mode
+    if len(df) >= VIEWPORT_MIN_ROWS:
+        return "viewport"
+    return "fast" if len(df) >= FAST_LAYER_MIN_ROWS else "markers"
+
+
+def _add_markers(df: pd.DataFrame, parent):
+    tooltip_html, popup_html = marker_html(df)
+    for lat, lon, tooltip, popup in zip(df['latitude'], df['longitude'], tooltip_html, popup_html):
+        folium.Marker(
+            location=[lat, lon],
+            tooltip=folium.Tooltip(tooltip, sticky=True, max_width=400),
+            popup=folium.Popup(popup, max_width=300),
+            icon=folium.Icon(color='green', icon='info-sign'),
+        ).add_to(parent)
+
+
+def build_project_map(df: pd.DataFrame, mode: str = "auto", center=None) -> folium.Map:
+    """Folium map with clustered project markers.
+
+    mode is "markers" for one folium.Marker per project, "fast" for the
+    client-side ProjectPointLayer, "viewport" for a base map whose markers
+    come from viewport_layer() on each render, or "auto" to pick by size.
+    center is used when df has no projects (DEFAULT_CENTER if not given).
+    """
+    # Using the mean of the available coordinates for a more accurate center
+    if not df.empty:
+        map_center = [df['latitude'].mean(), df['longitude'].mean()]
+    else:
+        map_center = list(center or DEFAULT_CENTER)
+
+    m = folium.Map(location=map_center, zoom_start=ZOOM_START, height=MAP_HEIGHT, control_scale=True)
+
+    mode = resolve_mode(df, mode)
+    if mode == "viewport":
+        # Markers are added per render by viewport_layer()
+        return m
+
+    if mode == "fast":
+        ProjectPointLayer(df).add_to(m)
+        return m
+
+    marker_cluster = MarkerCluster().add_to(m)
+    _add_markers(df, marker_cluster)
+    return m
+
+
+def viewport_layer(df: pd.DataFrame, index: GridIndex, bounds) -> folium.FeatureGroup:
+    """Markers for the projects in bounds, or aggregate counts when there are too many."""
+    layer = folium.FeatureGroup(name="Projects")
+    bounds = expand(bounds, VIEWPORT_MARGIN)
+    positions = None
+    if index.candidate_count(bounds) <= 4 * VIEWPORT_MAX_MARKERS:
+        positions = index.query(bounds)
+    if positions is not None and len(positions) <= VIEWPORT_MAX_MARKERS:
+        _add_markers(df.iloc[positions], layer)
+        return layer
+
+    for lat, lon, count in zip(*index.aggregate(bounds, AGGREGATE_BINS)):
+        folium.CircleMarker(
+            location=[lat, lon],
+            radius=float(8 + 4 * np.log10(count)),
+            color='#1E8449', fill=True, fill_opacity=0.6, weight=1,
+            tooltip=f"{count:,} projects - zoom in to see them",
+        ).add_to(layer)
+    return layer
+
+
+class CachedMap:
+    """A built map kept pickled, so each render gets its own copy.
+
+    st_folium changes the map it renders: it appends scripts to the map's
+    figure, renumbers element ids and adds the feature group to the map.
+    Rendering a shared map or feature group directly would grow the payload
+    on every rerun, so each render needs a copy. Unpickling one is 5-8x
+    cheaper than copy.deepcopy of the built map (see _benchmark).
+    """
+
+    def __init__(self, m: folium.Map):
+        self.location = m.location
+        self._pickled = pickle.dumps(m, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def copy(self) -> folium.Map:
+        return pickle.loads(self._pickled)
+
+
+# dataset_key identifies the projects data (e.g. its file fingerprint), so the
+# frame itself is excluded from hashing via the leading underscore.
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _cached_project_map(dataset_key: str, mode: str, center, _df: pd.DataFrame) -> CachedMap:
+    cache_metrics.mark_miss()
+    return CachedMap(build_project_map(_df, mode, center))
+
+
+def get_project_map(df: pd.DataFrame, dataset_key: str, mode: str = "auto", center=None) -> CachedMap:
+    """Map for this projects dataset, built once and reused across reruns and sessions."""
+    return cache_metrics.tracked("project_map", _cached_project_map, dataset_key, mode,
+                                 tuple(center) if center else None, df)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _cached_grid_index(dataset_key: str, _df: pd.DataFrame) -> GridIndex:
+    cache_metrics.mark_miss()
+    return GridIndex(_df['latitude'].to_numpy(), _df['longitude'].to_numpy())
+
+
+def get_grid_index(df: pd.DataFrame, dataset_key: str) -> GridIndex:
+    """Spatial index for this projects dataset, built once and shared by all sessions."""
+    return cache_metrics.tracked("project_grid_index", _cached_grid_index, dataset_key, df)
+
+
+def _bounds_from_state(state) -> tuple:
+    """(south, west, north, east) from st_folium's returned bounds, or None before the first move."""
+    try:
+        sw, ne = state["bounds"]["_southWest"], state["bounds"]["_northEast"]
+        bounds = (float(sw["lat"]), float(sw["lng"]), float(ne["lat"]), float(ne["lng"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+    return bounds if bounds[0] < bounds[2] and bounds[1] < bounds[3] else None
+
+
+def show_project_map(m: CachedMap, key: str, width: int = 900, height: int = 600,
+                     df: pd.DataFrame = None, dataset_key: str = "", mode: str = "auto"):
+    """Render a copy of a cached map with st_folium and return its state.
+
+    For viewport-mode maps pass the projects df and its dataset_key: the
+    markers for the last reported map bounds are sent as a feature group,
+    which st_folium swaps in without reloading the base map.
+    """
+    layer = None
+    if df is not None and resolve_mode(df, mode) == "viewport":
+        bounds = _bounds_from_state(st.session_state.get(key))
+        if bounds is None:
+            bounds = viewport_bounds(m.location, ZOOM_START, width, height)
+        layer = viewport_layer(df, get_grid_index(df, dataset_key), bounds)
+    return st_folium(m.copy(), width=width, height=height, key=key, feature_group_to_add=layer)
+
+
+def _benchmark(repeat: int = 7):
+    """Per-render cost of copying the cached map (deepcopy vs unpickling) next to the st_folium call itself."""
+    import copy
+    import statistics
+
+    from data_loader import PROJECTS_CSV, clean_projects
+    from synthetic_data import scale_projects
+
+    raw = pd.read_csv(PROJECTS_CSV)
+    rng = np.random.default_rng(0)
+
+    def median_ms(fn, n=repeat):
+        timings = []
+        for _ in range(n):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    print(f"{'rows':>5} {'mode':8} {'build':>8} {'deepcopy':>9} {'unpickle':>9} {'st_folium':>10}")
+    for rows in [len(clean_projects(raw, "Menlo Park")[0]), FAST_LAYER_MIN_ROWS - 1, FAST_LAYER_MIN_ROWS,
+                 VIEWPORT_MIN_ROWS - 1, VIEWPORT_MIN_ROWS]:
+        df = clean_projects(scale_projects(raw, -(-rows // len(raw)) * 2, rng), "Menlo Park")[0].iloc[:rows]
+        m = build_project_map(df)
+        cached = CachedMap(m)
+        print(f"{rows:5d} {resolve_mode(df):8} {median_ms(lambda: build_project_map(df), 3):8.1f} "
+              f"{median_ms(lambda: copy.deepcopy(m)):9.1f} {median_ms(cached.copy):9.1f} "
+              f"{median_ms(lambda: st_folium(cached.copy(), width=900, height=600, key='bench'), 3):10.1f}  ms")
+
+
+if __name__ == "__main__":
+    _benchmark()
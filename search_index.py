@@ -0,0 +1,217 @@
+import copy
+import itertools
+import math
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+
+import pandas as pd
+import streamlit as st
+
+import cache_metrics
+from data_loader import date_keys, frames_key
+from text_utils import split_bullets, tokenize
+
+# Page anchors each kind of hit links to
+ANCHORS = {
+    "meeting": "#meeting-details",
+    "project": "#project-details",
+    "position": "#commissioner-specific-positions",
+}
+
+
+def _doc_terms(doc: dict) -> list:
+    return tokenize(doc["label"] + " " + doc["text"])
+
+
+class SearchIndex:
+    """Inverted index with BM25 ranking over meeting topics, projects and positions.
+
+    updated() derives a new index with some source rows replaced. The
+    replaced documents' postings are dropped, so they no longer count
+    towards IDF; their slots in docs are kept until more than half the
+    index is stale, at which point it is rebuilt.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, docs: list):
+        # docs: list of dicts with kind, key, label, text
+        self.docs = []
+        self.postings = {}  # term -> [(doc_id, term frequency)]
+        self.lengths = []
+        self.by_key = {}  # (kind, key) -> doc ids from that source row
+        self.removed = set()
+        self.live_length = 0
+        self._owned = set()  # terms whose postings list this index may append to
+        self._add(docs)
+
+    @property
+    def avg_length(self) -> float:
+        live = len(self.docs) - len(self.removed)
+        return self.live_length / live if live else 0.0
+
+    def _add(self, docs: list):
+        for doc in docs:
+            doc_id = len(self.docs)
+            self.docs.append(doc)
+            terms = _doc_terms(doc)
+            self.lengths.append(len(terms))
+            self.live_length += len(terms)
+            self.by_key.setdefault((doc["kind"], doc["key"]), []).append(doc_id)
+            for term, tf in Counter(terms).items():
+                if term not in self._owned:
+                    # Postings may be shared with the index this one was derived from
+                    self.postings[term] = list(self.postings.get(term, ()))
+                    self._owned.add(term)
+                self.postings[term].append((doc_id, tf))
+
+    def updated(self, drop_keys, new_docs: list) -> "SearchIndex":
+        """New index without the docs of drop_keys ((kind, key) pairs) and with new_docs added.
+
+        This index is left unchanged; postings lists are shared and only
+        copied for terms that the dropped docs or new_docs change.
+        """
+        index = copy.copy(self)
+        index.docs = list(self.docs)
+        index.lengths = list(self.lengths)
+        index.by_key = dict(self.by_key)
+        index.postings = dict(self.postings)
+        index.removed = set(self.removed)
+        index._owned = set()
+        dropped = set()
+        for key in drop_keys:
+            for doc_id in index.by_key.pop(key, ()):
+                dropped.add(doc_id)
+                index.live_length -= index.lengths[doc_id]
+        index.removed |= dropped
+        if len(index.removed) > len(index.docs) / 2:
+            return SearchIndex([doc for i, doc in enumerate(index.docs) if i not in index.removed] + new_docs)
+        for term in {term for doc_id in dropped for term in _doc_terms(index.docs[doc_id])}:
+            postings = [posting for posting in index.postings[term] if posting[0] not in dropped]
+            if postings:
+                index.postings[term] = postings
+                index._owned.add(term)
+            else:
+                del index.postings[term]
+        index._add(new_docs)
+        return index
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """Ranked hits as dicts with kind, label, text, anchor and score."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        n_docs = len(self.docs) - len(self.removed)
+        avg_length = self.avg_length
+        scores = defaultdict(float)
+        matched = defaultdict(int)
+        for term in terms:
+            postings = self.postings.get(term, [])
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings:
+                norm = tf + self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / norm
+                matched[doc_id] += 1
+
+        phrase = query.strip().lower()
+        ranked = []
+        for doc_id, score in scores.items():
+            # Prefer docs that contain every query term, then the exact phrase
+            score *= matched[doc_id] / len(terms)
+            if len(terms) > 1 and phrase in self.docs[doc_id]["text"].lower():
+                score *= 2
+            ranked.append((score, doc_id))
+        ranked.sort(reverse=True)
+
+        hits = []
+        for score, doc_id in ranked[:limit]:
+            doc = self.docs[doc_id]
+            hits.append({**doc, "anchor": ANCHORS[doc["kind"]], "score": round(score, 3)})
+        return hits
+
+
+def build_documents(projects: pd.DataFrame, stances: pd.DataFrame, topics: pd.DataFrame) -> list:
+    """One document per meeting bullet, per project and per council member position bullet."""
+    docs = []
+    for date, topics_md in zip(date_keys(topics["Date"]), topics["Major_Topics"]):
+        for item in split_bullets(topics_md):
+            docs.append({"kind": "meeting", "key": str(date), "label": f"Meeting {date}", "text": item})
+
+    project_text = projects["address"].fillna("").astype(str) + ". " + projects["description"].fillna("").astype(str)
+    for name, text in zip(projects["project"], project_text):
+        docs.append({"kind": "project", "key": str(name), "label": str(name), "text": text})
+
+    for member, positions_md in zip(stances["Council Member"], stances["Key Positions"]):
+        for item in split_bullets(positions_md):
+            docs.append({"kind": "position", "key": str(member), "label": str(member), "text": item})
+    return docs
+
+
+# Source row key column per document kind, for updating from live deltas
+DOC_KEYS = {"project": "project", "position": "Council Member", "meeting": "Date"}
+
+# Recently built indexes by dataset key, so a version produced by live
+# ingestion (see ingest.py) can be derived from its parent's index
+_RECENT_MAX = 4
+_recent = OrderedDict()
+_recent_lock = threading.Lock()
+
+
+def _from_parent(projects, stances, topics):
+    """Index derived from a recent index of an earlier version of these frames, or None."""
+    frames = (("project", projects), ("position", stances), ("meeting", topics))
+    # Each frame either is unchanged or carries its parent version in attrs["delta"]
+    options = [[(df.attrs.get("fingerprint", ""), None)] + ([(df.attrs["delta"]["parent"], df.attrs["delta"]["keys"])]
+               if df.attrs.get("delta") else []) for _, df in frames]
+    for choice in itertools.product(*options):
+        if all(keys is None for _, keys in choice):
+            continue
+        with _recent_lock:
+            # Same form as frames_key
+            parent = _recent.get(":".join(fingerprint for fingerprint, _ in choice))
+        if parent is None:
+            continue
+        drop, changed = set(), {}
+        for (kind, df), (_, keys) in zip(frames, choice):
+            if keys is not None:
+                drop |= {(kind, key) for key in keys}
+                column = df[DOC_KEYS[kind]]
+                values = pd.Series(date_keys(column), index=df.index) if kind == "meeting" else column.astype(str)
+                changed[kind] = df[values.isin(keys)]
+        empty = {kind: df.iloc[:0] for kind, df in frames}
+        new_docs = build_documents(changed.get("project", empty["project"]),
+                                   changed.get("position", empty["position"]),
+                                   changed.get("meeting", empty["meeting"]))
+        return parent.updated(drop, new_docs)
+    return None
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _cached_index(dataset_key: str, _projects, _stances, _topics) -> SearchIndex:
+    cache_metrics.mark_miss()
+    index = _from_parent(_projects, _stances, _topics) or SearchIndex(build_documents(_projects, _stances, _topics))
+    with _recent_lock:
+        _recent[dataset_key] = index
+        while len(_recent) > _RECENT_MAX:
+            _recent.popitem(last=False)
+    return index
+
+
+def get_search_index(projects: pd.DataFrame, stances: pd.DataFrame, topics: pd.DataFrame) -> SearchIndex:
+    """Index for this version of the three datasets, built once and shared by all sessions."""
+    # Fingerprints cover the load parameters (see data_loader.dataset_fingerprint),
+    # so two cities read from one CSV get separate indexes
+    dataset_key = frames_key((projects, stances, topics))
+    return cache_metrics.tracked("search_index", _cached_index, dataset_key, projects, stances, topics)
+
+
+def timed_search(index: SearchIndex, query: str, limit: int = 10):
+    """Hits for query and the lookup time in milliseconds."""
+    start = time.perf_counter()
+    hits = index.search(query, limit)
+    return hits, (time.perf_counter() - start) * 1000
@@ -0,0 +1,151 @@
+"""Read-only datasets shared by every session and server process.
+
+st.cache_data hands each caller its own unpickled copy of a cached frame,
+so every rerun of every session used to materialize the projects, stances
+and topics frames again. With the shared store, each loaded dataset is
+written once to an uncompressed Arrow IPC file under STORE_DIR and
+memory-mapped:
+
+  * all sessions in a process share one DataFrame (st.cache_resource)
+  * its columns point straight into the mapping (strings stay Arrow-backed
+    via pd.ArrowDtype), so the data lives in the OS page cache rather than
+    on the Python heap
+  * several server processes behind a load balancer map the same files
+    and share those pages
+
+Frames from the store must be treated as immutable. Numeric columns are
+backed by read-only buffers and raise if written to; derive new frames
+with assign/copy instead.
+
+Files are named by dataset and source fingerprint and written atomically,
+so processes that race to build the same version write identical files and
+a new version never disturbs readers of the old one. Old versions are
+removed lazily: the previous one is always kept, and older ones only once
+they are PRUNE_GRACE seconds old, so a process that hasn't seen the new
+source yet can still open its version. Set LWA_STORE_DIR to
+put the store on a volume shared by all server processes, or
+LWA_SHARED_STORE=0 to fall back to per-call copies.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+import streamlit as st
+
+import cache_metrics
+
+logger = logging.getLogger("lwa.store")
+
+STORE_DIR = os.environ.get("LWA_STORE_DIR") or os.path.join("data", "store")
+
+_ATTRS_KEY = b"lwa_attrs"
+
+# Versions older than the previous one are removed once they are this many seconds old
+PRUNE_GRACE = 3600.0
+
+
+def enabled() -> bool:
+    return os.environ.get("LWA_SHARED_STORE", "1") != "0"
+
+
+def _prefix(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_]+", "_", name)
+
+
+def store_path(name: str, fingerprint: str, store_dir: str = None) -> str:
+    digest = hashlib.sha1(f"{name}\0{fingerprint}".encode()).hexdigest()[:16]
+    return os.path.join(store_dir or STORE_DIR, f"{_prefix(name)}-{digest}.arrow")
+
+
+def _arrow_type(dtype: pa.DataType):
+    # Keep string columns in Arrow memory; everything else maps to its usual pandas dtype
+    return pd.ArrowDtype(dtype) if pa.types.is_string(dtype) or pa.types.is_large_string(dtype) else None
+
+
+def write_frame(path: str, df: pd.DataFrame):
+    """Write df (and its attrs) as an uncompressed Arrow IPC file, atomically."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_ATTRS_KEY] = json.dumps(df.attrs, default=str).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def read_frame(path: str) -> pd.DataFrame:
+    """Memory-map an Arrow IPC file as a DataFrame without copying its buffers where possible."""
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    # The mapping stays alive as long as any column references it
+    df = table.to_pandas(types_mapper=_arrow_type, split_blocks=True)
+    df.attrs.update(json.loads((table.schema.metadata or {}).get(_ATTRS_KEY, b"{}")))
+    return df
+
+
+def _prune(name: str, keep: str, grace: float = None):
+    """Remove old versions of this dataset, except the newest one before keep and any younger than grace."""
+    # Mapped files stay readable after removal, but other processes may still be on an
+    # older source (or about to open its file), so they get a grace period to move on
+    grace = PRUNE_GRACE if grace is None else grace
+    pattern = re.compile(re.escape(_prefix(name)) + r"-[0-9a-f]{16}\.arrow")
+    versions = []
+    for path in glob.glob(os.path.join(os.path.dirname(keep), _prefix(name) + "-*.arrow")):
+        if path != keep and pattern.fullmatch(os.path.basename(path)):
+            try:
+                versions.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+    cutoff = time.time() - grace
+    for mtime, path in sorted(versions, reverse=True)[1:]:
+        if mtime < cutoff:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _mapped_frame(name: str, fingerprint: str, _build, _args: tuple) -> pd.DataFrame:
+    cache_metrics.mark_miss()
+    path = store_path(name, fingerprint)
+    if not os.path.exists(path):
+        df = _build(*_args)
+        try:
+            write_frame(path, df)
+        except (pa.ArrowException, OSError, TypeError) as e:
+            # Columns Arrow can't type (e.g. mixed objects) or a read-only disk: serve the frame as built
+            logger.warning("not storing %s: %s", name, e)
+            df.attrs["fingerprint"] = fingerprint
+            return df
+        _prune(name, path)
+        logger.info("wrote %s (%d rows)", path, len(df))
+    df = read_frame(path)
+    df.attrs["fingerprint"] = fingerprint
+    return df
+
+
+def shared_frame(name: str, fingerprint: str, build, *args) -> pd.DataFrame:
+    """The dataset `name` at this fingerprint, built with build(*args) on first use.
+
+    name must identify everything build depends on besides the fingerprint
+    (e.g. "projects:Menlo Park").
+    """
+    return cache_metrics.tracked(name.split(":")[0], _mapped_frame, name, fingerprint, build, args)
+
+
+def mapped_files(store_dir: str = None) -> list:
+    """(path, bytes) of the store files, for the memory report."""
+    paths = sorted(glob.glob(os.path.join(store_dir or STORE_DIR, "*.arrow")))
+    return [(p, os.path.getsize(p)) for p in paths]
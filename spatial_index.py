@@ -0,0 +1,172 @@
+"""Uniform grid index over project coordinates for viewport queries.
+
+Points are bucketed into square lat/lon cells and stored sorted by cell id
+(row-major), so the cells of one grid row inside a viewport are a single
+contiguous slice. A query is one vectorized searchsorted per visible row
+plus an exact bounds check on the candidates. Per-cell counts and
+coordinate sums are kept for zoomed-out views, which show aggregate
+counts instead of individual markers.
+
+Bounds are (south, west, north, east) tuples in degrees throughout.
+
+tests/test_spatial_index.py checks queries against a brute-force scan.
+Run `python spatial_index.py` to time them on 100k random points.
+"""
+
+import math
+
+import numpy as np
+
+# Cells are sized so the average occupied cell holds about this many points
+POINTS_PER_CELL = 4
+MIN_CELL_DEG = 1e-4
+
+
+def expand(bounds, margin: float):
+    """Pad bounds on every side by margin times their height/width."""
+    south, west, north, east = bounds
+    dlat = (north - south) * margin
+    dlon = (east - west) * margin
+    return south - dlat, west - dlon, north + dlat, east + dlon
+
+
+def viewport_bounds(center, zoom: int, width: int, height: int):
+    """Approximate bounds Leaflet shows for center/zoom in a width x height map (Web Mercator)."""
+    deg_per_px = 360 / (256 * 2 ** zoom)
+    half_lon = width * deg_per_px / 2
+    half_lat = height * deg_per_px * math.cos(math.radians(center[0])) / 2
+    return center[0] - half_lat, center[1] - half_lon, center[0] + half_lat, center[1] + half_lon
+
+
+class GridIndex:
+    """Grid of lat/lon cells over a fixed set of points; build once per dataset."""
+
+    def __init__(self, lat, lon, cell_deg: float = None):
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        self.size = len(lat)
+        if self.size == 0:
+            lat = lon = np.zeros(0)
+        if cell_deg is None:
+            span = max(np.ptp(lat), np.ptp(lon)) if self.size else 0.0
+            cell_deg = span / max(1, int(math.sqrt(self.size / POINTS_PER_CELL)))
+        self.cell = max(cell_deg, MIN_CELL_DEG)
+        self.lat0 = math.floor(lat.min() / self.cell) * self.cell if self.size else 0.0
+        self.lon0 = math.floor(lon.min() / self.cell) * self.cell if self.size else 0.0
+
+        rows = self._row(lat)
+        cols = self._col(lon)
+        self.n_rows = int(rows.max()) + 1 if self.size else 0
+        self.n_cols = int(cols.max()) + 1 if self.size else 0
+        ids = rows * self.n_cols + cols
+
+        # Positions into the caller's arrays, ordered by cell
+        self.order = np.argsort(ids, kind="stable")
+        self.ids = ids[self.order]
+        self.lat = lat[self.order]
+        self.lon = lon[self.order]
+
+        # Occupied cells with their point counts and coordinate sums
+        self.cell_ids, starts, self.cell_counts = np.unique(self.ids, return_index=True, return_counts=True)
+        self.cell_rows = self.cell_ids // max(self.n_cols, 1)
+        self.cell_cols = self.cell_ids % max(self.n_cols, 1)
+        self.cell_lat_sum = np.add.reduceat(self.lat, starts) if self.size else np.zeros(0)
+        self.cell_lon_sum = np.add.reduceat(self.lon, starts) if self.size else np.zeros(0)
+
+    def _row(self, lat):
+        return np.floor((np.asarray(lat, dtype=float) - self.lat0) / self.cell).astype(np.int64)
+
+    def _col(self, lon):
+        return np.floor((np.asarray(lon, dtype=float) - self.lon0) / self.cell).astype(np.int64)
+
+    def _cell_range(self, bounds):
+        """Clipped (first row, last row, first col, last col), or None if outside the grid."""
+        south, west, north, east = bounds
+        r0, r1 = max(int(self._row(south)), 0), min(int(self._row(north)), self.n_rows - 1)
+        c0, c1 = max(int(self._col(west)), 0), min(int(self._col(east)), self.n_cols - 1)
+        if r0 > r1 or c0 > c1:
+            return None
+        return r0, r1, c0, c1
+
+    def _slices(self, bounds):
+        """Start/end positions in the sorted points of each grid row's cells inside bounds."""
+        cells = self._cell_range(bounds) if self.size else None
+        if cells is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        r0, r1, c0, c1 = cells
+        row_base = np.arange(r0, r1 + 1, dtype=np.int64) * self.n_cols
+        lo = np.searchsorted(self.ids, row_base + c0, side="left")
+        hi = np.searchsorted(self.ids, row_base + c1, side="right")
+        return lo, hi
+
+    def candidate_count(self, bounds) -> int:
+        """Points in the cells touching bounds: a cheap upper bound on len(query(bounds))."""
+        lo, hi = self._slices(bounds)
+        return int((hi - lo).sum())
+
+    def query(self, bounds) -> np.ndarray:
+        """Positions (into the arrays the index was built from) of points inside bounds."""
+        lo, hi = self._slices(bounds)
+        lengths = hi - lo
+        total = int(lengths.sum())
+        if total == 0:
+            return np.zeros(0, dtype=np.int64)
+        # Concatenate the per-row slices lo[i]:hi[i] without a Python loop
+        offsets = np.cumsum(lengths) - lengths
+        candidates = np.repeat(lo - offsets, lengths) + np.arange(total)
+
+        south, west, north, east = bounds
+        lat, lon = self.lat[candidates], self.lon[candidates]
+        inside = (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+        return self.order[candidates[inside]]
+
+    def aggregate(self, bounds, bins: int = 8):
+        """Point counts over a bins x bins grid covering bounds, at cell resolution.
+
+        Returns (lat, lon, count) arrays, one entry per non-empty bin, placed
+        at the mean position of the points in that bin.
+        """
+        cells = self._cell_range(bounds) if self.size else None
+        if cells is None:
+            return np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.int64)
+        r0, r1, c0, c1 = cells
+        inside = (self.cell_rows >= r0) & (self.cell_rows <= r1) & (self.cell_cols >= c0) & (self.cell_cols <= c1)
+        bin_row = (self.cell_rows[inside] - r0) * bins // (r1 - r0 + 1)
+        bin_col = (self.cell_cols[inside] - c0) * bins // (c1 - c0 + 1)
+        bin_id = bin_row * bins + bin_col
+        counts = np.bincount(bin_id, weights=self.cell_counts[inside], minlength=bins * bins)
+        lat_sum = np.bincount(bin_id, weights=self.cell_lat_sum[inside], minlength=bins * bins)
+        lon_sum = np.bincount(bin_id, weights=self.cell_lon_sum[inside], minlength=bins * bins)
+        filled = counts > 0
+        return lat_sum[filled] / counts[filled], lon_sum[filled] / counts[filled], counts[filled].astype(np.int64)
+
+
+def _benchmark(n: int = 100_000, queries: int = 200, seed: int = 0):
+    import time
+
+    rng = np.random.default_rng(seed)
+    # Clustered points around a few city centers, like a multi-city dataset
+    centers = rng.uniform([36.5, -123.0], [38.5, -121.0], size=(20, 2))
+    which = rng.integers(0, len(centers), n)
+    lat = centers[which, 0] + rng.normal(0, 0.05, n)
+    lon = centers[which, 1] + rng.normal(0, 0.05, n)
+
+    start = time.perf_counter()
+    index = GridIndex(lat, lon)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for _ in range(queries):
+        center = centers[rng.integers(len(centers))] + rng.normal(0, 0.05, 2)
+        bounds = viewport_bounds(center, int(rng.integers(12, 17)), 900, 600)
+        start = time.perf_counter()
+        index.query(bounds)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    print(f"{n} points, {len(index.cell_ids)} occupied cells, built in {build_ms:.1f} ms")
+    print(f"query median {timings[len(timings) // 2]:.3f} ms, p95 {timings[int(len(timings) * 0.95)]:.3f} ms")
+
+
+if __name__ == "__main__":
+    _benchmark()
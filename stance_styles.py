@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import cache_metrics
+
+# Stance cell colors for light and dark screen modes
+STANCE_PALETTES = {
+    "dark": {
+        'Pro': 'background-color: #27AE60; color: white;',      # darker green
+        'Mixed': 'background-color: #B7950B; color: white;',    # olive
+        'Neutral': 'background-color: #2874A6; color: white;',  # medium blue
+        'Opposed': 'background-color: #CA6F1E; color: white;',  # dark orange
+    },
+    "light": {
+        'Pro': 'background-color: #D5F5E3; color: black;',      # pastel green
+        'Mixed': 'background-color: #F9E79F; color: black;',    # pastel yellow
+        'Neutral': 'background-color: #D6EAF8; color: black;',  # pastel blue
+        'Opposed': 'background-color: #FAD7A0; color: black;',  # pastel orange
+    },
+}
+
+# Used for blank or unrecognized stance values so they still read as table cells
+FALLBACK_STYLES = {
+    "dark": 'background-color: #566573; color: white;',   # slate gray
+    "light": 'background-color: #EAECEE; color: black;',  # light gray
+}
+
+# Columns in the stances CSV that are not policy stances
+NON_STANCE_COLUMNS = ['Council Member', 'Key Positions']
+
+
+def stance_columns(df: pd.DataFrame) -> list:
+    return [col for col in df.columns if col not in NON_STANCE_COLUMNS]
+
+
+def style_matrix(df: pd.DataFrame, theme: str) -> pd.DataFrame:
+    """CSS for every cell of df, built by mapping stance categories in one pass.
+
+    Non-stance columns get no style; unknown stances get the theme's fallback.
+    """
+    theme = theme if theme in STANCE_PALETTES else "light"
+    palette = STANCE_PALETTES[theme]
+    columns = stance_columns(df)
+
+    # Category codes index into the palette; -1 (not a known stance) picks the
+    # fallback, which sits at the end of the lookup array.
+    lookup = np.array(list(palette.values()) + [FALLBACK_STYLES[theme]], dtype=object)
+    values = df[columns].to_numpy().ravel()
+    codes = pd.Categorical(values, categories=list(palette)).codes
+    styles = lookup[codes].reshape(len(df), len(columns))
+
+    matrix = pd.DataFrame('', index=df.index, columns=df.columns)
+    matrix[columns] = styles
+    return matrix
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _cached_style_matrix(dataset_key: str, theme: str, _df: pd.DataFrame) -> pd.DataFrame:
+    cache_metrics.mark_miss()
+    return style_matrix(_df, theme)
+
+
+def styled_stances(df: pd.DataFrame, theme: str, dataset_key: str):
+    """Styler for the stances grid, reusing the style matrix for this (dataset, theme)."""
+    matrix = cache_metrics.tracked("stance_styles", _cached_style_matrix, dataset_key, theme, df)
+    return df.style.apply(lambda _: matrix, axis=None)
@@ -0,0 +1,574 @@
+"""Static export of the recap for serving from a CDN.
+
+Renders the read-only parts of the page into a bundle that needs no Python
+at view time:
+
+    site/
+      index.html            the whole recap, assembled from the sections
+      map.html              the Folium project map (embedded in an iframe)
+      assets/               logo and video posters
+      assets/vendor/        with --vendor: vega, vega-lite, vega-embed, Leaflet and the map's other CDN files
+      sections/*.html       one pre-rendered fragment per section
+      export_manifest.json  what each fragment was built from, and the files it wrote
+
+Charts are the same Vega-Lite specs the app sends, drawn with vega-embed;
+tables are plain HTML with every row, including the project links from
+entity_links.py. Search, filters, sorting and feedback stay in the live
+app, which the page links to (--app-url).
+
+The page and map load vega and Leaflet from their CDNs, at the versions
+pinned below. The bundle is served from a CDN itself and its map tiles
+come from the tile server, so it needs the network either way; the
+third-party files are usually already in the reader's browser cache. For
+hosts that block those CDNs, --vendor copies the scripts and stylesheets
+into the bundle (plus the fonts and images their CSS refers to). They are
+downloaded once into the local vendor/ cache, so the first --vendor export
+needs network access.
+
+The export is incremental. Each section lists the datasets and source
+files it depends on, and the manifest records a hash of their
+fingerprints along with the files the section wrote besides its fragment
+(map.html, copied logo, posters and vendored files). On the next run only
+sections whose inputs changed, or whose files are missing from the
+bundle, are rendered again; the others reuse their fragment. index.html
+is always re-assembled, which is cheap. Files are replaced atomically, so
+a sync to the CDN never picks up a half-written page.
+
+Usage:
+    python static_export.py
+    python static_export.py --out site --app-url https://example.streamlit.app
+    python static_export.py --force
+    python static_export.py --vendor
+    python static_export.py --dataset menlo-park-2025 --out site/menlo-park-2025
+"""
+
+import argparse
+import datetime
+import glob
+import hashlib
+import html
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import time
+from urllib.parse import urljoin, urlsplit
+
+from text_utils import split_bullets
+
+logger = logging.getLogger("lwa.export")
+
+EXPORT_DIR = "site"
+MANIFEST_NAME = "export_manifest.json"
+# Bump to regenerate every section (e.g. after changing the page template)
+EXPORT_VERSION = 1
+
+# Pinned, so the CDN (or a vendored copy) serves the versions the page was tested with
+VEGA_SCRIPTS = [
+    "https://cdn.jsdelivr.net/npm/vega@5.30.0/build/vega.min.js",
+    "https://cdn.jsdelivr.net/npm/vega-lite@5.21.0/build/vega-lite.min.js",
+    "https://cdn.jsdelivr.net/npm/vega-embed@6.26.0/build/vega-embed.min.js",
+]
+
+# Local cache of --vendor downloads, laid out as <host>/<path> so relative url()s in CSS still resolve
+VENDOR_DIR = "vendor"
+
+_ASSET_TAG_RE = re.compile(r"""(<script\b[^>]*?\bsrc=|<link\b[^>]*?\bhref=)(["'])(https?://[^"']+)\2""")
+_CSS_URL_RE = re.compile(r"""url\(\s*["']?(?!data:|https?:|#)([^"')?#]+)""")
+
+# Streamlit emoji shortcodes used in the page text
+_SHORTCODES = {":green_apple:": "🍏", ":statue_of_liberty:": "🗽"}
+
+
+def md_inline(text: str) -> str:
+    """Escape text and render the inline markdown the recap uses: **bold**, *italics*, [links](url)."""
+    text = html.escape(str(text), quote=False)
+    for code, emoji in _SHORTCODES.items():
+        text = text.replace(code, emoji)
+    text = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", text)
+    text = re.sub(r"(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?!\w)", r"<em>\1</em>", text)
+    return re.sub(r"\[([^\]]+)\]\(([^)\s]+)\)", _md_link, text)
+
+
+def _md_link(match) -> str:
+    # The URL was escaped with the rest of the text; only a quote could still end the attribute
+    url = match.group(2).replace('"', "&quot;")
+    return f'<a href="{url}">{match.group(1)}</a>'
+
+
+def md_block(text: str) -> str:
+    """Paragraphs, ##### headings and '* ' bullet lists."""
+    out = []
+    for block in re.split(r"\n\s*\n", str(text).strip()):
+        lines = [line.strip() for line in block.splitlines() if line.strip()]
+        if not lines:
+            continue
+        heading = re.match(r"(#{1,6})\s+(.*)", lines[0])
+        if heading:
+            level = len(heading.group(1))
+            out.append(f"<h{level}>{md_inline(heading.group(2))}</h{level}>")
+            lines = lines[1:]
+        if lines and re.match(r"[*-]\s", lines[0]):
+            out.append(bullet_list("\n".join(lines)))
+        elif lines:
+            out.append(f"<p>{md_inline(' '.join(lines))}</p>")
+    return "\n".join(out)
+
+
+def bullet_list(text) -> str:
+    items = split_bullets(text)
+    return "<ul>" + "".join(f"<li>{md_inline(item)}</li>" for item in items) + "</ul>" if items else ""
+
+
+def _link(url, label=None) -> str:
+    url = "" if url is None else str(url).strip()
+    if not url.startswith(("http://", "https://")):
+        return ""
+    return f'<a href="{html.escape(url)}" target="_blank" rel="noopener">{html.escape(label or url)}</a>'
+
+
+def html_table(rows, columns, cell_html=None, cell_class=None, table_class="") -> str:
+    """<table> for a list of dict rows; cell_html(column, value) renders a cell (escaped text by default)."""
+    head = "".join(f"<th>{html.escape(str(c))}</th>" for c in columns)
+    body = []
+    for row in rows:
+        cells = []
+        for c in columns:
+            value = row.get(c)
+            content = cell_html(c, value) if cell_html else None
+            if content is None:
+                content = "" if value is None or value != value else html.escape(str(value))
+            css = cell_class(c, value) if cell_class else ""
+            cells.append(f'<td class="{css}">{content}</td>' if css else f"<td>{content}</td>")
+        body.append("<tr>" + "".join(cells) + "</tr>")
+    return (f'<div class="table-wrap"><table class="{table_class}"><thead><tr>{head}</tr></thead>'
+            f"<tbody>{''.join(body)}</tbody></table></div>")
+
+
+def vega_chart(chart_id: str, spec: dict) -> str:
+    # Fill the page width; concatenated charts size each view instead of the whole spec
+    spec = dict(spec, autosize={"type": "fit-x", "contains": "padding"})
+    if "vconcat" in spec:
+        spec["vconcat"] = [dict(view, width="container") for view in spec["vconcat"]]
+    else:
+        spec["width"] = "container"
+    payload = json.dumps(spec, default=str).replace("</", "<\\/")
+    return (f'<div id="{chart_id}" class="chart"></div>\n'
+            f'<script>vegaEmbed("#{chart_id}", {payload}, {{actions: false}});</script>')
+
+
+class VendorError(Exception):
+    """A third-party script or stylesheet could not be fetched into the bundle."""
+
+
+def _vendor_path(url: str) -> str:
+    parts = urlsplit(url)
+    return "/".join([parts.netloc, *filter(None, parts.path.split("/"))])
+
+
+def fetch_vendored(url: str, cache_dir: str = VENDOR_DIR, timeout: float = 30) -> list:
+    """Paths (relative to cache_dir) of url and the files its CSS refers to, downloading missing ones."""
+    rel = _vendor_path(url)
+    path = os.path.join(cache_dir, *rel.split("/"))
+    if not os.path.exists(path):
+        import requests
+
+        try:
+            response = requests.get(url, timeout=timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise VendorError(f"could not fetch {url}: {e}") from e
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(response.content)
+        os.replace(tmp, path)
+    found = [rel]
+    if rel.endswith(".css"):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            refs = sorted(set(_CSS_URL_RE.findall(f.read())))
+        for ref in refs:
+            found += fetch_vendored(urljoin(url, ref), cache_dir, timeout)
+    return found
+
+
+def vendor_html(text: str, out: str, cache_dir: str = VENDOR_DIR, outputs: list = None) -> str:
+    """Copy the CDN scripts and stylesheets text loads into out/assets/vendor and point text at the copies.
+
+    The copies' paths (relative to out) are appended to outputs, if given.
+    """
+    def local(match):
+        tag, quote, url = match.groups()
+        for rel in fetch_vendored(url, cache_dir):
+            if outputs is not None:
+                outputs.append(f"assets/vendor/{rel}")
+            target = os.path.join(out, "assets", "vendor", *rel.split("/"))
+            source = os.path.join(cache_dir, *rel.split("/"))
+            if not os.path.exists(target) or os.path.getsize(target) != os.path.getsize(source):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copyfile(source, target)
+        return f"{tag}{quote}assets/vendor/{_vendor_path(url)}{quote}"
+
+    return _ASSET_TAG_RE.sub(local, text)
+
+
+def _records(df, columns):
+    return df[columns].astype(object).where(df[columns].notna(), None).to_dict("records")
+
+
+# Section renderers: (data, context) -> HTML fragment.
+# context has "out" (bundle directory), "app_url", "dataset" (dataset_registry.Dataset),
+# "vendor" and "outputs": files a renderer writes besides its fragment go through
+# _side_output, so the manifest lists them and a missing one gets its section rebuilt.
+
+def _side_output(context, rel: str) -> str:
+    """Path in the bundle for rel (e.g. "assets/logo.png"), recorded as an output of the section being rendered."""
+    context["outputs"].append(rel)
+    path = os.path.join(context["out"], *rel.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def render_intro(data, context):
+    from dataset_registry import LOGO_PATH
+
+    shutil.copyfile(LOGO_PATH, _side_output(context, f"assets/{os.path.basename(LOGO_PATH)}"))
+    live = ""
+    if context["app_url"]:
+        live = (f'<p class="live">Search, filters and feedback are in the '
+                f'<a href="{html.escape(context["app_url"])}">live app</a>.</p>')
+    return (f'<header><img class="logo" src="assets/{os.path.basename(LOGO_PATH)}" alt="Logo">'
+            f"<h1>{html.escape(context['dataset'].title)}</h1></header>\n"
+            f'<div class="info">{md_block(context["dataset"].intro)}</div>\n{live}')
+
+
+def render_interpretations(data, context):
+    from video_facade import POSTER_DIR, vimeo_id
+
+    cards = []
+    for title, key, blurb, url in context["dataset"].videos:
+        video_id = vimeo_id(url)
+        poster = os.path.join(POSTER_DIR, f"{video_id}.jpg")
+        image = ""
+        if video_id and os.path.exists(poster):
+            shutil.copyfile(poster, _side_output(context, f"assets/{video_id}.jpg"))
+            image = f'<img src="assets/{video_id}.jpg" alt="{html.escape(title)}">'
+        watch = f"https://vimeo.com/{video_id}" if video_id else url
+        cards.append(f'<div class="video" id="video-{key}">{image}<h3>{html.escape(title)}</h3>'
+                     f"<p>{html.escape(blurb)}</p><p>{_link(watch, '▶ Watch on Vimeo')}</p></div>")
+    overview = md_block(context["dataset"].overview)
+    if not cards:
+        return overview
+    return f'<h2>Interpretations</h2>\n<div class="videos">{"".join(cards)}</div>\n{overview}'
+
+
+def render_map(data, context):
+    from project_map import build_project_map, resolve_mode
+
+    df = data["projects"]
+    # Viewport mode needs the server to send markers; the static map ships them all client-side
+    mode = "fast" if resolve_mode(df) == "viewport" else "auto"
+    page = build_project_map(df, mode).get_root().render()
+    if context["vendor"]:
+        page = vendor_html(page, context["out"], outputs=context["outputs"])
+    _write_atomic(_side_output(context, "map.html"), page)
+    return ('<h2 id="project-map">Project Map</h2>\n'
+            "<p>Hover over map pins to see project information by location. Click on a pin for more details.</p>\n"
+            '<p><a href="#project-details">CLICK HERE FOR TABLE of all projects</a></p>\n'
+            '<iframe class="map" src="map.html" title="Project map" loading="lazy"></iframe>')
+
+
+def stance_css() -> str:
+    """Light and dark stance cell colors, switched by the viewer's color scheme."""
+    from stance_styles import FALLBACK_STYLES, STANCE_PALETTES
+
+    def rules(theme):
+        lines = [f"td.stance{{{FALLBACK_STYLES[theme]}}}"]
+        lines += [f"td.stance-{value.lower()}{{{css}}}" for value, css in STANCE_PALETTES[theme].items()]
+        return "\n".join(lines)
+
+    return rules("light") + "\n@media (prefers-color-scheme: dark) {\n" + rules("dark") + "\n}"
+
+
+def render_stances_grid(data, context):
+    from stance_styles import STANCE_PALETTES, stance_columns
+
+    df = data["stances"].drop(columns=["Key Positions"], errors="ignore")
+    stances = set(stance_columns(df))
+    known = {value.lower() for value in STANCE_PALETTES["light"]}
+
+    def cell_class(column, value):
+        if column not in stances:
+            return ""
+        value = str(value).strip().lower()
+        return f"stance stance-{value}" if value in known else "stance"
+
+    return ('<h2 id="commissioner-stances-heatgrid">Stances Overview</h2>\n'
+            "<p><a href=\"#commissioner-specific-positions\">CLICK HERE for Council Members' Specific Stances</a></p>\n"
+            + html_table(_records(df, list(df.columns)), list(df.columns), cell_class=cell_class, table_class="grid"))
+
+
+def render_meeting_chart(data, context):
+    from meeting_chart import default_granularity, meeting_chart_spec
+
+    df = data["topics"]
+    return ('<h2 id="meeting-highlights">Meeting Highlights</h2>\n'
+            + vega_chart("meeting-chart", meeting_chart_spec(df, default_granularity(df))))
+
+
+def render_topic_trends(data, context):
+    from stance_styles import stance_columns
+    from topic_model import build_topic_model, topic_chart_spec
+
+    categories = stance_columns(data["stances"])
+    model = build_topic_model(data["topics"], categories)
+    return ('<h2 id="topic-trends">Topic Trends</h2>\n'
+            + vega_chart("topic-chart", topic_chart_spec(model["counts"]["Month"], "Month", categories))
+            + '\n<p><a href="#meeting-details">CLICK HERE for Meeting Details</a></p>')
+
+
+def render_projects_table(data, context):
+    columns = ['project', 'address', 'description', 'earliest_mention_date', 'latest_mention_date', 'url',
+               'meetings', 'council_members']
+    from data_loader import DATE_FORMAT, MENTION_DATE_COLUMNS
+
+    df = data["projects"]
+    columns = [c for c in columns if c in df.columns]
+    df = df.assign(**{c: df[c].dt.strftime(DATE_FORMAT) for c in MENTION_DATE_COLUMNS if c in df.columns})
+
+    def cell_html(column, value):
+        return _link(value) if column == "url" else None
+
+    return ('<h2 id="project-details">Projects</h2>\n<details><summary>Open key projects table</summary>\n'
+            + html_table(_records(df, columns), columns, cell_html=cell_html)
+            + '\n</details>\n<p><a href="#project-map">RETURN to Project Map</a></p>')
+
+
+def render_positions_table(data, context):
+    columns = ['Council Member', 'Key Positions']
+
+    def cell_html(column, value):
+        return bullet_list(value) if column == "Key Positions" and value else None
+
+    return ('<h2 id="commissioner-specific-positions">Stances</h2>\n'
+            "<details><summary>List key stances of each Council Member</summary>\n"
+            + html_table(_records(data["stances"], columns), columns, cell_html=cell_html)
+            + '\n</details>\n<p><a href="#commissioner-stances-heatgrid">RETURN to Council Member Stances overview</a></p>')
+
+
+def render_meetings_table(data, context):
+    from data_loader import date_keys
+
+    columns = ['Date', 'Topics', 'Projects', 'Youtube link']
+
+    def cell_html(column, value):
+        if column == "Date":
+            return date_keys([value])[0]
+        if column == "Topics":
+            return bullet_list(value) if value else ""
+        if column == "Youtube link":
+            return _link(value, "Watch")
+        return None
+
+    return ('<h2 id="meeting-details">Meetings</h2>\n<details><summary>Show topics by meeting date</summary>\n'
+            + html_table(_records(data["meetings"], columns), columns, cell_html=cell_html)
+            + '\n</details>\n<p><a href="#meeting-highlights">RETURN to Meeting Highlights Chart</a></p>')
+
+
+def render_footer(data, context):
+    landing_page = context["dataset"].landing_page
+    comments = "Please share in the live app's sidebar." if context["app_url"] else ""
+    live = f'<p>{_link(context["app_url"], "Open the live app")}</p>' if context["app_url"] else ""
+    landing = f'<p>{_link(landing_page, "Return to landing page")}</p>' if landing_page else ""
+    return (f'<footer><hr>{landing}'
+            f"<h3>🗽 Got comments?</h3><p>{comments}</p>{live}</footer>")
+
+
+# name -> (datasets, source files, renderer), in page order.
+# Source files may name the selected dataset's content files, e.g. "{intro_path}", or
+# "{logo_path}" for dataset_registry.LOGO_PATH, or be glob patterns, which depend on
+# every matching file (so an added poster counts as a change).
+# Sections that read a dataset also depend on data_loader.py, which shapes every frame;
+# "projects" and "meetings" carry link counts, so they depend on entity_links.py too.
+# text_utils.py splits the bullet lists, for the page text as well as the charts and links.
+_LOADER = ["data_loader.py"]
+_LINKS = ["data_loader.py", "entity_links.py", "text_utils.py"]
+SECTIONS = {
+    "intro": ((), ["dataset_registry.py", "datasets.json", "{intro_path}", "{logo_path}", "text_utils.py"],
+              render_intro),
+    "interpretations": ((), ["datasets.json", "{overview_path}", "video_facade.py", "text_utils.py",
+                             "images/posters/*"],
+                        render_interpretations),
+    "map": (("projects",), ["project_map.py", "spatial_index.py", *_LINKS], render_map),
+    "stances_grid": (("stances",), ["stance_styles.py", *_LOADER], render_stances_grid),
+    "meeting_chart": (("topics",), ["meeting_chart.py", "text_utils.py", *_LOADER], render_meeting_chart),
+    "topic_trends": (("topics", "stances"), ["topic_model.py", "meeting_chart.py", "text_utils.py", *_LOADER],
+                     render_topic_trends),
+    "projects_table": (("projects",), _LINKS, render_projects_table),
+    "positions_table": (("stances",), ["text_utils.py", *_LOADER], render_positions_table),
+    "meetings_table": (("meetings",), _LINKS, render_meetings_table),
+    "footer": ((), ["datasets.json"], render_footer),
+}
+
+
+def load_datasets(ds) -> dict:
+    from data_loader import load_projects, load_stances, load_topics
+    from entity_links import get_link_index, with_meeting_links, with_project_links
+
+    projects = load_projects(ds.projects, city=ds.city)[0]
+    stances = load_stances(ds.stances)
+    topics = load_topics(ds.topics)
+    links = get_link_index(projects, stances, topics)
+    return {
+        "projects": with_project_links(projects, links),
+        "stances": stances,
+        # Charts use the plain topics, so a projects update doesn't re-render them
+        "topics": topics,
+        "meetings": with_meeting_links(topics, links),
+    }
+
+
+def section_inputs(name: str, data: dict, context: dict) -> str:
+    """Hash of everything a section's fragment depends on."""
+    from data_loader import file_fingerprint
+    from dataset_registry import LOGO_PATH
+
+    datasets, sources, _ = SECTIONS[name]
+    ds = context["dataset"]
+    parts = [f"version={EXPORT_VERSION}", f"app_url={context['app_url']}", f"exporter={file_fingerprint(__file__)}",
+             f"dataset={ds.id}", f"vendor={context['vendor']}"]
+    parts += [f"{d}={data[d].attrs.get('fingerprint', '')}" for d in datasets]
+    sources = [path.format(**vars(ds), logo_path=LOGO_PATH) if "{" in path else path for path in sources]
+    paths = [path for source in sources for path in (sorted(glob.glob(source)) if "*" in source else [source])]
+    parts += [f"{path}={file_fingerprint(path) if path and os.path.exists(path) else 'missing'}" for path in paths]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def _write_atomic(path: str, text: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def page_html(fragments: list, generated_at: str, title: str) -> str:
+    scripts = "\n".join(f'<script src="{src}"></script>' for src in VEGA_SCRIPTS)
+    body = "\n\n".join(f'<section id="section-{name}">\n{fragment}\n</section>' for name, fragment in fragments)
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta name="generated" content="{generated_at}">
+<title>{html.escape(title)}</title>
+{scripts}
+<style>
+body {{ font-family: "Source Sans Pro", system-ui, sans-serif; max-width: 1100px; margin: 0 auto; padding: 1rem;
+        color: #31333F; background: #fff; line-height: 1.5; }}
+@media (prefers-color-scheme: dark) {{ body {{ color: #FAFAFA; background: #0E1117; }} a {{ color: #8AB4F8; }} }}
+header {{ display: flex; align-items: center; gap: 1rem; }}
+.logo {{ height: 56px; }}
+.info {{ background: rgba(28, 131, 225, 0.1); border-radius: 0.5rem; padding: 0.5rem 1rem; }}
+.videos {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(260px, 1fr)); gap: 1rem; }}
+.video img {{ width: 100%; border-radius: 0.5rem; }}
+.map {{ width: 100%; height: 600px; border: 0; }}
+.chart {{ width: 100%; }}
+.table-wrap {{ overflow-x: auto; }}
+table {{ border-collapse: collapse; width: 100%; font-size: 0.9rem; }}
+th, td {{ border: 1px solid rgba(128, 128, 128, 0.3); padding: 0.3rem 0.5rem; text-align: left; vertical-align: top; }}
+td ul {{ margin: 0; padding-left: 1.2rem; }}
+summary {{ cursor: pointer; margin: 0.5rem 0; }}
+{stance_css()}
+</style>
+</head>
+<body>
+{body}
+<p class="generated">Generated {generated_at}</p>
+</body>
+</html>
+"""
+
+
+def export(out: str = EXPORT_DIR, app_url: str = "", force: bool = False, dataset_id: str = None,
+           vendor: bool = False) -> dict:
+    """Render changed sections into out and re-assemble index.html; returns {section: "built"|"reused"}.
+
+    dataset_id picks a city and period from datasets.json (the default one if None).
+    vendor copies CDN scripts and stylesheets into the bundle; raises VendorError if one can't be fetched.
+    """
+    from dataset_registry import get_dataset
+
+    ds = get_dataset(dataset_id)
+    manifest_path = os.path.join(out, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    previous = manifest.get("sections", {})
+    context = {"out": out, "app_url": app_url, "dataset": ds, "vendor": vendor, "outputs": []}
+    data = load_datasets(ds)
+
+    status, fragments, sections = {}, [], {}
+    for name, (_, _, render) in SECTIONS.items():
+        inputs = section_inputs(name, data, context)
+        fragment_path = os.path.join(out, "sections", f"{name}.html")
+        entry = previous.get(name)
+        if (entry and entry["inputs"] == inputs and os.path.exists(fragment_path)
+                and all(os.path.exists(os.path.join(out, *rel.split("/"))) for rel in entry.get("outputs", []))):
+            with open(fragment_path, encoding="utf-8") as f:
+                fragment = f.read()
+            status[name] = "reused"
+        else:
+            start = time.perf_counter()
+            context["outputs"] = []
+            fragment = render(data, context)
+            _write_atomic(fragment_path, fragment)
+            entry = {"inputs": inputs, "outputs": sorted(set(context["outputs"])),
+                     "rendered_ms": round((time.perf_counter() - start) * 1000, 1),
+                     "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")}
+            status[name] = "built"
+        sections[name] = entry
+        fragments.append((name, fragment))
+
+    generated_at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+    page = page_html(fragments, generated_at, ds.title)
+    if vendor:
+        page = vendor_html(page, out)
+    _write_atomic(os.path.join(out, "index.html"), page)
+    _write_atomic(manifest_path, json.dumps({"export_version": EXPORT_VERSION, "generated_at": generated_at,
+                                             "sections": sections}, indent=2) + "\n")
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the recap as a static site.")
+    parser.add_argument("--out", default=EXPORT_DIR)
+    parser.add_argument("--app-url", default=os.environ.get("LWA_APP_URL", ""),
+                        help="live app URL for search and feedback links")
+    parser.add_argument("--force", action="store_true", help="render every section, ignoring the manifest")
+    parser.add_argument("--dataset", help="dataset id from datasets.json (default: the registry's default)")
+    parser.add_argument("--vendor", action="store_true",
+                        help="copy vega and Leaflet into the bundle instead of loading them from their CDNs")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        start = time.perf_counter()
+        status = export(args.out, args.app_url, args.force, args.dataset, vendor=args.vendor)
+    except VendorError as e:
+        print(f"Error: {e}. Put a copy under {VENDOR_DIR}/ or leave out --vendor.", file=sys.stderr)
+        return 1
+    except (FileNotFoundError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    built = [name for name, s in status.items() if s == "built"]
+    print(f"{len(built)} of {len(status)} sections rendered ({', '.join(built) or 'none changed'}) "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms -> {os.path.join(args.out, 'index.html')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,22 @@
 # LWA POC 6 2025-09-08
 # Pursues code changes to connect streamlit LWA POC app to Menlo Park City Council data.
 
+import os
 import streamlit as st
-import pandas as pd
-import folium
-from streamlit_folium import st_folium
-# add pin clustering
-from folium.plugins import MarkerCluster
-# add audio stream support
-import io
-# add video stream support
-from streamlit_player import st_player
-# add altair charting
-import altair as alt
-import requests
-from feedback_sidebar import feedback_sidebar
+from feedback_sidebar import feedback_sidebar, get_outbox
+from data_loader import load_projects, load_stances, load_topics
+from dataset_registry import LOGO_PATH, select_dataset
+from stance_styles import styled_stances, stance_columns
+from meeting_chart import GRANULARITIES, default_granularity, get_meeting_chart_spec
+from topic_model import OTHER, get_topic_model, get_topic_chart_spec
+from date_index import date_bounds, filter_rows, get_meeting_index, get_mention_index
+from entity_links import get_link_index, with_meeting_links, with_project_links
+import instrumentation as perf
+from ingest import live_updates
+# streamlit_player, the paged tables, search_index and the feedback outbox are
+# imported where they are used, so hidden sections cost nothing. The first
+# session still loads pyarrow (data_loader's shared store) and, with the map
+# shown on load, folium and requests. See import_report.py
 
 
 # FUNCTIONS
@@ -41,15 +43,13 @@ def submit_feedback_widget(context_label):
             "entry.1507719363": feedback_value if feedback_value else "No additional comments"
         }
         
+        # Queue for background delivery so a slow endpoint never blocks the page
         try:
-            response = requests.post(form_url, data=form_data, timeout=5)
-            if response.ok:
-                st.session_state[submitted_key] = True # Set a flag for success
-                # --- FIX: Clear the widgets by resetting their session state values ---
-                st.session_state[rating_key] = None 
-                st.session_state[feedback_key] = ""
-            else:
-                st.session_state[submitted_key] = f"Error: {response.status_code}"
+            get_outbox().enqueue(form_url, form_data, encoding="form")
+            st.session_state[submitted_key] = True # Set a flag for success
+            # --- FIX: Clear the widgets by resetting their session state values ---
+            st.session_state[rating_key] = None 
+            st.session_state[feedback_key] = ""
         except Exception as e:
             st.session_state[submitted_key] = f"Error: {e}"
 
@@ -91,21 +91,46 @@ def submit_feedback_widget(context_label):
 
 st.set_page_config(layout="wide")
 
-st.info(
-    '''
-    :green_apple: **This AI-generated recap helps you quickly catch up with city council activity** from Jan through Aug 2025.  
+# Per-section timings and payload sizes, shown when the page is opened with ?debug=perf
+perf.start_run()
 
-    Given current limitations of AI, think of this app as a helpful guide for exploring local government activity — not a replacement for the official record. If you need the final word on any issue, please check the city’s published minutes and recordings.
-    '''
-)
+# City and reporting period from datasets.json; only the selected one is loaded.
+# With several registered, a selector appears in the sidebar. See dataset_registry.py
+ds = select_dataset()
 
-st.logo("images/LWA-v2-square.png", size="large")    
+if ds.intro:
+    st.info(ds.intro)
+
+st.logo(LOGO_PATH, size="large")    
 
 # st.image("images/LWA_demolab_1920x360px.png", use_container_width=True )
-st.title("Menlo Park City Council Recap")
+st.title(ds.title)
 
 # Call near the top of the Streamlit layout
-feedback_sidebar(city_name="Menlo Park")
+with perf.section("feedback_sidebar"):
+    feedback_sidebar(city_name=ds.city)
+
+# New meetings/projects dropped into the ingest directory are merged into the
+# loaded data and open sessions rerun to show them (off unless configured)
+live_updates()
+
+# Search across meeting topics, project descriptions and council member positions
+@st.fragment
+def search_section():
+    query = st.text_input("🔎 Search the recap", placeholder="e.g. Safer Bay, Parking Plaza, bike lanes")
+    if not query.strip():
+        return
+    from search_index import get_search_index, timed_search
+    with perf.section("search"):
+        projects_df, _ = load_projects(ds.projects, city=ds.city)
+        index = get_search_index(projects_df, load_stances(ds.stances), load_topics(ds.topics))
+        hits, elapsed_ms = timed_search(index, query, limit=10)
+        st.caption(f"{len(hits)} results in {elapsed_ms:.1f} ms")
+        for hit in hits:
+            text = hit['text'] if len(hit['text']) <= 240 else hit['text'][:240] + "…"
+            st.markdown(f"**{hit['label']}** — {text} [(view)]({hit['anchor']})")
+
+search_section()
 
 # decorative image of the town
 # st.image("images/Menlo_Park_960px.jpg", use_container_width=True) # TBD replace with high-level metrics or other value-add analytic summary
@@ -120,33 +145,31 @@ st.header("Interpretations")
 # st_player("https://player.vimeo.com/video/1109170740")
 
 # Select explainers via tabs
-tab_homeowners, tab_renters, tab_investors = st.tabs(["For Homeowners", "For Renters", "For Investors"])
-
-with tab_homeowners:
-    st.subheader("For Homeowners")
-    st.write("A 7-minute video on how 1H 2025 City Council activity may affect homeowners.")
-    st_player("https://player.vimeo.com/video/1117583808")
-
-with tab_renters:
-    st.subheader("For Renters")
-    st.write("A 7-minute video on how 1H 2025 City Council activity may affect renters.")
-    st_player("https://player.vimeo.com/video/1117597380")
-
-with tab_investors:
-    st.subheader("For Investors")
-    st.write("A 7-minute video on how 1H 2025 City Council activity may affect investors.")
-    st_player("https://player.vimeo.com/video/1117612952")
+# Each tab shows a poster with a play button; the Vimeo player is only created
+# on play, and at most one player is open at a time. See video_facade.py
+# The videos are listed per dataset in datasets.json
+# Start the app with LWA_VIDEO_FACADES=0 to embed all three players up front as before
+VIDEO_FACADES = os.environ.get("LWA_VIDEO_FACADES", "1") != "0"
+
+@st.fragment
+def interpretations_section(videos):
+    from video_facade import video_facade
+    with perf.section("videos"):
+        tabs = st.tabs([title for title, _, _, _ in videos])
+        for tab, (title, key, blurb, url) in zip(tabs, videos):
+            with tab:
+                st.subheader(title)
+                st.write(blurb)
+                video_facade(url, title, key=key, group="interpretations", facade=VIDEO_FACADES)
+
+if ds.videos:
+    interpretations_section(ds.videos)
 
 # Feedback on interpretive videos feature
 # submit_feedback_widget("interpretive_videos") # removed 10/6/2025 to simplify app UX
 
-# Short overview
-# [2025-08-25] TO DO: should modify to scan external .md file for this content, instead of hardcoding
-# [2025-09-01] Copied and lightly edited MPPC summary from LLM response
-st.markdown('''
-            ##### Overview of Council meetings 1H 2025:
-            A prominent theme across Menlo Park's City Council meetings is **housing development**, particularly the controversial proposal for **affordable housing on downtown parking lots**, which elicits significant public comment both in favor and opposition due to concerns about parking, business impact, and alternative sites like the Civic Center. Additionally, the council actively discusses **environmental and infrastructure issues**, including **climate action, flood control projects like Safer Bay, and updates to the Bayfront Recycled Water Facility**. **Fiscal matters, such as budget adoption, capital improvement plans, and aquatic center funding**, are also recurring topics, reflecting the city's financial planning and resource allocation. Finally, **transportation and community engagement** are consistently addressed, highlighting discussions around **safe routes, bike lanes, and the role of advisory bodies** like the Youth Advisory Committee. 
-            ''')
+# Short overview (a markdown file per dataset, shared with the static export)
+st.markdown(ds.overview)
 
 
 # SUMMARY VISUALIZATIONS ON TOPICS, PROJECTS, COMMISSIONERS
@@ -157,122 +180,96 @@ st.subheader("Project Map", anchor="project-map")
 st.write("Hover over map pins to see project information by location. Click on a pin for more details.")
 st.markdown("[CLICK HERE FOR TABLE of all projects](#project-details)")
 
-# Load the data from the uploaded CSV file
-# Ensure the CSV file 'MPPC_projects_1H2025_2025-08-06_map_source.csv' is available in the environment.
+# Load the projects data (parsed once per process and cached until the CSV changes)
 try:
-    # Using the exact filename provided by the user
-    df = pd.read_csv("mpcc_projects_2025-09-08_geocoded_fixed.csv")
+    with perf.section("load_projects"):
+        df, dropped_rows = load_projects(ds.projects, city=ds.city)
 except FileNotFoundError:
-    st.error("Error: The CSV file 'mpcc_projects_2025-09-08_geocoded_fixed' was not found.")
+    st.error(f"Error: The CSV file '{ds.projects}' was not found.")
     st.stop()
 
-# --- Data Preprocessing and Handling Missing Values ---
-
-# Rename columns for easier access (optional, but good practice)
-df.rename(columns={
-    'project_name': 'project',
-    'latitude': 'latitude',
-    'longitude': 'longitude',
-    'street_address': 'address',
-    'city': 'city',
-    'project_description': 'description',
-    'project_url': 'url', 
-    'first_mention_date': 'earliest_mention_date', # Renamed
-    'last_mention_date': 'latest_mention_date'    # Renamed
-}, inplace=True)
-
-# Convert latitude and longitude to numeric, coercing errors to NaN
-df['latitude'] = pd.to_numeric(df['latitude'], errors='coerce')
-df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce')
-
-# Filter out rows where latitude or longitude are missing, as these cannot be plotted
-initial_rows = len(df)
-df.dropna(subset=['latitude', 'longitude'], inplace=True)
-if len(df) < initial_rows:
-    st.warning(f"Removed {initial_rows - len(df)} rows due to missing Latitude or Longitude data.")
-
-# Further filter to ensure only Menlo Park projects are shown (if 'City' column exists and is needed)
+# Rows with missing latitude or longitude are dropped by the loader, as these cannot be plotted
+if dropped_rows:
+    st.warning(f"Removed {dropped_rows} rows due to missing Latitude or Longitude data.")
+
+# The loader filters to the selected city's projects when the 'city' column exists
 if 'city' in df.columns:
-    df = df[df['city'].astype(str).str.contains('Menlo Park', case=False, na=False)]
     if df.empty:
-        st.warning("No projects found for Menlo Park after filtering.")
+        st.warning(f"No projects found for {ds.city} after filtering.")
         st.stop()
 else:
     st.warning("The 'City' column was not found in the CSV. Displaying all projects with valid coordinates.")
 
-# Center the map around Menlo Park, CA
-# Using the mean of the available Menlo Park coordinates for a more accurate center
-if not df.empty:
-    map_center = [df['latitude'].mean(), df['longitude'].mean()]
-else:
-    # Fallback to a default Menlo Park center if no valid data points
-    map_center = [37.45398, -122.184425] # Kepler's Plaza, Menlo Park
-
-# Create a Folium map object
-map_height = 800  # Set the height of the map
-m = folium.Map(location=map_center, zoom_start=13, height=map_height, control_scale=True)
-
-# Create a MarkerCluster object
-marker_cluster = MarkerCluster().add_to(m) # <--- Create the cluster layer
-
-# Add markers for each location -> TO THE CLUSTER 2025-09-10
-for idx, row in df.iterrows():
-    project_name = row.get('project', 'N/A')
-    project_description = row.get('description', 'No description available.')
-    street_address = row.get('address', 'N/A')
-    public_url = row.get('url')
-    earliest_date = row.get('earliest_mention_date', 'N/A') # Get earliest date
-    latest_date = row.get('latest_mention_date', 'N/A')   # Get latest date
-
-    # Handle missing URL gracefully
-    url_link = ""
-    if pd.notna(public_url) and public_url.strip() != '' and public_url.strip().lower() != 'n/a':
-        # Ensure URL starts with http:// or https:// for proper linking
-        if not public_url.startswith(('http://', 'https://')):
-            public_url = 'https://' + public_url # Prepend https if missing
-        url_link = f"<br><a href='{public_url}' target='_blank'>More Information</a>"
-    else:
-        url_link = "<br>No public URL available."
-
-    # Format dates for display, handling potential NaN or 'N/A'
-    formatted_earliest_date = str(earliest_date) if pd.notna(earliest_date) and str(earliest_date).strip().lower() != 'n/a' else 'N/A'
-    formatted_latest_date = str(latest_date) if pd.notna(latest_date) and str(latest_date).strip().lower() != 'n/a' else 'N/A'
-
-    # Construct the tooltip text with detailed information and the URL link
-    # [DEPRECATED] <b>Description:</b> {project_description}<br>
-    # [DEPRECATED] {url_link}
-    tooltip_html = f"""
-    <h4>{project_name}</h4>
-    <b>Address:</b> {street_address}<br>
-    <b>Earliest Mention:</b> {formatted_earliest_date}<br>
-    <b>Latest Mention:</b> {formatted_latest_date}<br>
-    <b>Coordinates:</b> ({row['latitude']:.4f}, {row['longitude']:.4f})<br>
-    <p><small>Click for more info</small></p>
-    """
-
-    # Construct the popup text (appears on click)
-    popup_html = f"""
-    <b>{project_name}</b><br>
-    {project_description}<br>
-    <b>Earliest Mention:</b> {formatted_earliest_date}<br>
-    <b>Latest Mention:</b> {formatted_latest_date}<br>
-    {url_link.replace('<br>', '')}
-    """
-
-    # Add a marker with the tooltip and popup
-    folium.Marker(
-        location=[row['latitude'], row['longitude']],
-        tooltip=folium.Tooltip(tooltip_html, sticky=True, max_width=400),
-        popup=folium.Popup(popup_html, max_width=300),
-        icon=folium.Icon(color='green', icon='info-sign') # Changed icon color and type for San Carlos projects
-    ).add_to(marker_cluster) # <-- 2025-09-10 Change this from .add_to(m)
-
-# Display the map in Streamlit
-# Add st.container and key to st_folium to control rendering
-# --- DEPRECATED 8/1/2025 to eliminate empty space bug ---
-# --- RESTORED 8/7/2025 to see if folium v 0.25.1 fixes empty space bug
-with st.container():
-     st_data = st_folium(m, width=900, height=600, key="menlo_park_map")
+# Date formatting and display columns are prepared once by the cached loader
+with perf.section("load_topics"):
+    chart_df = load_topics(ds.topics)
+
+# Council member stances (the heat grid and positions table below use them too)
+with perf.section("load_stances"):
+    stances_df = load_stances(ds.stances)
+
+# PROJECT LINKS: which meetings and council members mention each project.
+# Matched once per dataset version and shared by all sessions, so the map
+# popups and tables only look the counts up; see entity_links.py
+with perf.section("entity_links"):
+    links = get_link_index(df, stances_df, chart_df)
+    df = with_project_links(df, links)
+    chart_df = with_meeting_links(chart_df, links)
+
+# DATE RANGE: one control in the sidebar filters the map, the meeting and topic
+# charts and the projects and meetings tables. Projects are kept when their
+# mention interval overlaps the range. Lookups are binary searches on date
+# indexes built once per dataset; see date_index.py
+with perf.section("date_range"):
+    mention_index = get_mention_index(df)
+    meeting_index = get_meeting_index(chart_df)
+    span = date_bounds(mention_index, meeting_index)
+    if span:
+        first_day, last_day = span[0].date(), span[1].date()
+        picked = st.sidebar.date_input("Date range", value=(first_day, last_day), min_value=first_day,
+                                       max_value=last_day, key=f"date_range_{ds.id}")
+        # While a range is being picked only its start is set
+        start, end = (picked[0], picked[1] if len(picked) > 1 else last_day) if picked else (first_day, last_day)
+        total_projects, total_meetings = len(df), len(chart_df)
+        df = filter_rows(df, mention_index.positions(start, end), start, end)
+        chart_df = filter_rows(chart_df, meeting_index.positions(start, end), start, end)
+        if (start, end) != (first_day, last_day):
+            st.caption(f"Showing {start:%b %d, %Y} to {end:%b %d, %Y}: {len(df)} of {total_projects} projects, "
+                       f"{len(chart_df)} of {total_meetings} meetings. Change the range in the sidebar.")
+
+# Build the Folium map once per distinct projects dataset; reruns and other
+# sessions reuse the cached map (markers, tooltips and popups included)
+from project_map import get_project_map, show_project_map
+projects_key = df.attrs['fingerprint']
+with perf.section("map_build"):
+    m = get_project_map(df, projects_key, center=ds.map_center)
+
+# Each interactive section below is a fragment: toggling its checkbox (or
+# panning the map) reruns only that section instead of the whole page.
+@st.fragment
+def project_map_section(m, df, projects_key):
+    # Display the map in Streamlit
+    # Add st.container and key to st_folium to control rendering
+    # --- DEPRECATED 8/1/2025 to eliminate empty space bug ---
+    # --- RESTORED 8/7/2025 to see if folium v 0.25.1 fixes empty space bug
+    with st.container(), perf.section("map_render"):
+        # Large datasets only send the projects inside the current map view
+        st_data = show_project_map(m, key=f"map_{ds.id}", width=900, height=600,
+                                   df=df, dataset_key=projects_key)
+
+    # Instructions to use interactive map
+    if st.checkbox("Show instructions for interactive map"):
+        st.markdown("""
+        #### Map Usage Note: 
+        - **Hover** over a pin to see its `tooltip` information.
+        - **Click** on a pin to see `popup` with more details, including a public URL link when available.
+        - Rows with missing Latitude or Longitude values are automatically excluded from the map.
+        - If a Public URL or Date information is missing or 'N/A', the relevant field will indicate that.
+        - [CLICK HERE FOR DETAILS on each project](#project-details)        
+        """)
+
+
+project_map_section(m, df, projects_key)
 
 # --- DEPRECATED 8/1/2025 to simplify functionality of app ---
 # st.subheader("Selected Project (on click):")
@@ -297,25 +294,11 @@ with st.container():
 # # Render the map HTML with st.components.v1.html
 # components.html(map_html, height=map_height + 2)
 
-# Instructions to use interactive map
-if st.checkbox("Show instructions for interactive map"):
-    st.markdown("""
-    #### Map Usage Note: 
-    - **Hover** over a pin to see its `tooltip` information.
-    - **Click** on a pin to see `popup` with more details, including a public URL link when available.
-    - Rows with missing Latitude or Longitude values are automatically excluded from the map.
-    - If a Public URL or Date information is missing or 'N/A', the relevant field will indicate that.
-    - [CLICK HERE FOR DETAILS on each project](#project-details)        
-    """)
-
-
-
 # Feedback on interactive map feature
 # submit_feedback_widget("project_map") # removed 10/6/2025 to simplify app UX
 
 # COMMISSIONER STANCES AND POSITIONS
-# Commissioners policy stances data frame
-stances_df = pd.read_csv('mpcc_stances_2025-09-08.csv')
+# Commissioners policy stances data frame (stances_df) was loaded above the map
 
 # --- Add this CSS style block to force text color to black ---
 st.markdown("""
@@ -366,30 +349,10 @@ stances_summary_df = stances_df.drop(columns=['Key Positions'])
 #     return f'background-color: {color}'
 
 # Enable responsive highlight colors for light or dark screen mode.
-
-def highlight_stances(val):
-    if theme_type == "dark":
-        if val == 'Pro':
-            return 'background-color: #27AE60; color: white;'   # darker green
-        elif val == 'Mixed':
-            return 'background-color: #B7950B; color: white;'   # olive
-        elif val == 'Neutral':
-            return 'background-color: #2874A6; color: white;'   # medium blue
-        elif val == 'Opposed':
-            return 'background-color: #CA6F1E; color: white;'   # dark orange
-    else:  # light mode
-        if val == 'Pro':
-            return 'background-color: #D5F5E3; color: black;'   # pastel green
-        elif val == 'Mixed':
-            return 'background-color: #F9E79F; color: black;'   # pastel yellow
-        elif val == 'Neutral':
-            return 'background-color: #D6EAF8; color: black;'   # pastel blue
-        elif val == 'Opposed':
-            return 'background-color: #FAD7A0; color: black;'   # pastel orange
-    return ''
-
-styled_stances_df = stances_summary_df.style.applymap(highlight_stances)
-st.dataframe(styled_stances_df)
+# The style matrix is computed once per (dataset, theme) and cached; see stance_styles.py
+with perf.section("stances_grid"):
+    styled_stances_df = styled_stances(stances_summary_df, theme_type, stances_df.attrs['fingerprint'])
+    st.dataframe(styled_stances_df)
 
 # Feedback on council member stances feature
 # submit_feedback_widget("stances_overview") # removed 10/6/2025 to simplify app UX
@@ -398,27 +361,57 @@ st.dataframe(styled_stances_df)
 # BAR CHART WITH Meeting Highlights for 1H 2025
 st.subheader("Meeting Highlights", anchor="meeting-highlights")
 
-chart_df = pd.read_csv('mpcc_topics_2025-09-06_v2_with_youtube_links.csv')
-chart_df["Date"] = pd.to_datetime(chart_df["Date"]).dt.strftime('%Y-%m-%d')
-chart_df["Duration (min)"] = pd.to_numeric(chart_df["Length_Minutes"], errors='coerce')
-chart_df["Topic Count"] = chart_df["Topic_Count"]
-chart_df["Topics"] = chart_df["Major_Topics"]
-chart_df["Youtube link"] = chart_df["youtube-link"]
+# chart_df was loaded (and filtered to the date range) above the map
 
 # DEPRECATED simple streamlit bar chart since this does not support clickable link
 # # basic streamlit bar_chart
 # st.bar_chart(chart_df, x="date", y="duration", use_container_width=True) 
 
 # ADDED enhanced altair interactive chart
-mtg_chart = alt.Chart(chart_df).mark_bar().encode(
-    x='Date',
-    y= 'Duration (min)',
-    color=alt.value('#A9CCE3'),
-    # href='youtube-link',  DEPRECATED for ux reasons
-    tooltip=['Date', 'Duration (min)', 'Topic Count', 'Major_Topics'] # removed "'Youtube link' from list"
-).properties(title="Rollover any bar for meeting highlights by date")
-
-st.altair_chart(mtg_chart, use_container_width=True)
+# mtg_chart = alt.Chart(chart_df).mark_bar().encode(
+#     x='Date',
+#     y= 'Duration (min)',
+#     color=alt.value('#A9CCE3'),
+#     # href='youtube-link',  DEPRECATED for ux reasons
+#     tooltip=['Date', 'Duration (min)', 'Topic Count', 'Major_Topics'] # removed "'Youtube link' from list"
+# ).properties(title="Rollover any bar for meeting highlights by date")
+# st.altair_chart(mtg_chart, use_container_width=True)
+
+# REPLACED by a pre-aggregated chart: bars per meeting/week/month/quarter with
+# short tooltip summaries, a brushable overview for the time window, and the
+# spec cached per (dataset, granularity). See meeting_chart.py
+# Widget keys that hold per-dataset choices (grouping, categories, table filters
+# and pages) end in the dataset id, so another city opens with its own defaults
+@st.fragment
+def meeting_chart_section(chart_df):
+    granularity = st.radio("Group by", list(GRANULARITIES), horizontal=True, key=f"meeting_chart_granularity_{ds.id}",
+                           index=list(GRANULARITIES).index(default_granularity(chart_df)))
+    with perf.section("meeting_chart"):
+        st.vega_lite_chart(get_meeting_chart_spec(chart_df, granularity), width="stretch")
+
+meeting_chart_section(chart_df)
+
+# TOPIC TRENDS: meeting bullets tagged with the stances policy categories and
+# counted per period. Tagging and counting run once per dataset version; see topic_model.py
+st.subheader("Topic Trends", anchor="topic-trends")
+
+@st.fragment
+def topic_trends_section(chart_df):
+    categories = stance_columns(load_stances(ds.stances))
+    with perf.section("topic_model"):
+        model = get_topic_model(chart_df, categories)
+    granularity = st.radio("Group by", list(GRANULARITIES), horizontal=True, key=f"topic_trends_granularity_{ds.id}",
+                           index=list(GRANULARITIES).index("Month"))
+    shown = st.multiselect("Policy categories", categories + [OTHER], default=categories, key=f"topic_trends_categories_{ds.id}")
+    with perf.section("topic_chart"):
+        st.vega_lite_chart(get_topic_chart_spec(chart_df, model, granularity, shown), width="stretch")
+    if st.checkbox("Show tagged topics", key=f"topic_trends_table_{ds.id}"):
+        topics = model["topics"]
+        topics = topics[topics["Category"].isin(shown)]
+        st.dataframe(topics[["Date", "Category", "Topic"]], hide_index=True, width="stretch",
+                     column_config={"Date": st.column_config.DateColumn(format="YYYY-MM-DD")})
+
+topic_trends_section(chart_df)
 
 st.markdown("[CLICK HERE for Meeting Details](#meeting-details)")
 
@@ -442,23 +435,38 @@ st.subheader("Projects", anchor="project-details")
 #columns_to_show = ['Project', 'Address', 'Description', 'First Mention', 'Last Mention']
 # columns_to_show = ['project', 'address', 'description', 'earliest_mention_date', 'latest_mention_date'] #hide more columns if using st.table
 columns_to_show = ['project', 'address', 'description', 'earliest_mention_date', 'latest_mention_date', 'url'] #restore url column 10/15/2025.
-
-# st.dataframe(df) # DEPRECATED 2025-08-16
-# use st.table instead, to show multi-row description field
-if st.checkbox("Open key projects table"):
-    # st.table(df[columns_to_show])
-    st.dataframe(
-        df[columns_to_show],
-        column_config={
-            "url": st.column_config.LinkColumn(
-                "City project link",
-                # display_text="View details" #optional instead of showing url
-                help="Click to open the project webpage" # Optional hover tooltip
-            )
-        },
-        use_container_width=True, # ensures full-width display on mobile and desktop
-        # height=400 # optional: control visible height before scrolling
-        )
+columns_to_show += ['meetings', 'council_members']  # mention counts from entity_links.py
+
+@st.fragment
+def projects_table_section(df):
+    # st.dataframe(df) # DEPRECATED 2025-08-16
+    # use st.table instead, to show multi-row description field
+    if st.checkbox("Open key projects table"):
+        # st.table(df[columns_to_show])
+        # Paginated: only the visible page of (filtered, sorted) rows is sent to the browser
+        from paged_table import paged_table
+        with perf.section("projects_table"):
+            paged_table(
+                df[columns_to_show],
+                key=f"projects_table_{ds.id}",
+                dataset_key=f"{df.attrs['fingerprint']}:projects",
+                filter_columns=['project', 'address', 'description'],
+                column_config={
+                    "url": st.column_config.LinkColumn(
+                        "City project link",
+                        # display_text="View details" #optional instead of showing url
+                        help="Click to open the project webpage" # Optional hover tooltip
+                    ),
+                    "earliest_mention_date": st.column_config.DateColumn(format="YYYY-MM-DD"),
+                    "latest_mention_date": st.column_config.DateColumn(format="YYYY-MM-DD"),
+                    "meetings": st.column_config.NumberColumn(
+                        "Meetings", help="Meetings whose topics mention this project"),
+                    "council_members": st.column_config.NumberColumn(
+                        "Council members", help="Council members whose key positions mention this project"),
+                },
+                )
+
+projects_table_section(df)
 
 st.markdown("[RETURN to Project Map](#project-map)")
 
@@ -469,8 +477,15 @@ st.subheader("Stances", anchor="commissioner-specific-positions")
 positions_view = ['Council Member', 'Key Positions']
 positions_list_df = stances_df[positions_view]
 
-if st.checkbox("List key stances of each Council Member"):
-    st.table(positions_list_df)
+@st.fragment
+def positions_table_section(positions_list_df):
+    if st.checkbox("List key stances of each Council Member"):
+        from paged_table import paged_table
+        with perf.section("positions_table"):
+            paged_table(positions_list_df, key=f"positions_table_{ds.id}", dataset_key=f"{stances_df.attrs['fingerprint']}:positions",
+                        markdown=True, page_size=10)
+
+positions_table_section(positions_list_df)
 
 st.markdown("[RETURN to Council Member Stances overview](#commissioner-stances-heatgrid)")
 
@@ -478,7 +493,7 @@ st.markdown("[RETURN to Council Member Stances overview](#commissioner-stances-h
 st.subheader("Meetings", anchor="meeting-details")
 
 # List of columns you want to display
-selected_columns = ['Date', 'Topics', 'Youtube link']
+selected_columns = ['Date', 'Topics', 'Projects', 'Youtube link']
 # Create a new DataFrame with only the selected columns
 df_to_display = chart_df[selected_columns]
 
@@ -486,8 +501,15 @@ df_to_display = chart_df[selected_columns]
 # st.dataframe(df_to_display) 
 # use st.table instead, to render markdown in table cells
 
-if st.checkbox("Show topics by meeting date"):
-    st.table(df_to_display)
+@st.fragment
+def meetings_table_section(df_to_display):
+    if st.checkbox("Show topics by meeting date"):
+        from paged_table import paged_table
+        with perf.section("meetings_table"):
+            paged_table(df_to_display, key=f"meetings_table_{ds.id}", dataset_key=f"{chart_df.attrs['fingerprint']}:meetings",
+                        markdown=True, filter_columns=['Date', 'Topics', 'Projects'], page_size=10)
+
+meetings_table_section(df_to_display)
 
 st.markdown("[RETURN to Meeting Highlights Chart](#meeting-highlights)")
 
@@ -513,8 +535,12 @@ st.markdown("[RETURN to Meeting Highlights Chart](#meeting-highlights)")
 
 # Footer section
 st.divider()
-st.link_button("Return to landing page", "https://lyndonwong.notion.site/menlo-park-city-council-recap", type="primary")
+if ds.landing_page:
+    st.link_button("Return to landing page", ds.landing_page, type="primary")
 st.subheader(":statue_of_liberty: Got comments?")
 st.markdown('**Please share** using the ":material/keyboard_double_arrow_right:" top left sidebar opener!')
 
 # submit_feedback_widget("overall_experience") # replaced by feedback_sidebar
+
+# Debug-only panel with the section timings collected above
+perf.render_panel()
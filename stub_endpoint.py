@@ -0,0 +1,110 @@
+"""Local stand-in for the Google Apps Script / Forms feedback endpoints.
+
+Accepts POSTs on any path, records them in memory and replies "success".
+Latency and failure rate can be dialled up to exercise the feedback
+outbox's retry and backoff behaviour.
+
+Usage:
+    python stub_endpoint.py --port 8765 --delay 2 --fail-rate 0.3
+
+or from Python:
+    server = StubEndpoint(delay=0.5).start()
+    ... post to server.url ...
+    server.stop()
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubEndpoint:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0, fail_rate: float = 0.0):
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.received = []
+        self.in_flight = 0
+        self.max_in_flight = 0  # most requests being handled at once
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/feedback"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with stub._lock:
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    self._reply(body)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def _reply(self, body):
+                if stub.delay:
+                    time.sleep(stub.delay)
+                if random.random() < stub.fail_rate:
+                    self.send_response(503)
+                    self.end_headers()
+                    self.wfile.write(b"unavailable")
+                    return
+                with stub._lock:
+                    stub.received.append({
+                        "path": self.path,
+                        "content_type": self.headers.get("Content-Type"),
+                        "body": body.decode("utf-8", "replace"),
+                    })
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain")
+                self.end_headers()
+                self.wfile.write(b"success")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stub feedback endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait before replying")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    server = StubEndpoint(args.host, args.port, args.delay, args.fail_rate).start()
+    print(f"Stub feedback endpoint listening on {server.url}")
+    try:
+        while True:
+            time.sleep(5)
+            with server._lock:
+                count = len(server.received)
+            print(json.dumps({"received": count}))
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
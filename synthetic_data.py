@@ -0,0 +1,68 @@
+"""Generate scaled-up copies of the recap CSVs for benchmarking.
+
+Rows are replicated from the shipped mpcc_* files with unique names,
+jittered coordinates and meeting dates shifted back in time, so a scaled
+dataset looks like a longer, multi-year history with the same shape.
+Files are written under the same names the app loads.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_loader import PROJECTS_CSV, STANCES_CSV, TOPICS_CSV
+
+
+def scale_projects(df: pd.DataFrame, scale: int, rng) -> pd.DataFrame:
+    out = pd.concat([df] * scale, ignore_index=True)
+    copy = np.repeat(np.arange(scale), len(df))
+    out['project_name'] = out['project_name'] + np.where(copy > 0, " #" + copy.astype(str), "")
+    lat = pd.to_numeric(out['latitude'], errors='coerce')
+    lon = pd.to_numeric(out['longitude'], errors='coerce')
+    # Jitter copies by up to ~2 km so clustering and viewport queries see spread-out points
+    jitter = copy > 0
+    out['latitude'] = lat + np.where(jitter, rng.uniform(-0.02, 0.02, len(out)), 0.0)
+    out['longitude'] = lon + np.where(jitter, rng.uniform(-0.02, 0.02, len(out)), 0.0)
+    return out
+
+
+def scale_stances(df: pd.DataFrame, scale: int) -> pd.DataFrame:
+    out = pd.concat([df] * scale, ignore_index=True)
+    copy = np.repeat(np.arange(scale), len(df))
+    out['Council Member'] = out['Council Member'] + np.where(copy > 0, " (" + copy.astype(str) + ")", "")
+    return out
+
+
+# Synthetic meeting histories are squeezed into at most this many years
+MAX_HISTORY_YEARS = 50
+
+
+def scale_topics(df: pd.DataFrame, scale: int) -> pd.DataFrame:
+    """Repeat the meeting history, shifting each copy back by the span it covers.
+
+    Large scales shift by less than the full span (copies then interleave)
+    so the history stays within MAX_HISTORY_YEARS.
+    """
+    dates = pd.to_datetime(df['Date'])
+    span = (dates.max() - dates.min()) + pd.Timedelta(days=7)
+    step = min(span, pd.Timedelta(days=365 * MAX_HISTORY_YEARS) / scale)
+    copies = []
+    for i in range(scale):
+        copy = df.copy()
+        copy['Date'] = (dates - step * i).dt.strftime('%Y-%m-%d')
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True).sort_values('Date').reset_index(drop=True)
+
+
+def write_synthetic(out_dir: str, scale: int, source_dir: str = ".", seed: int = 0) -> dict:
+    """Write projects/stances/topics CSVs scaled by `scale`; returns row counts."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    projects = scale_projects(pd.read_csv(os.path.join(source_dir, PROJECTS_CSV)), scale, rng)
+    stances = scale_stances(pd.read_csv(os.path.join(source_dir, STANCES_CSV)), scale)
+    topics = scale_topics(pd.read_csv(os.path.join(source_dir, TOPICS_CSV)), scale)
+    projects.to_csv(os.path.join(out_dir, PROJECTS_CSV), index=False)
+    stances.to_csv(os.path.join(out_dir, STANCES_CSV), index=False)
+    topics.to_csv(os.path.join(out_dir, TOPICS_CSV), index=False)
+    return {"projects": len(projects), "stances": len(stances), "topics": len(topics)}
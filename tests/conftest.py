@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# The app's modules live at the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shared_store  # noqa: E402
+
+# One projects CSV shared by two cities, plus meetings and positions mentioning them
+PROJECTS = pd.DataFrame({
+    "project_name": ["Willow Village Master Plan", "Belle Haven Library Rebuild", "Holbrook-Palmer Park Pavilion"],
+    "street_address": ["1350 Willow Rd", "413 Ivy Dr", "150 Watkins Ave"],
+    "city": ["Menlo Park", "Menlo Park", "Atherton"],
+    "project_description": ["Mixed-use campus", "New branch library", "Event pavilion in the park"],
+    "latitude": [37.48, 37.47, 37.46],
+    "longitude": [-122.15, -122.16, -122.19],
+})
+
+TOPICS = pd.DataFrame({
+    "Date": ["2025-01-14", "2025-02-11"],
+    "Length_Minutes": [120, 90],
+    "Topic_Count": [2, 1],
+    "Major_Topics": ["- Willow Village master plan EIR review\n- Belle Haven library rebuild budget",
+                     "- Holbrook-Palmer Park pavilion design"],
+    "youtube-link": ["", ""],
+})
+
+STANCES = pd.DataFrame({
+    "Council Member": ["A. Member"],
+    "Key Positions": ["- Supports the 1350 Willow Rd master plan"],
+})
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_store, "STORE_DIR", str(tmp_path / "store"))
+    paths = {}
+    for name, frame in [("projects", PROJECTS), ("topics", TOPICS), ("stances", STANCES)]:
+        paths[name] = str(tmp_path / f"{name}.csv")
+        frame.to_csv(paths[name], index=False)
+    return paths
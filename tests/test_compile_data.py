@@ -0,0 +1,44 @@
+import json
+
+import pandas as pd
+
+from compile_data import compile_all
+from conftest import TOPICS
+
+
+def test_rejected_rows_counts_only_dropped_rows(dataset, tmp_path):
+    topics = pd.concat([TOPICS, pd.DataFrame({
+        "Date": ["not a date", "2025-03-11"], "Length_Minutes": [60, "n/a"], "Topic_Count": [1, 1],
+        "Major_Topics": ["- Budget", "- Parks"], "youtube-link": ["", ""],
+    })], ignore_index=True)
+    topics.to_csv(dataset["topics"], index=False)
+
+    manifest = compile_all(dataset["projects"], dataset["stances"], dataset["topics"], str(tmp_path / "out"),
+                           city="Menlo Park")
+
+    # The row with no duration is reported but kept; the undated one is dropped
+    assert manifest["datasets"]["topics"]["rows"] == 3
+    assert manifest["datasets"]["topics"]["rejected_rows"] == 1
+    # The Atherton project is filtered out by the city
+    assert manifest["datasets"]["projects"]["rejected_rows"] == 1
+    with open(tmp_path / "out" / "manifest.json") as f:
+        assert json.load(f) == manifest
+
+
+def test_snapshots_are_typed(dataset, tmp_path):
+    projects = pd.read_csv(dataset["projects"]).assign(zip_code=[94025, None, 94027],
+                                                       first_mention_date=["2025-01-14", "N/A", "2025-02-11"])
+    projects.to_csv(dataset["projects"], index=False)
+    out = tmp_path / "out"
+
+    manifest = compile_all(dataset["projects"], dataset["stances"], dataset["topics"], str(out), city="Menlo Park")
+
+    topics = pd.read_parquet(out / "topics.parquet")
+    assert topics["Date"].dtype == "datetime64[ns]"
+    assert manifest["datasets"]["topics"]["columns"]["Date"] == "datetime64[ns]"
+    snapshot = pd.read_parquet(out / "projects.parquet")
+    assert snapshot["zip_code"].dtype == "Int64"
+    assert snapshot["zip_code"].tolist() == [94025, pd.NA]
+    assert snapshot["earliest_mention_date"].dtype == "datetime64[ns]"
+    assert snapshot["earliest_mention_date"].tolist() == [pd.Timestamp("2025-01-14"), pd.NaT]
+    assert manifest["datasets"]["projects"]["columns"]["earliest_mention_date"] == "datetime64[ns]"
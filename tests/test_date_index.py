@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from date_index import MeetingIndex, MentionIndex, SortedDates, date_bounds, filter_rows
+
+MEETINGS = pd.DataFrame({"Date": pd.to_datetime(["2025-03-11", "2025-01-14", "2025-02-11", "2025-02-25"])})
+
+PROJECTS = pd.DataFrame({
+    "project": ["A", "B", "C", "D", "E"],
+    "earliest_mention_date": ["2025-01-14", "2025-02-11", "N/A", "N/A", "2025-03-11"],
+    "latest_mention_date": ["2025-02-11", "2025-03-11", "2025-02-25", "N/A", "2025-03-11"],
+})
+
+
+def test_sorted_dates_skip_nat():
+    dates = SortedDates(pd.to_datetime(["2025-02-01", None, "2025-01-01"]).to_numpy())
+    assert dates.valid == 2
+    assert dates.upto("2025-12-31").tolist() == [2, 0]
+    assert dates.since("2025-01-01").tolist() == [2, 0]
+    assert dates.between("2025-01-15", "2025-02-01").tolist() == [0]
+    assert dates.bounds() == (pd.Timestamp("2025-01-01"), pd.Timestamp("2025-02-01"))
+    assert SortedDates(np.array([np.datetime64("NaT")], dtype="datetime64[ns]")).bounds() is None
+
+
+def test_meeting_range_in_frame_order():
+    index = MeetingIndex(MEETINGS)
+    assert index.positions("2025-02-01", "2025-12-31").tolist() == [0, 2, 3]
+    # A single day, given with a time of day, still matches the whole day
+    assert index.positions("2025-02-11", pd.Timestamp("2025-02-11 18:30")).tolist() == [2]
+    assert index.positions("2024-01-01", "2024-12-31").tolist() == []
+    # An inverted range is empty rather than an error
+    assert index.positions("2025-03-01", "2025-02-01").tolist() == []
+
+
+def test_mention_intervals_overlap_range():
+    index = MentionIndex(PROJECTS)
+    # C has only a latest date, D has none and is always kept
+    assert index.positions("2025-02-20", "2025-02-28").tolist() == [1, 2, 3]
+    assert index.positions("2025-01-14", "2025-01-14").tolist() == [0, 3]
+    assert index.positions("2026-01-01", "2026-12-31").tolist() == [3]
+    assert index.bounds() == (pd.Timestamp("2025-01-14"), pd.Timestamp("2025-03-11"))
+
+
+def test_date_bounds_spans_indexes_with_dates():
+    undated = MentionIndex(PROJECTS[PROJECTS["project"] == "D"].reset_index(drop=True))
+    assert undated.bounds() is None
+    assert date_bounds(undated) is None
+    assert date_bounds(MeetingIndex(MEETINGS), undated, MentionIndex(PROJECTS.iloc[:2])) == (
+        pd.Timestamp("2025-01-14"), pd.Timestamp("2025-03-11"))
+
+
+def test_filter_rows_fingerprints_the_range():
+    df = MEETINGS.copy()
+    df.attrs = {"fingerprint": "abc", "delta": {"parent": "xyz", "keys": []}}
+    assert filter_rows(df, np.arange(len(df)), "2025-01-01", "2025-12-31") is df
+
+    out = filter_rows(df, np.array([2]), pd.Timestamp("2025-02-11 09:00"), "2025-02-11")
+    assert out["Date"].tolist() == [pd.Timestamp("2025-02-11")]
+    assert out.attrs == {"fingerprint": "abc@2025-02-11..2025-02-11"}
+    assert df.attrs["fingerprint"] == "abc"
+
+    empty = filter_rows(df, np.array([], dtype=int), "2024-01-01", "2024-12-31")
+    assert empty.empty and empty.attrs["fingerprint"] == "abc@2024-01-01..2024-12-31"
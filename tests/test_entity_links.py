@@ -0,0 +1,49 @@
+import pandas as pd
+
+from data_loader import load_projects, load_stances, load_topics
+from entity_links import build_link_index, get_link_index, with_meeting_links, with_project_links
+
+
+def test_match_by_name_and_address(dataset):
+    projects, _ = load_projects(dataset["projects"], city="Menlo Park")
+    index = build_link_index(projects, load_stances(dataset["stances"]), load_topics(dataset["topics"]))
+    assert index.counts("Willow Village Master Plan") == (1, 1)
+    assert index.counts("Belle Haven Library Rebuild") == (1, 0)
+    assert index.meetings_for("Willow Village Master Plan") == ["2025-01-14"]
+    assert index.projects_for_member("A. Member") == ["Willow Village Master Plan"]
+    assert index.projects_for_meeting("2025-02-11") == []
+
+
+def test_cities_sharing_one_csv_get_their_own_links(dataset):
+    stances, topics = load_stances(dataset["stances"]), load_topics(dataset["topics"])
+    menlo, _ = load_projects(dataset["projects"], city="Menlo Park")
+    atherton, _ = load_projects(dataset["projects"], city="Atherton")
+    assert menlo.attrs["fingerprint"] != atherton.attrs["fingerprint"]
+
+    # Menlo Park first, so a cache keyed on the file alone would hand its frames to Atherton
+    menlo_links = get_link_index(menlo, stances, topics)
+    menlo_projects = with_project_links(menlo, menlo_links)
+    atherton_links = get_link_index(atherton, stances, topics)
+    atherton_projects = with_project_links(atherton, atherton_links)
+
+    assert list(menlo_projects["project"]) == ["Willow Village Master Plan", "Belle Haven Library Rebuild"]
+    assert list(atherton_projects["project"]) == ["Holbrook-Palmer Park Pavilion"]
+    assert list(atherton_projects["meetings"]) == [1]
+    assert list(with_meeting_links(topics, atherton_links)["Projects"]) == ["", "Holbrook-Palmer Park Pavilion"]
+    assert menlo_projects.attrs["fingerprint"] != atherton_projects.attrs["fingerprint"]
+
+
+def test_meetings_on_the_same_date_keep_their_own_projects(dataset):
+    topics = load_topics(dataset["topics"])
+    # A special session on the day of the first meeting, about one of its two projects
+    special = topics.iloc[[0]].assign(Major_Topics="- Belle Haven library rebuild budget")
+    topics = pd.concat([topics, special], ignore_index=True)
+    projects, _ = load_projects(dataset["projects"], city="Menlo Park")
+    index = build_link_index(projects, load_stances(dataset["stances"]), topics)
+
+    assert index.projects_for_meeting_row(0) == ["Willow Village Master Plan", "Belle Haven Library Rebuild"]
+    assert index.projects_for_meeting_row(2) == ["Belle Haven Library Rebuild"]
+    assert index.projects_for_meeting("2025-01-14") == ["Willow Village Master Plan", "Belle Haven Library Rebuild"]
+    assert index.counts("Belle Haven Library Rebuild") == (2, 0)
+    assert list(with_meeting_links(topics, index)["Projects"]) == [
+        "Willow Village Master Plan, Belle Haven Library Rebuild", "", "Belle Haven Library Rebuild"]
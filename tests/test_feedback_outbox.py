@@ -0,0 +1,114 @@
+import json
+import sqlite3
+import time
+
+import pytest
+
+from feedback_outbox import FeedbackOutbox
+from stub_endpoint import StubEndpoint
+
+
+@pytest.fixture
+def stub():
+    server = StubEndpoint().start()
+    yield server
+    server.stop()
+
+
+def _wait(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def _stored_payloads(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return [json.loads(row[0]) for row in conn.execute("SELECT payload FROM outbox")]
+
+
+def _attempts(outbox):
+    with outbox._db_lock:
+        return outbox._conn.execute("SELECT MAX(attempts) FROM outbox").fetchone()[0]
+
+
+def test_delivers_to_stub_with_token_added_at_send_time(tmp_path, stub):
+    db = str(tmp_path / "outbox.sqlite3")
+    outbox = FeedbackOutbox(db, credentials=lambda url: {"token": "secret"} if url == stub.url else {})
+    for i in range(5):
+        outbox.enqueue(stub.url, {"feedback_text": f"note {i}"}, expect_text="success")
+    outbox.start()
+    try:
+        assert _wait(lambda: len(stub.received) == 5)
+        assert _wait(lambda: outbox.counts() == {"sent": 5})
+    finally:
+        outbox.stop()
+
+    bodies = [json.loads(r["body"]) for r in stub.received]
+    assert sorted(b["feedback_text"] for b in bodies) == [f"note {i}" for i in range(5)]
+    assert all(b["token"] == "secret" for b in bodies)
+    # One post per submission, and the secret never reaches the database
+    assert all("token" not in p for p in _stored_payloads(db))
+
+
+def test_retries_until_the_stub_recovers(tmp_path, stub):
+    stub.fail_rate = 1.0
+    outbox = FeedbackOutbox(str(tmp_path / "outbox.sqlite3"), workers=1, base_delay=0.05, max_delay=0.1)
+    outbox.enqueue(stub.url, {"feedback_text": "hello"}, expect_text="success")
+    outbox.start()
+    try:
+        assert _wait(lambda: outbox.counts().get("pending") and _attempts(outbox) >= 2)
+        stub.fail_rate = 0.0
+        assert _wait(lambda: outbox.counts() == {"sent": 1})
+    finally:
+        outbox.stop()
+    assert len(stub.received) == 1
+
+
+def test_only_expired_leases_are_requeued(tmp_path):
+    db = str(tmp_path / "outbox.sqlite3")
+    other_process = FeedbackOutbox(db, lease=60)
+    live, stale = (other_process.enqueue("http://unused", {"n": i}) for i in range(2))
+    with other_process._db_lock:
+        other_process._conn.execute("UPDATE outbox SET status = 'sending', claimed_at = ? WHERE id = ?",
+                                    (time.time(), live))
+        other_process._conn.execute("UPDATE outbox SET status = 'sending', claimed_at = ? WHERE id = ?",
+                                    (time.time() - 120, stale))
+
+    assert FeedbackOutbox(db, lease=60).requeue_expired() == 1
+    with sqlite3.connect(db) as conn:
+        assert dict(conn.execute("SELECT id, status FROM outbox")) == {live: "sending", stale: "pending"}
+
+
+def test_prunes_delivered_rows_after_retention(tmp_path):
+    outbox = FeedbackOutbox(str(tmp_path / "outbox.sqlite3"), sent_retention=3600)
+    old, recent, pending = (outbox.enqueue("http://unused", {"n": i}) for i in range(3))
+    with outbox._db_lock:
+        outbox._conn.execute("UPDATE outbox SET status = 'sent', sent_at = ? WHERE id = ?", (time.time() - 7200, old))
+        outbox._conn.execute("UPDATE outbox SET status = 'sent', sent_at = ? WHERE id = ?", (time.time(), recent))
+    assert outbox.prune() == 1
+    assert outbox.counts() == {"sent": 1, "pending": 1}
+
+
+def test_large_backlog_is_claimed_and_sent_in_batches(tmp_path, stub):
+    stub.delay = 0.2
+    outbox = FeedbackOutbox(str(tmp_path / "outbox.sqlite3"), workers=1, batch_threshold=3, batch_size=5,
+                            batch_parallel=5)
+    claimed = []
+    claim = outbox._claim
+    outbox._claim = lambda: claimed.append(len(rows := claim())) or rows
+    for i in range(12):
+        outbox.enqueue(stub.url, {"feedback_text": f"note {i}"}, expect_text="success")
+    outbox.start()
+    try:
+        assert _wait(lambda: outbox.counts() == {"sent": 12})
+    finally:
+        outbox.stop()
+
+    # 12 due > 3: batches of 5, then single rows once the backlog is small again
+    assert [n for n in claimed if n] == [5, 5, 1, 1]
+    assert stub.max_in_flight == 5
+    assert sorted(json.loads(r["body"])["feedback_text"] for r in stub.received) == sorted(
+        f"note {i}" for i in range(12))
@@ -0,0 +1,107 @@
+import json
+
+import pandas as pd
+import pytest
+
+import geocoder
+from geocoder import GeocodeCache, GeocodeError, geocode_projects
+
+
+class FlakyBackend:
+    """Finds every address, except that some lookups raise."""
+
+    name = "fake"
+
+    def __init__(self, errors=None):
+        self.errors = errors or {}
+        self.queries = []
+
+    def geocode(self, query):
+        self.queries.append(query)
+        street = query.split(",")[0]
+        if street in self.errors:
+            raise self.errors[street]
+        return 37.0, -122.0
+
+
+def _projects(streets, lat=None):
+    return pd.DataFrame({
+        "project_name": [f"P{i}" for i in range(len(streets))],
+        "street_address": streets,
+        "city": "Menlo Park", "state": "CA", "zip_code": 94025,
+        "latitude": lat, "longitude": lat,
+    })
+
+
+def test_failed_lookups_do_not_lose_the_rest(tmp_path):
+    cache = GeocodeCache(str(tmp_path / "cache.json"))
+    backend = FlakyBackend({"2 B St": GeocodeError("HTTP 403"), "3 C St": ValueError("not JSON")})
+    df, stats = geocode_projects(_projects(["1 A St", "2 B St", "3 C St", "4 D St"]), backend, cache,
+                                 workers=2, rate=0)
+    assert stats["looked_up"] == 2 and stats["failed"] == 2
+    assert df["latitude"].notna().tolist() == [True, False, False, True]
+    # Finished lookups were saved; failures weren't cached, so they are retried
+    saved = json.loads((tmp_path / "cache.json").read_text())
+    assert len(saved) == 2
+
+
+def test_cache_saved_every_few_lookups(tmp_path, monkeypatch):
+    monkeypatch.setattr(geocoder, "SAVE_EVERY", 2)
+    saves = []
+    cache = GeocodeCache(str(tmp_path / "cache.json"))
+    monkeypatch.setattr(cache, "save", lambda: saves.append(len(cache)))
+    geocode_projects(_projects([f"{i} A St" for i in range(5)]), FlakyBackend(), cache, workers=1, rate=0)
+    assert saves == [2, 4, 5]
+
+
+def test_refresh_bypasses_the_cache(tmp_path):
+    cache = GeocodeCache(str(tmp_path / "cache.json"))
+    geocode_projects(_projects(["1 A St"]), FlakyBackend(), cache, rate=0)
+    backend = FlakyBackend()
+    geocode_projects(_projects(["1 A St"]), backend, cache, rate=0)
+    assert backend.queries == []
+    _, stats = geocode_projects(_projects(["1 A St"], lat=37.5), backend, cache, rate=0, refresh=True)
+    assert len(backend.queries) == 1 and stats["looked_up"] == 1
+
+
+def test_main_writes_a_separate_file_unless_in_place(tmp_path):
+    source = tmp_path / "projects.csv"
+    _projects(["1 A St"]).to_csv(source, index=False)
+    table = tmp_path / "table.csv"
+    pd.DataFrame({"address": ["1 A St, Menlo Park, CA, 94025"], "latitude": [37.1], "longitude": [-122.1]}) \
+        .to_csv(table, index=False)
+    before = source.read_text()
+    args = ["--projects", str(source), "--backend", "table", "--table", str(table),
+            "--cache", str(tmp_path / "cache.json"), "--overrides", "", "--rate", "0"]
+
+    assert geocoder.main(args) == 0
+    assert source.read_text() == before
+    assert pd.read_csv(tmp_path / "projects_geocoded.csv")["latitude"].tolist() == [37.1]
+
+    assert geocoder.main(args + ["--in-place"]) == 0
+    assert pd.read_csv(source)["latitude"].tolist() == [37.1]
+
+
+class _Response:
+    def __init__(self, status_code, body):
+        self.status_code, self.body = status_code, body
+
+    def json(self):
+        if isinstance(self.body, Exception):
+            raise self.body
+        return self.body
+
+
+@pytest.mark.parametrize("response", [_Response(403, []), _Response(429, []), _Response(200, ValueError("not JSON")),
+                                      _Response(200, [{"lat": "x"}])])
+def test_nominatim_errors_become_geocode_errors(monkeypatch, response):
+    backend = geocoder.NominatimGeocoder()
+    monkeypatch.setattr(backend.session, "get", lambda *a, **k: response)
+    with pytest.raises(GeocodeError):
+        backend.geocode("1 A St")
+
+
+def test_nominatim_result(monkeypatch):
+    backend = geocoder.NominatimGeocoder()
+    monkeypatch.setattr(backend.session, "get", lambda *a, **k: _Response(200, [{"lat": "37.5", "lon": "-122.2"}]))
+    assert backend.geocode("1 A St") == (37.5, -122.2)
@@ -0,0 +1,94 @@
+import os
+
+import pandas as pd
+
+import ingest
+from data_loader import load_projects, load_stances, load_topics
+from search_index import SearchIndex, build_documents, get_search_index
+
+
+def write_delta(directory, name, rows):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return path
+
+
+def meeting(date, topics):
+    return {"Date": date, "Length_Minutes": 60, "Topic_Count": 1, "Major_Topics": topics, "youtube-link": ""}
+
+
+def test_append_delta_adds_rows_and_records_its_parent(dataset, tmp_path):
+    topics = load_topics(dataset["topics"])
+    watcher = ingest.IngestWatcher(str(tmp_path / "incoming"))
+    write_delta(watcher.directory, "topics-march.csv", [meeting("2025-03-11", "- Downtown parking plan")])
+    assert watcher.scan()
+
+    merged = watcher.apply("topics", topics)
+    assert len(merged) == len(topics) + 1
+    assert merged["Date"].is_monotonic_increasing
+    assert merged.attrs["fingerprint"].startswith(topics.attrs["fingerprint"] + "+")
+    assert merged.attrs["delta"] == {"parent": topics.attrs["fingerprint"], "keys": ["2025-03-11"]}
+    # Unchanged files give back the same merged frame
+    assert not watcher.scan()
+    assert watcher.apply("topics", topics) is merged
+
+
+def test_replace_delta_upserts_on_the_key(dataset, tmp_path):
+    projects, _ = load_projects(dataset["projects"], city="Menlo Park")
+    watcher = ingest.IngestWatcher(str(tmp_path / "incoming"))
+    write_delta(watcher.directory, "projects-update.csv", [{
+        "project_name": "Belle Haven Library Rebuild", "street_address": "413 Ivy Dr", "city": "Menlo Park",
+        "project_description": "Library and community center", "latitude": 37.47, "longitude": -122.16,
+    }])
+    watcher.scan()
+
+    merged = watcher.apply("projects", projects, city="Menlo Park")
+    assert len(merged) == len(projects)
+    row = merged[merged["project"] == "Belle Haven Library Rebuild"]
+    assert row["description"].tolist() == ["Library and community center"]
+    assert merged.attrs["delta"]["keys"] == ["Belle Haven Library Rebuild"]
+
+
+def test_merged_frames_are_evicted_least_recently_used_first(dataset, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "MAX_MERGED", 2)
+    topics = load_topics(dataset["topics"])
+    watcher = ingest.IngestWatcher(str(tmp_path / "incoming"))
+    write_delta(watcher.directory, "topics-march.csv", [meeting("2025-03-11", "- Downtown parking plan")])
+    watcher.scan()
+
+    bases = []
+    for n in range(3):
+        base = topics.copy()
+        base.attrs["fingerprint"] = f"base-{n}"
+        bases.append(base)
+    first = watcher.apply("topics", bases[0])
+    watcher.apply("topics", bases[1])
+    assert watcher.apply("topics", bases[0]) is first   # now the most recently used
+    watcher.apply("topics", bases[2])                    # evicts base-1
+
+    assert [key[1] for key in watcher._merged] == ["base-0", "base-2"]
+    assert watcher.apply("topics", bases[0]) is first
+
+
+def test_index_updated_from_parent_matches_a_full_rebuild(dataset, tmp_path):
+    projects, _ = load_projects(dataset["projects"], city="Menlo Park")
+    stances, topics = load_stances(dataset["stances"]), load_topics(dataset["topics"])
+    parent = get_search_index(projects, stances, topics)
+
+    watcher = ingest.IngestWatcher(str(tmp_path / "incoming"))
+    write_delta(watcher.directory, "topics-update.csv", [
+        meeting("2025-02-11", "- Holbrook-Palmer Park pavilion budget\n- Library hours"),
+        meeting("2025-03-11", "- Willow Village parking"),
+    ])
+    watcher.scan()
+    merged = watcher.apply("topics", topics)
+
+    updated = get_search_index(projects, stances, merged)
+    assert updated is not parent and updated.removed
+    rebuilt = SearchIndex(build_documents(projects, stances, merged))
+    for query in ["pavilion", "library", "willow village", "parking", "budget"]:
+        expected = [(hit["kind"], hit["key"], hit["text"]) for hit in rebuilt.search(query)]
+        assert [(hit["kind"], hit["key"], hit["text"]) for hit in updated.search(query)] == expected, query
+    # The parent index still answers for the old version
+    assert [hit["key"] for hit in parent.search("pavilion design")][:1] == ["2025-02-11"]
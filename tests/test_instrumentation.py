@@ -0,0 +1,61 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+import instrumentation
+
+
+class Message:
+    def __init__(self, size):
+        self.size = size
+
+    def ByteSize(self):
+        return self.size
+
+
+@pytest.fixture
+def records(monkeypatch):
+    out = []
+    monkeypatch.setattr(instrumentation, "enabled", lambda: True)
+    monkeypatch.setattr(instrumentation.st, "session_state", {instrumentation._RECORDS_KEY: out})
+    return out
+
+
+def fake_ctx(monkeypatch, **attrs):
+    ctx = SimpleNamespace(session_id="s1", **attrs)
+    monkeypatch.setattr(instrumentation, "get_script_run_ctx", lambda: ctx)
+    return ctx
+
+
+def test_sections_count_payload_and_restore_enqueue(monkeypatch, records):
+    sent = []
+    original = sent.append
+    ctx = fake_ctx(monkeypatch, _enqueue=original)
+
+    with instrumentation.section("outer"):
+        ctx._enqueue(Message(10))
+        with instrumentation.section("inner"):
+            ctx._enqueue(Message(5))
+    ctx._enqueue(Message(99))
+
+    assert [(r["section"], r["bytes"], r["messages"]) for r in records] == [("inner", 5, 1), ("outer", 15, 2)]
+    assert len(sent) == 3
+    assert ctx._enqueue is original
+    assert not hasattr(ctx, "_lwa_perf_stack")
+
+
+def test_sections_are_only_timed_without_enqueue(monkeypatch, records, caplog):
+    monkeypatch.setattr(instrumentation, "_warned_no_enqueue", False)
+    ctx = fake_ctx(monkeypatch)
+
+    with caplog.at_level(logging.WARNING, logger="lwa.perf"):
+        with instrumentation.section("a"):
+            pass
+        with instrumentation.section("b"):
+            pass
+
+    assert [(r["section"], r["bytes"]) for r in records] == [("a", None), ("b", None)]
+    assert all(r["ms"] >= 0 for r in records)
+    assert len([r for r in caplog.records if r.levelno == logging.WARNING]) == 1
+    assert not hasattr(ctx, "_enqueue")
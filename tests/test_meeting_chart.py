@@ -0,0 +1,52 @@
+import json
+
+import pandas as pd
+
+from meeting_chart import (MAX_MEETING_BARS, SUMMARY_BULLETS, aggregate_meetings, default_granularity,
+                           meeting_chart_spec, summarize_topics)
+
+MEETINGS = pd.DataFrame({
+    "Date": ["2025-02-11", "2025-01-14", "2025-01-28"],
+    "Duration (min)": [90, 120, None],
+    "Topic Count": [2, 3, 1],
+    "Major_Topics": ["- Housing Element\n- Budget", "- A\n- B\n- C\n- D", "- Closed session"],
+})
+
+
+def test_one_bar_per_meeting_in_date_order():
+    bars = aggregate_meetings(MEETINGS, "Meeting")
+    assert list(bars["Label"]) == ["2025-01-14", "2025-01-28", "2025-02-11"]
+    assert list(bars["Meetings"]) == [1, 1, 1]
+    assert bars["Summary"][1] == "Closed session"
+
+
+def test_periods_sum_meetings_minutes_and_topics():
+    month = aggregate_meetings(MEETINGS, "Month")
+    assert list(month["Label"]) == ["Jan 2025", "Feb 2025"]
+    assert list(month["Meetings"]) == [2, 1]
+    # A missing duration counts as zero minutes
+    assert list(month["Duration (min)"]) == [120, 90]
+    assert list(month["Topic Count"]) == [4, 2]
+
+    quarter = aggregate_meetings(MEETINGS, "Quarter")
+    assert list(quarter["Label"]) == ["2025Q1"] and list(quarter["Meetings"]) == [3]
+
+
+def test_summaries_are_cut_short():
+    summary = summarize_topics(MEETINGS["Major_Topics"][1])
+    assert summary == "A; B; C … (see Meetings table)"
+    assert SUMMARY_BULLETS == 3
+    assert summarize_topics(None) == ""
+
+
+def test_long_histories_open_grouped_by_month():
+    assert default_granularity(MEETINGS) == "Meeting"
+    many = pd.DataFrame({"Date": pd.date_range("2020-01-01", periods=MAX_MEETING_BARS + 1, freq="W")})
+    assert default_granularity(many) == "Month"
+
+
+def test_spec_is_valid_json_with_missing_durations():
+    spec = meeting_chart_spec(MEETINGS, "Meeting")
+    values = json.loads(json.dumps(spec, allow_nan=False))["data"]["values"]
+    assert [v["Duration (min)"] for v in values] == [120, None, 90]
+    assert set(values[0]) == {"Period", "Label", "Meetings", "Duration (min)", "Topic Count", "Summary"}
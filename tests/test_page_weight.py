@@ -0,0 +1,18 @@
+from page_weight import QUIET_WINDOW, time_to_interactive
+
+WINDOW = QUIET_WINDOW * 1000
+
+
+def test_tti_is_the_last_long_task_before_a_quiet_window():
+    long_tasks = [(900, 1000), (1500, 1600), (1600 + WINDOW - 10, 1600 + WINDOW + 90)]
+    # The third task falls inside the window after the second, so TTI is its end
+    assert time_to_interactive(1000, long_tasks, [], 20000) == 1600 + WINDOW + 90
+    assert time_to_interactive(1000, long_tasks[:2], [], 20000) == 1600
+
+
+def test_tti_waits_for_at_most_two_requests_in_flight():
+    requests = [(1000, 3000), (1000, 3000), (1000, 4000), (2000, None)]
+    # Three requests overlap until 3000; after that at most two are in flight
+    assert time_to_interactive(1000, [], requests, 20000) == 1000
+    assert time_to_interactive(1000, [(2500, 2600)], requests, 20000) == 2600
+    assert time_to_interactive(1000, [], requests, 1000 + WINDOW) is None
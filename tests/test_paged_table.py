@@ -0,0 +1,41 @@
+import pandas as pd
+
+from paged_table import _cached_positions, filter_and_sort, page_bounds
+
+DF = pd.DataFrame({
+    "project": ["Willow Village", "Belle Haven Library", "Park Pavilion", "Willow Rd Bridge"],
+    "address": ["1350 Willow Rd", "413 Ivy Dr", None, "Willow Rd"],
+    "Date": pd.to_datetime(["2025-02-11", "2025-01-14", None, "2025-03-11"]),
+})
+
+
+def test_filters_are_case_insensitive_substrings_and_combine():
+    assert filter_and_sort(DF, ()).tolist() == [0, 1, 2, 3]
+    assert filter_and_sort(DF, (("project", "willow"),)).tolist() == [0, 3]
+    assert filter_and_sort(DF, (("project", "willow"), ("address", "1350"))).tolist() == [0]
+    # Text is matched literally, not as a regex
+    assert filter_and_sort(DF, (("address", "Rd."),)).tolist() == []
+
+
+def test_sort_puts_missing_values_last_both_ways():
+    assert filter_and_sort(DF, (), "project").tolist() == [1, 2, 3, 0]
+    assert filter_and_sort(DF, (), "Date").tolist() == [1, 0, 3, 2]
+    assert filter_and_sort(DF, (), "Date", ascending=False).tolist() == [3, 0, 1, 2]
+    assert filter_and_sort(DF, (("project", "willow"),), "Date", ascending=False).tolist() == [3, 0]
+
+
+def test_cached_positions_match_and_are_keyed_by_arguments():
+    first = _cached_positions("test-paged", (("project", "willow"),), "Date", True, DF)
+    assert first.tolist() == [0, 3]
+    assert _cached_positions("test-paged", (("project", "willow"),), "Date", False, DF).tolist() == [3, 0]
+
+
+def test_page_bounds():
+    assert page_bounds(60, 25, 1) == (0, 25, 3)
+    # Last page is partial
+    assert page_bounds(60, 25, 3) == (50, 60, 3)
+    # Pages past the end are clamped to the last one
+    assert page_bounds(60, 25, 7) == (50, 60, 3)
+    assert page_bounds(50, 25, 2) == (25, 50, 2)
+    # No matching rows still gives one (empty) page
+    assert page_bounds(0, 25, 1) == (0, 0, 1)
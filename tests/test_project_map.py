@@ -0,0 +1,55 @@
+import folium
+import pandas as pd
+
+from project_map import CachedMap, build_project_map, marker_html
+
+PROJECTS = pd.DataFrame({
+    "project": ["Willow Village", "Library"],
+    "address": ["1350 Willow Rd", "n/a"],
+    "description": ["Mixed-use campus", None],
+    "earliest_mention_date": ["2025-01-14", None],
+    "latest_mention_date": ["2025-03-11", None],
+    "url": ["menlopark.gov/willow", "N/A"],
+    "latitude": [37.48123, 37.47],
+    "longitude": [-122.15, -122.16],
+    "meetings": [1, 3],
+    "council_members": [2, 0],
+})
+
+
+def test_marker_html_fills_missing_values():
+    tooltip, popup = marker_html(PROJECTS)
+    assert "<b>Address:</b> 1350 Willow Rd" in tooltip[0]
+    assert "<b>Coordinates:</b> (37.4812, -122.1500)" in tooltip[0]
+    assert "<b>Address:</b> N/A" in tooltip[1]
+    assert "<b>Earliest Mention:</b> N/A" in tooltip[1]
+    assert "No description available." in popup[1]
+
+
+def test_marker_html_formats_typed_dates():
+    typed = PROJECTS.assign(earliest_mention_date=pd.to_datetime(PROJECTS["earliest_mention_date"]))
+    tooltip, _ = marker_html(typed)
+    assert "<b>Earliest Mention:</b> 2025-01-14" in tooltip[0]
+    assert "<b>Earliest Mention:</b> N/A" in tooltip[1]
+
+
+def test_marker_html_links_and_counts():
+    _, popup = marker_html(PROJECTS)
+    # URLs without a scheme get https://
+    assert "<a href='https://menlopark.gov/willow' target='_blank'>More Information</a>" in popup[0]
+    assert "No public URL available." in popup[1]
+    assert "Discussed in</b> 1 meeting · <b>mentioned by</b> 2 council members" in popup[0]
+    assert "Discussed in</b> 3 meetings · <b>mentioned by</b> 0 council members" in popup[1]
+    # Without the link columns there is no counts line
+    _, plain = marker_html(PROJECTS.drop(columns=["meetings", "council_members"]))
+    assert "Discussed in" not in plain[0]
+
+
+def test_cached_map_copies_are_independent():
+    cached = CachedMap(build_project_map(PROJECTS, "auto"))
+    first, second = cached.copy(), cached.copy()
+    assert first is not second
+    assert first.get_root().render() == second.get_root().render()
+
+    folium.Marker([37.0, -122.0]).add_to(first)
+    assert len(cached.copy()._children) == len(second._children) == len(first._children) - 1
@@ -0,0 +1,102 @@
+import os
+
+from data_loader import load_projects, load_stances, load_topics
+from search_index import ANCHORS, SearchIndex, get_search_index
+from text_utils import split_bullets, stem, tokenize
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_cities_sharing_one_csv_get_their_own_index(dataset):
+    stances, topics = load_stances(dataset["stances"]), load_topics(dataset["topics"])
+    menlo, _ = load_projects(dataset["projects"], city="Menlo Park")
+    atherton, _ = load_projects(dataset["projects"], city="Atherton")
+
+    menlo_index = get_search_index(menlo, stances, topics)
+    atherton_index = get_search_index(atherton, stances, topics)
+    assert menlo_index is not atherton_index
+
+    def projects(index, query):
+        return [hit["label"] for hit in index.search(query) if hit["kind"] == "project"]
+
+    assert projects(menlo_index, "library") == ["Belle Haven Library Rebuild"]
+    assert projects(atherton_index, "library") == []
+    assert projects(atherton_index, "pavilion") == ["Holbrook-Palmer Park Pavilion"]
+
+
+def _doc(kind, key, text, label=None):
+    return {"kind": kind, "key": key, "label": label or key, "text": text}
+
+
+DOCS = [
+    _doc("meeting", "2025-01-14", "Parking lot restriping on Santa Cruz Ave", "Meeting 2025-01-14"),
+    _doc("meeting", "2025-01-14", "Bedwell Bayfront Park trail repairs", "Meeting 2025-01-14"),
+    _doc("meeting", "2025-02-11", "New plazas downtown and library hours", "Meeting 2025-02-11"),
+    _doc("project", "Belle Haven Library Rebuild", "413 Ivy Dr. New branch library"),
+    _doc("position", "A. Member", "Supports more libraries and library funding"),
+]
+
+
+def _labels(hits):
+    return [(hit["kind"], hit["text"]) for hit in hits]
+
+
+def test_tokenize_drops_stopwords_and_strips_plurals_only():
+    assert tokenize("The Plazas of the City's Libraries") == ["plaza", "city", "library"]
+    assert [stem(t) for t in ("parking", "meeting", "housing", "approved", "business")] == [
+        "parking", "meeting", "housing", "approved", "business"]
+
+
+def test_split_bullets_joins_wrapped_lines():
+    assert split_bullets("* First item\n  wrapped on\n\n- Second\n• Third") == [
+        "First item wrapped on", "Second", "Third"]
+    assert split_bullets("Intro line without a bullet") == ["Intro line without a bullet"]
+    assert split_bullets(None) == [] and split_bullets("  ") == []
+
+
+def test_park_does_not_match_parking():
+    hits = SearchIndex(DOCS).search("Park")
+    assert _labels(hits) == [("meeting", "Bedwell Bayfront Park trail repairs")]
+
+
+def test_ranking_prefers_all_terms_then_frequency():
+    index = SearchIndex(DOCS)
+    # Every term beats one term; the exact phrase doubles the score
+    assert index.search("library hours")[0]["text"] == "New plazas downtown and library hours"
+    # Two mentions in the position beat one in the project's longer text
+    assert [hit["kind"] for hit in index.search("library")][:2] == ["position", "project"]
+    assert index.search("the and of") == []
+
+
+def test_hits_link_to_their_section():
+    for hit in SearchIndex(DOCS).search("library"):
+        assert hit["anchor"] == ANCHORS[hit["kind"]]
+    with open(os.path.join(REPO_DIR, "streamlit_app.py"), encoding="utf-8") as f:
+        app = f.read()
+    for anchor in ANCHORS.values():
+        assert f'anchor="{anchor[1:]}"' in app
+
+
+def test_updated_replaces_docs_and_scores_like_a_fresh_index():
+    index = SearchIndex(DOCS)
+    new = [_doc("meeting", "2025-02-11", "Library parking garage design", "Meeting 2025-02-11")]
+    updated = index.updated({("meeting", "2025-02-11")}, new)
+
+    # The original index is unchanged
+    assert _labels(index.search("plazas")) == [("meeting", "New plazas downtown and library hours")]
+    assert updated.search("plazas") == []
+    assert "plaza" not in updated.postings
+    assert _labels(updated.search("garage")) == [("meeting", "Library parking garage design")]
+
+    # Dropped docs no longer count towards IDF or the average length
+    fresh = SearchIndex([doc for doc in DOCS if doc["key"] != "2025-02-11"] + new)
+    for query in ("library", "parking garage", "trail"):
+        assert [(h["text"], h["score"]) for h in updated.search(query)] == [
+            (h["text"], h["score"]) for h in fresh.search(query)]
+
+
+def test_updated_rebuilds_once_most_docs_are_stale():
+    index = SearchIndex(DOCS)
+    updated = index.updated({("meeting", "2025-01-14"), ("meeting", "2025-02-11")}, [])
+    assert not updated.removed and len(updated.docs) == 2
+    assert _labels(updated.search("library"))[0] == ("position", "Supports more libraries and library funding")
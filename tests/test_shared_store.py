@@ -0,0 +1,46 @@
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+import shared_store
+
+
+def _version(store, fingerprint, age):
+    path = shared_store.store_path("projects:Menlo Park", fingerprint, str(store))
+    shared_store.write_frame(path, pd.DataFrame({"project": ["a"]}))
+    then = time.time() - age
+    os.utime(path, (then, then))
+    return path
+
+
+def test_prune_keeps_previous_and_recent_versions(tmp_path):
+    ancient = _version(tmp_path, "v1", age=3 * 3600)
+    old = _version(tmp_path, "v2", age=2 * 3600)
+    recent = _version(tmp_path, "v3", age=60)
+    previous = _version(tmp_path, "v4", age=30)
+    current = _version(tmp_path, "v5", age=0)
+    other = shared_store.store_path("topics", "v1", str(tmp_path))
+    shared_store.write_frame(other, pd.DataFrame({"Date": ["2025-01-14"]}))
+    os.utime(other, (0, 0))
+
+    shared_store._prune("projects:Menlo Park", current, grace=3600)
+
+    assert not os.path.exists(ancient) and not os.path.exists(old)
+    assert all(os.path.exists(p) for p in (recent, previous, current, other))
+
+
+def test_prune_keeps_the_previous_version_however_old(tmp_path):
+    previous = _version(tmp_path, "v1", age=10 * 3600)
+    current = _version(tmp_path, "v2", age=0)
+    shared_store._prune("projects:Menlo Park", current, grace=0)
+    assert os.path.exists(previous)
+
+
+def test_strings_stay_arrow_backed(tmp_path):
+    path = str(tmp_path / "frame.arrow")
+    shared_store.write_frame(path, pd.DataFrame({"project": ["a", "b"], "meetings": [1, 2]}))
+    df = shared_store.read_frame(path)
+    assert df["project"].dtype == pd.ArrowDtype(pa.string())
+    assert df["meetings"].dtype == "int64"
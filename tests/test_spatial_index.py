@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from spatial_index import GridIndex, expand, viewport_bounds
+
+
+def brute_force(lat, lon, bounds):
+    south, west, north, east = bounds
+    return np.flatnonzero((lat >= south) & (lat <= north) & (lon >= west) & (lon <= east))
+
+
+def check(index, lat, lon, bounds):
+    found = index.query(bounds)
+    expected = brute_force(lat, lon, bounds)
+    assert np.array_equal(np.sort(found), expected)
+    assert index.candidate_count(bounds) >= len(expected)
+    return found
+
+
+@pytest.fixture(scope="module")
+def clustered():
+    rng = np.random.default_rng(0)
+    centers = rng.uniform([36.5, -123.0], [38.5, -121.0], size=(20, 2))
+    which = rng.integers(0, len(centers), 20_000)
+    lat = centers[which, 0] + rng.normal(0, 0.05, len(which))
+    lon = centers[which, 1] + rng.normal(0, 0.05, len(which))
+    return lat, lon, centers, GridIndex(lat, lon)
+
+
+def test_queries_match_brute_force(clustered):
+    lat, lon, centers, index = clustered
+    rng = np.random.default_rng(1)
+    for _ in range(100):
+        center = centers[rng.integers(len(centers))] + rng.normal(0, 0.05, 2)
+        bounds = viewport_bounds(center, int(rng.integers(8, 17)), 900, 600)
+        check(index, lat, lon, bounds)
+        check(index, lat, lon, expand(bounds, 0.25))
+
+
+def test_viewport_covering_everything(clustered):
+    lat, lon, _, index = clustered
+    everything = (lat.min(), lon.min(), lat.max(), lon.max())
+    assert len(check(index, lat, lon, everything)) == len(lat)
+    assert index.aggregate(everything)[2].sum() == len(lat)
+
+
+def test_aggregate_counts_match_query(clustered):
+    lat, lon, centers, index = clustered
+    bounds = viewport_bounds(centers[0], 11, 900, 600)
+    # Aggregates work on whole cells, so compare with the points in the touched cells
+    agg_lat, agg_lon, counts = index.aggregate(bounds)
+    assert counts.sum() == index.candidate_count(bounds)
+    assert len(agg_lat) == len(agg_lon) == len(counts) <= 64
+
+
+@pytest.mark.parametrize("bounds", [
+    (10.0, 10.0, 11.0, 11.0),          # far outside the grid
+    (37.0, -122.0, 36.0, -121.0),      # south above north
+    (37.5, -122.5, 37.5, -122.5),      # zero-area box with no point on it
+])
+def test_empty_viewports(clustered, bounds):
+    lat, lon, _, index = clustered
+    assert len(check(index, lat, lon, bounds)) == 0
+
+
+def test_empty_index():
+    index = GridIndex([], [])
+    bounds = (37.0, -123.0, 38.0, -122.0)
+    assert len(index.query(bounds)) == 0
+    assert index.candidate_count(bounds) == 0
+    assert all(len(a) == 0 for a in index.aggregate(bounds))
+
+
+def test_points_and_bounds_on_cell_edges():
+    # A 0.1 degree grid with every point on a cell corner
+    lat, lon = (a.ravel() for a in np.meshgrid(37.0 + 0.1 * np.arange(6), -122.5 + 0.1 * np.arange(6)))
+    index = GridIndex(lat, lon, cell_deg=0.1)
+    for bounds in [(37.1, -122.4, 37.3, -122.2),     # edges exactly on grid lines and points
+                   (37.0, -122.5, 37.5, -122.0),     # the full extent
+                   (37.2, -122.3, 37.2, -122.3),     # a single point
+                   (37.15, -122.45, 37.25, -122.35)]:  # inside cells, between points
+        check(index, lat, lon, bounds)
+    assert len(index.query((37.1, -122.4, 37.3, -122.2))) == 9
+
+
+def test_identical_points():
+    lat, lon = np.full(5, 37.45), np.full(5, -122.18)
+    index = GridIndex(lat, lon)
+    assert len(check(index, lat, lon, (37.45, -122.18, 37.45, -122.18))) == 5
+    assert len(check(index, lat, lon, (37.46, -122.18, 37.47, -122.17))) == 0
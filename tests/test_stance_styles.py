@@ -0,0 +1,30 @@
+import pandas as pd
+
+from stance_styles import FALLBACK_STYLES, STANCE_PALETTES, stance_columns, style_matrix
+
+STANCES = pd.DataFrame({
+    "Council Member": ["A. Member", "B. Member"],
+    "Housing Dev": ["Pro", "Opposed"],
+    "Environment": ["Abstain", None],
+    "Key Positions": ["- Supports housing", "- Opposes the plan"],
+})
+
+
+def test_stance_columns_skip_names_and_positions():
+    assert stance_columns(STANCES) == ["Housing Dev", "Environment"]
+
+
+def test_known_stances_use_the_theme_palette():
+    matrix = style_matrix(STANCES, "dark")
+    assert list(matrix["Housing Dev"]) == [STANCE_PALETTES["dark"]["Pro"], STANCE_PALETTES["dark"]["Opposed"]]
+    assert list(matrix["Council Member"]) == ["", ""]
+    assert list(matrix["Key Positions"]) == ["", ""]
+
+
+def test_unknown_or_blank_stances_get_the_fallback():
+    matrix = style_matrix(STANCES, "light")
+    assert list(matrix["Environment"]) == [FALLBACK_STYLES["light"]] * 2
+
+
+def test_unknown_theme_uses_light():
+    assert style_matrix(STANCES, "high-contrast").equals(style_matrix(STANCES, "light"))
@@ -0,0 +1,152 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import shared_store
+import static_export
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CSS = "a{background:url(../img/pin.png)} b{src:url('/fonts/x.woff2?v=1')} c{background:url(data:image/png;base64,AA)}"
+
+
+class FakeResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def cdn(monkeypatch):
+    fetched = []
+
+    def get(url, timeout):
+        fetched.append(url)
+        return FakeResponse(CSS.encode() if url.endswith(".css") else b"// " + url.encode())
+
+    monkeypatch.setattr(requests, "get", get)
+    return fetched
+
+
+def test_vendor_html_copies_assets_and_rewrites_tags(tmp_path, cdn):
+    page = ('<script src="https://cdn.example.com/npm/lib@1.0/lib.js"></script>\n'
+            '<link rel="stylesheet" href="https://cdn.example.com/npm/lib@1.0/css/lib.css"/>\n'
+            '<a href="https://example.com/page">a link</a>')
+    cache, out = str(tmp_path / "vendor"), tmp_path / "site"
+
+    result = static_export.vendor_html(page, str(out), cache)
+
+    assert 'src="assets/vendor/cdn.example.com/npm/lib@1.0/lib.js"' in result
+    assert 'href="assets/vendor/cdn.example.com/npm/lib@1.0/css/lib.css"' in result
+    assert '<a href="https://example.com/page">' in result
+    vendored = out / "assets" / "vendor" / "cdn.example.com"
+    # Files the stylesheet refers to are bundled where its relative url()s point
+    assert (vendored / "npm" / "lib@1.0" / "img" / "pin.png").exists()
+    assert (vendored / "fonts" / "x.woff2").exists()
+    assert len(cdn) == 4
+
+    # A second export reuses the downloads
+    static_export.vendor_html(page, str(tmp_path / "site2"), cache)
+    assert len(cdn) == 4
+
+
+def test_vendor_html_fails_when_an_asset_is_unreachable(tmp_path, monkeypatch):
+    def get(url, timeout):
+        raise requests.ConnectionError("offline")
+
+    monkeypatch.setattr(requests, "get", get)
+    with pytest.raises(static_export.VendorError, match="lib.js"):
+        static_export.vendor_html('<script src="https://cdn.example.com/lib.js"></script>',
+                                  str(tmp_path / "site"), str(tmp_path / "vendor"))
+
+
+def test_sections_depend_on_the_loader():
+    for name, (datasets, sources, _) in static_export.SECTIONS.items():
+        if datasets:
+            assert "data_loader.py" in sources, name
+
+
+def test_tables_include_project_links(dataset, tmp_path):
+    ds = SimpleNamespace(projects=dataset["projects"], stances=dataset["stances"], topics=dataset["topics"],
+                         city="Menlo Park")
+    data = static_export.load_datasets(ds)
+    context = {"out": str(tmp_path), "app_url": "", "dataset": ds, "vendor": False, "outputs": []}
+
+    projects = static_export.render_projects_table(data, context)
+    assert "<th>meetings</th><th>council_members</th>" in projects
+    meetings = static_export.render_meetings_table(data, context)
+    assert "<td>Willow Village Master Plan, Belle Haven Library Rebuild</td>" in meetings
+
+
+def test_default_export_keeps_cdn_links_and_needs_no_network(tmp_path, monkeypatch):
+    def get(url, timeout):
+        raise requests.ConnectionError("offline")
+
+    monkeypatch.setattr(requests, "get", get)
+    out = tmp_path / "site"
+    assert static_export.main(["--out", str(out)]) == 0
+    page = (out / "index.html").read_text(encoding="utf-8")
+    assert static_export.VEGA_SCRIPTS[0] in page
+    assert not (out / "assets" / "vendor").exists()
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """The shipped datasets in a scratch working directory with its own images/, so posters can be added."""
+    from data_loader import PROJECTS_CSV, SNAPSHOT_DIR, STANCES_CSV, TOPICS_CSV
+
+    for name in ("content", "datasets.json", PROJECTS_CSV, STANCES_CSV, TOPICS_CSV, SNAPSHOT_DIR):
+        os.symlink(os.path.join(REPO_DIR, name), tmp_path / name)
+    (tmp_path / "images").mkdir()
+    for name in os.listdir(os.path.join(REPO_DIR, "images")):
+        os.symlink(os.path.join(REPO_DIR, "images", name), tmp_path / "images" / name)
+    monkeypatch.setattr(shared_store, "STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_missing_side_outputs_are_rebuilt(workdir):
+    out = str(workdir / "site")
+    static_export.export(out)
+    assert set(static_export.export(out).values()) == {"reused"}
+
+    os.remove(os.path.join(out, "map.html"))
+    os.remove(os.path.join(out, "assets", "LWA-v2-square.png"))
+    status = static_export.export(out)
+    assert [name for name, s in status.items() if s == "built"] == ["intro", "map"]
+    assert os.path.exists(os.path.join(out, "map.html"))
+    assert os.path.exists(os.path.join(out, "assets", "LWA-v2-square.png"))
+
+
+def test_posters_added_later_rebuild_the_interpretations(workdir):
+    out = str(workdir / "site")
+    static_export.export(out)
+
+    (workdir / "images" / "posters").mkdir()
+    (workdir / "images" / "posters" / "1117583808.jpg").write_bytes(b"jpeg")
+    assert static_export.export(out)["interpretations"] == "built"
+    assert '<img src="assets/1117583808.jpg"' in (workdir / "site" / "index.html").read_text(encoding="utf-8")
+
+    os.remove(os.path.join(out, "assets", "1117583808.jpg"))
+    assert static_export.export(out)["interpretations"] == "built"
+    assert os.path.exists(os.path.join(out, "assets", "1117583808.jpg"))
+
+
+def test_a_new_registry_logo_rebuilds_the_intro(workdir, monkeypatch):
+    import dataset_registry
+
+    out = str(workdir / "site")
+    static_export.export(out)
+    (workdir / "images" / "new-logo.png").write_bytes(b"png")
+    monkeypatch.setattr(dataset_registry, "LOGO_PATH", "images/new-logo.png")
+    assert static_export.export(out)["intro"] == "built"
+    assert os.path.exists(os.path.join(out, "assets", "new-logo.png"))
+
+
+def test_link_urls_are_escaped_once():
+    html_text = static_export.md_inline('See [the agenda](https://example.com/a?x=1&y="2") & more')
+    assert html_text == ('See <a href="https://example.com/a?x=1&amp;y=&quot;2&quot;">the agenda</a> &amp; more')
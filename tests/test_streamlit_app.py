@@ -0,0 +1,73 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_DIR, "streamlit_app.py")
+
+# Each city rates its council on different policy categories
+STANCES = {
+    "menlo-park-2025": pd.DataFrame({
+        "Council Member": ["A. Member"], "Housing Dev": ["Pro"], "Environment": ["Opposed"],
+        "Key Positions": ["- Supports the 1350 Willow Rd master plan"],
+    }),
+    "atherton-2025": pd.DataFrame({
+        "Council Member": ["B. Member"], "Parks": ["Pro"],
+        "Key Positions": ["- Supports the park pavilion"],
+    }),
+}
+
+
+@pytest.fixture
+def two_cities(dataset, tmp_path, monkeypatch):
+    """A registry with Menlo Park and Atherton, sharing the projects and topics CSVs."""
+    projects = pd.read_csv(dataset["projects"])
+    projects.assign(earliest_mention_date="2025-01-14", latest_mention_date="2025-02-11",
+                    url="").to_csv(dataset["projects"], index=False)
+    entries = []
+    for dataset_id, city in [("menlo-park-2025", "Menlo Park"), ("atherton-2025", "Atherton")]:
+        stances = tmp_path / f"stances-{dataset_id}.csv"
+        STANCES[dataset_id].to_csv(stances, index=False)
+        entries.append({"id": dataset_id, "city": city, "period": "2025",
+                        "files": {"projects": dataset["projects"], "stances": str(stances), "topics": dataset["topics"]}})
+    (tmp_path / "datasets.json").write_text(json.dumps({"default": "menlo-park-2025", "datasets": entries}))
+    os.symlink(os.path.join(REPO_DIR, "images"), tmp_path / "images")
+    monkeypatch.chdir(tmp_path)
+
+
+def _checkbox(at, label):
+    return next(cb for cb in at.checkbox if cb.label == label)
+
+
+def _granularities(at):
+    return [radio for radio in at.radio if radio.label == "Group by"]
+
+
+def _filters(at):
+    return [text for text in at.text_input if text.label in ("project", "address", "description")]
+
+
+def test_section_state_does_not_follow_the_reader_to_another_city(two_cities):
+    at = AppTest.from_file(APP_PATH, default_timeout=60).run()
+    assert not at.exception
+    for radio in _granularities(at):
+        radio.set_value("Quarter")
+    at.multiselect[0].set_value(["Housing Dev"])
+    _checkbox(at, "Show tagged topics").check()
+    _checkbox(at, "Open key projects table").check()
+    at.run()
+    _filters(at)[0].input("Willow").run()
+    assert [radio.value for radio in _granularities(at)] == ["Quarter", "Quarter"]
+
+    at.sidebar.selectbox(key="_dataset_city").set_value("Atherton").run()
+    assert not at.exception
+    # Atherton opens with its own defaults: a stale category list or project filter would empty its sections
+    assert [radio.value for radio in _granularities(at)] == ["Meeting", "Month"]
+    assert at.multiselect[0].options == ["Parks", "Other"]
+    assert at.multiselect[0].value == ["Parks"]
+    assert not _checkbox(at, "Show tagged topics").value
+    filters = _filters(at)
+    assert filters and all(text.value == "" for text in filters)
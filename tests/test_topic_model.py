@@ -0,0 +1,80 @@
+import pandas as pd
+
+from topic_model import OTHER, build_topic_model, explode_topics, get_topic_chart_spec, topic_counts
+
+CATEGORIES = ["Housing Dev", "Fiscal Responsibility", "Environment", "Public Transit Infrastructure", "Pet Policy"]
+
+MEETINGS = pd.DataFrame({
+    "Date": ["2025-01-14", "2025-01-28", "2025-02-11"],
+    "Major_Topics": [
+        "- Affordable housing units on Willow Rd\n- Budget amendment for FY26",
+        "- Parking garage design\n- Accept minutes of the Menlo Park council\n- Pet policy for dog parks",
+        "- Housing Element update\n- Climate action plan budget",
+    ],
+})
+
+
+def _tags(table):
+    return {(f"{d:%Y-%m-%d}", c, t) for d, c, t in zip(table["Date"], table["Category"], table["Topic"])}
+
+
+def test_bullets_are_tagged_by_keyword_and_category_name():
+    assert _tags(explode_topics(MEETINGS, CATEGORIES)) == {
+        ("2025-01-14", "Housing Dev", "Affordable housing units on Willow Rd"),
+        ("2025-01-14", "Fiscal Responsibility", "Budget amendment for FY26"),
+        ("2025-01-28", "Public Transit Infrastructure", "Parking garage design"),
+        # "Menlo Park" is not parking, and matches nothing else
+        ("2025-01-28", OTHER, "Accept minutes of the Menlo Park council"),
+        # No keyword list: the category's own name is the keyword
+        ("2025-01-28", "Pet Policy", "Pet policy for dog parks"),
+        ("2025-02-11", "Housing Dev", "Housing Element update"),
+        # A bullet can fall in several categories
+        ("2025-02-11", "Environment", "Climate action plan budget"),
+        ("2025-02-11", "Fiscal Responsibility", "Climate action plan budget"),
+    }
+
+
+def test_other_only_collects_unmatched_bullets():
+    table = explode_topics(MEETINGS, CATEGORIES)
+    other = table[table["Category"] == OTHER]
+    assert list(other["Topic"]) == ["Accept minutes of the Menlo Park council"]
+    assert not set(other["Topic"]) & set(table.loc[table["Category"] != OTHER, "Topic"])
+
+
+def _counts(granularity):
+    counts = topic_counts(explode_topics(MEETINGS, CATEGORIES), granularity)
+    return {(label, c): (m, n) for label, c, m, n in
+            zip(counts["Label"], counts["Category"], counts["Mentions"], counts["Meetings"])}
+
+
+def test_counts_per_granularity():
+    meeting = _counts("Meeting")
+    assert meeting[("2025-02-11", "Fiscal Responsibility")] == (1, 1)
+    assert len(meeting) == 8
+
+    month = _counts("Month")
+    assert month[("Jan 2025", "Housing Dev")] == (1, 1)
+    assert month[("Feb 2025", "Environment")] == (1, 1)
+    assert sum(m for m, _ in month.values()) == 8
+
+    quarter = _counts("Quarter")
+    assert quarter[("2025Q1", "Housing Dev")] == (2, 2)
+    assert quarter[("2025Q1", "Fiscal Responsibility")] == (2, 2)
+    assert quarter[("2025Q1", OTHER)] == (1, 1)
+
+
+def test_examples_show_the_first_two_topics():
+    counts = topic_counts(explode_topics(MEETINGS, CATEGORIES), "Quarter")
+    housing = counts.loc[counts["Category"] == "Housing Dev", "Examples"].item()
+    assert housing == "Affordable housing units on Willow Rd; Housing Element update"
+
+
+def test_chart_specs_of_models_sharing_a_topics_frame_are_kept_apart():
+    # Two cities sharing one topics CSV but rating different stance categories
+    chart_df = MEETINGS.copy()
+    chart_df.attrs["fingerprint"] = "shared-topics"
+    other_mentions = []
+    for categories in (CATEGORIES, ["Pet Policy"]):
+        spec = get_topic_chart_spec(chart_df, build_topic_model(chart_df, categories), "Quarter", [OTHER])
+        other_mentions.append(sum(v["Mentions"] for v in spec["data"]["values"]))
+    assert other_mentions == [1, 6]
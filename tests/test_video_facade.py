@@ -0,0 +1,91 @@
+import threading
+
+import requests
+
+import video_facade
+
+URL = "https://player.vimeo.com/video/123"
+
+
+class _Response:
+    def __init__(self, body=None, content=b""):
+        self.body, self.content = body, content
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+def _isolate(monkeypatch, tmp_path):
+    monkeypatch.setattr(video_facade, "POSTER_DIR", str(tmp_path))
+    for name in ("_thumbnails", "_failures", "_pending"):
+        monkeypatch.setattr(video_facade, name, {})
+
+
+def _finish_lookups():
+    for thread in list(video_facade._pending.values()):
+        thread.join(5)
+
+
+def test_local_poster_needs_no_lookup(monkeypatch, tmp_path):
+    _isolate(monkeypatch, tmp_path)
+    (tmp_path / "123.jpg").write_bytes(b"jpg")
+    monkeypatch.setattr(requests, "get", lambda *a, **k: 1 / 0)
+    assert video_facade.vimeo_poster(URL) == str(tmp_path / "123.jpg")
+
+
+def test_lookup_runs_in_the_background(monkeypatch, tmp_path):
+    _isolate(monkeypatch, tmp_path)
+    release = threading.Event()
+
+    def get(*args, **kwargs):
+        release.wait(5)
+        return _Response({"thumbnail_url": "https://i.vimeocdn.com/123.jpg"})
+
+    monkeypatch.setattr(requests, "get", get)
+    # The script run gets the title card right away, and a second rerun doesn't start another lookup
+    assert video_facade.vimeo_poster(URL) is None
+    assert video_facade.vimeo_poster(URL) is None and len(video_facade._pending) == 1
+    release.set()
+    _finish_lookups()
+    assert video_facade.vimeo_poster(URL) == "https://i.vimeocdn.com/123.jpg"
+
+
+def test_failed_lookup_is_not_kept(monkeypatch, tmp_path):
+    _isolate(monkeypatch, tmp_path)
+    calls = []
+
+    def get(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise requests.ConnectionError("offline")
+        return _Response({"thumbnail_url": "https://i.vimeocdn.com/123.jpg"})
+
+    monkeypatch.setattr(requests, "get", get)
+    assert video_facade.vimeo_poster(URL) is None
+    _finish_lookups()
+    # Backs off instead of retrying on every rerun...
+    assert video_facade.vimeo_poster(URL) is None and not video_facade._pending and len(calls) == 1
+    # ...and once the wait is over the next lookup succeeds and is kept
+    monkeypatch.setattr(video_facade, "FAILED_RETRY", 0)
+    assert video_facade.vimeo_poster(URL) is None
+    _finish_lookups()
+    assert video_facade.vimeo_poster(URL) == "https://i.vimeocdn.com/123.jpg" and len(calls) == 2
+
+
+def test_fetch_poster_downloads_once(monkeypatch, tmp_path):
+    _isolate(monkeypatch, tmp_path)
+    calls = []
+
+    def get(url, **kwargs):
+        calls.append(url)
+        if url == video_facade.OEMBED_URL:
+            return _Response({"thumbnail_url": "https://i.vimeocdn.com/123.jpg"})
+        return _Response(content=b"jpg bytes")
+
+    monkeypatch.setattr(requests, "get", get)
+    path = video_facade.fetch_poster(URL, str(tmp_path))
+    assert open(path, "rb").read() == b"jpg bytes"
+    assert video_facade.fetch_poster(URL, str(tmp_path)) == path and len(calls) == 2
@@ -0,0 +1,47 @@
+"""Text helpers shared by the search index, meeting chart, topic model and project links.
+
+Kept apart from search_index.py so modules that only need to split or
+tokenize bullets don't import the index with it.
+"""
+
+import re
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "with",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_BULLET_RE = re.compile(r"^\s*[*\-•]\s+")
+
+
+def stem(token: str) -> str:
+    """Plural stripping only, so 'plazas'/'plaza' and 'libraries'/'library' match.
+
+    -ing and -ed are kept: cutting them would make 'parking' match 'park' and
+    'meeting' match 'meet', and a search for a park would rank parking lots.
+    """
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list:
+    return [stem(t) for t in _TOKEN_RE.findall(str(text).lower().replace("'", "")) if t not in STOPWORDS]
+
+
+def split_bullets(text) -> list:
+    """Split a markdown '* ...' list into items, joining wrapped continuation lines."""
+    if not isinstance(text, str) or not text.strip():
+        return []
+    items = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        if _BULLET_RE.match(line) or not items:
+            items.append(_BULLET_RE.sub("", line).strip())
+        else:
+            items[-1] += " " + line.strip()
+    return items
@@ -0,0 +1,202 @@
+"""Meeting topics broken out by policy category and period.
+
+Each meeting's Major_Topics bullets become rows of a topic table (one row
+per bullet and category) and are tagged with the policy categories used as
+columns in the stances CSV. Tagging matches stemmed keywords from
+CATEGORY_KEYWORDS, so "affordable housing units" and "Housing Element"
+both land in Housing Dev; a bullet can fall in several categories, and
+bullets matching none are tagged "Other". Categories without a keyword
+list match on the words of their own name.
+
+The topic table and the category x period counts for every granularity
+are built together, once per dataset version (see get_topic_model).
+"""
+
+import re
+
+import pandas as pd
+import streamlit as st
+
+import cache_metrics
+from meeting_chart import GRANULARITIES
+from text_utils import split_bullets, tokenize
+
+OTHER = "Other"
+
+# Keywords and phrases per stances category, written plainly and stemmed at match time
+CATEGORY_KEYWORDS = {
+    "Commercial Dev": [
+        "commercial", "office", "retail", "hotel", "restaurant", "business", "development agreement",
+        "use permit", "zoning", "rezoning", "willow village", "mixed use",
+    ],
+    "Housing Dev": [
+        "housing", "affordable", "residential", "apartment", "dwelling", "adu", "rhna", "bmr",
+        "below market", "homeless", "tenant", "rent", "units",
+    ],
+    "Police Capabilities": [
+        "police", "law enforcement", "public safety", "crime", "officer", "surveillance",
+        "license plate", "alpr", "drone", "emergency",
+    ],
+    "Public Transit Infrastructure": [
+        "transit", "transportation", "shuttle", "caltrain", "bus", "bike", "bicycle", "pedestrian",
+        "street", "streetlight", "road", "traffic", "crosswalk", "sidewalk", "grade separation",
+        "parking", "vehicular", "safe routes",
+    ],
+    "Environment": [
+        "climate", "environment", "environmental", "electrification", "renewable",
+        "solar", "energy", "flood", "creek", "safer bay", "sea level", "stormwater", "water", "tree",
+        "urban forest", "landfill", "waste", "recycling", "open space",
+    ],
+    "Economic Dev": [
+        "economic", "vibrancy", "small business", "downtown", "tourism", "chamber of commerce",
+        "jobs", "workforce", "sales tax",
+    ],
+    "Historic Preservation": [
+        "historic", "historical", "historic preservation", "landmark",
+    ],
+    "Fiscal Responsibility": [
+        "budget", "fiscal", "financial", "finance", "appropriation", "capital improvement", "fund",
+        "audit", "investment", "revenue", "tax", "bond", "salary", "pension", "cost", "reserve",
+        "assessment district",
+    ],
+}
+
+
+def _pattern(keywords) -> re.Pattern:
+    """Regex matching any keyword as whole stemmed tokens in a normalized topic."""
+    phrases = sorted({" ".join(tokenize(k)) for k in keywords} - {""}, key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(map(re.escape, phrases)) + r")\b")
+
+
+def category_patterns(categories) -> dict:
+    return {c: _pattern(CATEGORY_KEYWORDS.get(c) or [c]) for c in categories}
+
+
+def explode_topics(chart_df: pd.DataFrame, categories) -> pd.DataFrame:
+    """One row per (meeting, bullet, category): Date, Topic, Terms, Category.
+
+    Topic is the bullet with whitespace collapsed; Terms is its stemmed,
+    stopword-free form used for matching.
+    """
+    dates, topics = [], []
+    for date, topics_md in zip(chart_df["Date"], chart_df["Major_Topics"]):
+        for item in split_bullets(topics_md):
+            dates.append(date)
+            topics.append(" ".join(item.split()))
+    table = pd.DataFrame({"Date": pd.to_datetime(pd.Series(dates, dtype=object)), "Topic": topics})
+
+    # Recurring items ("Accept meeting minutes ...", closed sessions) repeat a lot,
+    # so tokenize and match each distinct bullet once
+    codes, unique = pd.factorize(table["Topic"])
+    terms = pd.Series([" ".join(tokenize(t)) for t in unique])
+    matches = pd.DataFrame({c: terms.str.contains(p) for c, p in category_patterns(categories).items()},
+                           columns=list(categories))
+    matches[OTHER] = ~matches.any(axis=1)
+    tagged = matches.stack()
+    tagged = tagged[tagged].reset_index(level=1).rename(columns={"level_1": "Category"})["Category"]
+
+    table["Terms"] = terms.to_numpy()[codes]
+    table["_code"] = codes
+    table = table.merge(tagged.rename_axis("_code").reset_index(), on="_code").drop(columns="_code")
+    return table.sort_values(["Date", "Category"], kind="stable").reset_index(drop=True)
+
+
+def _period_labels(periods: pd.Series, granularity: str) -> pd.Series:
+    freq = GRANULARITIES[granularity]
+    if freq is None:
+        return periods.dt.strftime("%Y-%m-%d")
+    if freq == "Q":
+        return periods.dt.to_period("Q").astype(str)
+    if freq == "M":
+        return periods.dt.strftime("%b %Y")
+    return periods.dt.strftime("Week of %Y-%m-%d")
+
+
+def topic_counts(table: pd.DataFrame, granularity: str = "Month") -> pd.DataFrame:
+    """Long-form category x period counts: Period, Label, Category, Mentions, Meetings, Examples."""
+    freq = GRANULARITIES[granularity]
+    period = table["Date"] if freq is None else table["Date"].dt.to_period(freq).dt.to_timestamp()
+    keys = ["Period", "Category"]
+    table = table.assign(Period=period)
+    grouped = table.groupby(keys, sort=True)
+    # First two topics per cell for the tooltip, without a Python call per group
+    nth = grouped.cumcount()
+    # (as object, so an empty table doesn't reindex to float)
+    first = table[nth == 0].set_index(keys)["Topic"].reindex(grouped.size().index).astype(object)
+    second = table[nth == 1].set_index(keys)["Topic"].reindex(first.index).astype(object)
+    out = pd.DataFrame({
+        "Mentions": grouped.size(),
+        "Meetings": grouped["Date"].nunique(),
+        "Examples": (first + "; " + second).fillna(first),
+    }).reset_index()
+    out.insert(1, "Label", _period_labels(out["Period"], granularity))
+    return out
+
+
+def build_topic_model(chart_df: pd.DataFrame, categories) -> dict:
+    """Topic table plus counts for every granularity, and the categories they were tagged with."""
+    table = explode_topics(chart_df, categories)
+    return {"topics": table, "counts": {g: topic_counts(table, g) for g in GRANULARITIES},
+            "categories": tuple(categories)}
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_model(dataset_key: str, categories: tuple, _chart_df: pd.DataFrame) -> dict:
+    cache_metrics.mark_miss()
+    return build_topic_model(_chart_df, categories)
+
+
+def get_topic_model(chart_df: pd.DataFrame, categories) -> dict:
+    """Topic model for this dataset version, built once and shared across reruns and sessions."""
+    return cache_metrics.tracked(
+        "topic_model", _cached_model, chart_df.attrs.get("fingerprint", ""), tuple(categories), chart_df,
+    )
+
+
+def topic_chart_spec(counts: pd.DataFrame, granularity: str, categories) -> dict:
+    """Vega-Lite stacked bars of mentions per period, one color per category.
+
+    Clicking a legend entry highlights that category.
+    """
+    data = counts[counts["Category"].isin(categories)].copy()
+    data["Period"] = data["Period"].dt.strftime("%Y-%m-%d")
+    return {
+        "data": {"values": data.to_dict("records")},
+        "params": [{"name": "category", "select": {"type": "point", "fields": ["Category"]}, "bind": "legend"}],
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {"field": "Label", "type": "ordinal", "sort": {"field": "Period"},
+                  "title": "Date" if granularity == "Meeting" else granularity},
+            "y": {"field": "Mentions", "type": "quantitative", "title": "Topics mentioned"},
+            "color": {"field": "Category", "type": "nominal", "sort": list(categories)},
+            "opacity": {"condition": {"param": "category", "value": 1}, "value": 0.25},
+            "tooltip": [
+                {"field": "Label", "type": "nominal", "title": "Period"},
+                {"field": "Category", "type": "nominal"},
+                {"field": "Mentions", "type": "quantitative"},
+                {"field": "Meetings", "type": "quantitative"},
+                {"field": "Examples", "type": "nominal"},
+            ],
+        },
+        "title": "Policy topics by period (click a legend entry to highlight it)",
+        "height": 320,
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_spec(dataset_key: str, model_categories: tuple, granularity: str, categories: tuple,
+                 _counts: pd.DataFrame) -> dict:
+    cache_metrics.mark_miss()
+    return topic_chart_spec(_counts, granularity, categories)
+
+
+def get_topic_chart_spec(chart_df: pd.DataFrame, model: dict, granularity: str, categories) -> dict:
+    """Spec for this (dataset, model, granularity, category selection), reused across reruns.
+
+    Cities can share a topics CSV but tag it with different stance categories,
+    which changes what falls in OTHER, so the model's categories are part of the key.
+    """
+    return cache_metrics.tracked(
+        "topic_chart", _cached_spec, chart_df.attrs.get("fingerprint", ""), model["categories"], granularity,
+        tuple(categories), model["counts"][granularity],
+    )
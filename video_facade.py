@@ -0,0 +1,195 @@
+"""Click-to-load facades for embedded Vimeo videos.
+
+A facade is a poster image, a title and a play button. The real player
+(a streamlit-player component iframe plus Vimeo's player scripts) is only
+created once the user presses play. Facades in the same group share one
+"active" slot, so starting a video closes the player that was open before.
+
+Posters are read from images/posters/<video id>.jpg, which compile_data.py
+downloads for every video in datasets.json. For a video without one, the
+app looks up Vimeo's oEmbed thumbnail in a background thread and shows a
+title card until it arrives, so a slow or unreachable Vimeo never holds up
+the script run. Found thumbnails are kept for a day; failed lookups are
+not kept, only retried after FAILED_RETRY seconds.
+
+Run `python video_facade.py` (from the repo root) to time the app's first
+script run with no local posters while Vimeo answers at once or slowly.
+page_weight.py measures the bytes and time to interactive the facades save
+in a browser.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+import time
+
+import streamlit as st
+
+POSTER_DIR = os.path.join("images", "posters")
+OEMBED_URL = "https://vimeo.com/api/oembed.json"
+OEMBED_TIMEOUT = 2  # seconds; a slow lookup shouldn't hold up the page
+POSTER_WIDTH = 640
+FAILED_RETRY = 300  # seconds before a failed thumbnail lookup is tried again
+THUMBNAIL_TTL = 24 * 3600
+
+_VIMEO_ID_RE = re.compile(r"vimeo\.com/(?:video/)?(\d+)")
+
+logger = logging.getLogger("lwa.video")
+
+# url -> (thumbnail URL, when found); url -> time of the last failed lookup; url -> lookup thread
+_thumbnails = {}
+_failures = {}
+_pending = {}
+_lock = threading.Lock()
+
+
+def vimeo_id(url: str) -> str:
+    match = _VIMEO_ID_RE.search(url)
+    return match.group(1) if match else ""
+
+
+def poster_path(url: str, poster_dir: str = None) -> str:
+    """Where the local poster for a Vimeo video lives, or '' if the URL has no video id."""
+    video_id = vimeo_id(url)
+    return os.path.join(poster_dir or POSTER_DIR, f"{video_id}.jpg") if video_id else ""
+
+
+def oembed_thumbnail(url: str, timeout: float = OEMBED_TIMEOUT) -> str:
+    """Thumbnail URL from Vimeo's oEmbed API; raises requests.RequestException or ValueError."""
+    import requests
+    response = requests.get(
+        OEMBED_URL, params={"url": f"https://vimeo.com/{vimeo_id(url)}", "width": POSTER_WIDTH}, timeout=timeout,
+    )
+    response.raise_for_status()
+    thumbnail = response.json().get("thumbnail_url")
+    if not thumbnail:
+        raise ValueError(f"no thumbnail for {url}")
+    return thumbnail
+
+
+def _lookup(url: str):
+    try:
+        thumbnail = oembed_thumbnail(url)
+    except Exception as e:  # network errors, bad JSON, no thumbnail
+        with _lock:
+            _failures[url] = time.monotonic()
+            _pending.pop(url, None)
+        logger.info("no Vimeo thumbnail for %s: %s", url, e)
+        return
+    with _lock:
+        _thumbnails[url] = (thumbnail, time.monotonic())
+        _pending.pop(url, None)
+
+
+def vimeo_poster(url: str):
+    """Poster image (local path or thumbnail URL) for a Vimeo video, or None if not available yet.
+
+    Never waits on the network: a missing thumbnail is looked up in the background
+    and shows up on a later rerun.
+    """
+    local = poster_path(url)
+    if local and os.path.exists(local):
+        return local
+    now = time.monotonic()
+    with _lock:
+        found = _thumbnails.get(url)
+        if found and now - found[1] < THUMBNAIL_TTL:
+            return found[0]
+        if url in _pending or now - _failures.get(url, -math.inf) < FAILED_RETRY:
+            return None
+        thread = threading.Thread(target=_lookup, args=(url,), name="vimeo-thumbnail", daemon=True)
+        _pending[url] = thread
+    thread.start()
+    return None
+
+
+def fetch_poster(url: str, poster_dir: str = None, timeout: float = 10) -> str:
+    """Download a video's thumbnail to its poster path, unless it is already there. Returns the path.
+
+    Raises requests.RequestException or ValueError when the lookup or download fails.
+    """
+    path = poster_path(url, poster_dir)
+    if not path:
+        raise ValueError(f"not a Vimeo video URL: {url}")
+    if os.path.exists(path):
+        return path
+    import requests
+    response = requests.get(oembed_thumbnail(url, timeout=timeout), timeout=timeout)
+    response.raise_for_status()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(response.content)
+    os.replace(tmp, path)
+    return path
+
+
+def _active_key(group: str) -> str:
+    return f"_active_video_{group}"
+
+
+def _play(group: str, key: str):
+    st.session_state[_active_key(group)] = key
+
+
+def _close(group: str):
+    st.session_state.pop(_active_key(group), None)
+
+
+def video_facade(url: str, title: str, key: str, group: str = "videos", facade: bool = True):
+    """Poster plus play button; swaps in the real player when this video is the group's active one.
+
+    With facade=False the player is embedded straight away.
+    """
+    if not facade:
+        from streamlit_player import st_player
+        st_player(url, key=f"player_{key}")
+        return
+
+    if st.session_state.get(_active_key(group)) == key:
+        from streamlit_player import st_player
+        st_player(url, playing=True, key=f"player_{key}")
+        st.button("✕ Close video", key=f"close_{key}", on_click=_close, args=(group,))
+        return
+
+    poster = vimeo_poster(url)
+    if poster:
+        st.image(poster, caption=title, width="stretch")
+    else:
+        with st.container(border=True):
+            st.markdown(f"🎬 **{title}**")
+    st.button("▶ Play video", key=f"play_{key}", on_click=_play, args=(group, key), type="primary")
+
+
+def _benchmark(latency: float = 2.0):
+    """App script run with no local posters and fresh thumbnail state, Vimeo answering at once vs slowly."""
+    from unittest import mock
+
+    import requests
+    from streamlit.testing.v1 import AppTest
+
+    import video_facade  # the module the app uses (this file runs as __main__)
+
+    def answer_after(delay):
+        def get(*args, **kwargs):
+            time.sleep(delay)
+            raise requests.ConnectTimeout("simulated Vimeo")
+        return get
+
+    with mock.patch.object(video_facade, "POSTER_DIR", os.path.join("images", "no-posters")):
+        # The first delay warms the app's data and map caches; it is run again afterwards
+        for delay in (0.0, 0.0, latency):
+            with mock.patch.object(requests, "get", answer_after(delay)):
+                video_facade._thumbnails.clear()
+                video_facade._failures.clear()
+                at = AppTest.from_file("streamlit_app.py", default_timeout=120)
+                start = time.perf_counter()
+                at.run()
+                elapsed = (time.perf_counter() - start) * 1000
+            print(f"script run, Vimeo answering after {delay:.0f} s: {elapsed:8.0f} ms")
+
+
+if __name__ == "__main__":
+    _benchmark()